@@ -3,13 +3,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from loguru import logger
 from prometheus_fastapi_instrumentator import Instrumentator
-from app import initialize, init_loop, init_db_loop
+from app import initialize, init_loop, log_startup_report
+from lib.profiling import profiler
 from routers import install_routers
 
 # Initialize the app with logging, environment settings, and file-based configuration
 config = initialize()
 
-STARTUP_TASKS = [init_loop, init_db_loop]
+STARTUP_TASKS = [init_loop]
 RUNNING_TASKS = []
 
 
@@ -19,6 +20,9 @@ async def lifespan(app: FastAPI):
     for task in STARTUP_TASKS:
         RUNNING_TASKS.append(asyncio.create_task(task()))
 
+    # Report which app globals were constructed during startup
+    log_startup_report('api')
+
     yield
 
     # Cancel all tasks defined in the RUNNING_TASKS list
@@ -40,17 +44,20 @@ app = FastAPI(
 )
 
 # FastAPI Middleware Configuration
-if config.server.middleware:
-    for middleware in config.server.middleware:
-        logger.debug(f'Loading FastAPI middleware: {middleware.name}')
-        mw_parts = middleware.name.split('.')
-        mw_mod = importlib.import_module('.'.join(mw_parts[:-1]))
-        mw = getattr(mw_mod, mw_parts[-1])
-        app.add_middleware(mw, **middleware.config if middleware.config else {})
+with profiler.phase('api.middleware'):
+    if config.server.middleware:
+        for middleware in config.server.middleware:
+            logger.debug(f'Loading FastAPI middleware: {middleware.name}')
+            mw_parts = middleware.name.split('.')
+            mw_mod = importlib.import_module('.'.join(mw_parts[:-1]))
+            mw = getattr(mw_mod, mw_parts[-1])
+            app.add_middleware(mw, **middleware.config if middleware.config else {})
 
 # Set up Prometheus metrics for the app
-metrics = Instrumentator()
-metrics.instrument(app).expose(app)
+with profiler.phase('api.metrics'):
+    metrics = Instrumentator()
+    metrics.instrument(app).expose(app)
 
 # Set up FastAPI routers
-install_routers(app)
+with profiler.phase('api.routers'):
+    install_routers(app)
@@ -1,189 +1,524 @@
 from __future__ import annotations
+import os
+import threading
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from requests import Session
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from twilio.rest import Client as TwilioClient
 from typing import Optional
 from lib import AppSettings
+from lib.broadcast import ConfigBroadcaster
 from lib.config import Config
-from lib.config.app import AppConfig
 from lib.config.tasks import TaskSchedule
+from lib.jobs import TaskJobBuffer
 from lib.mysql import MysqlClient
 from lib.notifications.config import NotificationConfig
+from lib.notifications.dispatch import NotificationDispatcher
+from lib.notifications.outbox import NotificationOutbox
+from lib.notifications.suppression import NotificationSuppressor
+from lib.snapshot import ConfigSnapshot
+from lib.watcher import ConfigWatcher
 from lib.services.zabbix import ZabbixReporter
+from lib.profiling import profiler
+from lib.util.lazy import LazyProxy
 
-INIT_INTERVAL_DEFAULT = 300
 INIT_INTERVAL_THRESHOLD = 0.5
-INIT_DB_INTERVAL_DEFAULT = 300
-INIT_DB_INTERVAL_THRESHOLD = 0.5
+BROADCAST_APPLY_ATTEMPTS = 5
+BROADCAST_APPLY_BACKOFF = 0.5
 
 settings: Optional[AppSettings] = None
 config: Optional[Config] = None
 notifications: Optional[list[NotificationConfig]] = None
 schedules: Optional[list[TaskSchedule]] = None
-j2: Optional[Environment] = None
-db_engine: Optional[AsyncEngine] = None
-AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
-redis: Optional[Redis] = None
-mysql: Optional[MysqlClient] = None
-zabbix: Optional[ZabbixReporter] = None
 
+# Clients are constructed from the current configuration on first use and rebuilt within forked child processes
+j2: LazyProxy[Environment] = LazyProxy('j2', lambda: create_jinja())
+db_engine: LazyProxy[AsyncEngine] = LazyProxy(
+    'db_engine', lambda: create_sql_engine(), on_fork=lambda e: e.sync_engine.dispose(close=False),
+)
+AsyncSessionLocal: LazyProxy[async_sessionmaker[AsyncSession]] = LazyProxy(
+    'AsyncSessionLocal', lambda: create_session_factory(),
+)
+redis: LazyProxy[Redis] = LazyProxy('redis', lambda: create_redis(), teardown=lambda r: r.close())
+aredis: LazyProxy[AsyncRedis] = LazyProxy('aredis', lambda: create_async_redis())
+mysql: LazyProxy[MysqlClient] = LazyProxy(
+    'mysql', lambda: create_mysql(), teardown=lambda m: close_mysql(m),
+    on_fork=lambda m: m.engine.dispose(close=False),
+)
+zabbix: LazyProxy[ZabbixReporter] = LazyProxy('zabbix', lambda: create_zabbix(), teardown=lambda z: z.stop())
+task_jobs: LazyProxy[TaskJobBuffer] = LazyProxy('task_jobs', lambda: create_task_jobs(), teardown=lambda b: b.stop())
+notifier: LazyProxy[NotificationDispatcher] = LazyProxy(
+    'notifier', lambda: create_notifier(), teardown=lambda d: d.stop(),
+)
+teams_http: LazyProxy[Session] = LazyProxy('teams_http', lambda: create_teams_http(), teardown=lambda s: s.close())
+outbox: LazyProxy[NotificationOutbox] = LazyProxy('outbox', lambda: create_outbox())
+suppressor: LazyProxy[NotificationSuppressor] = LazyProxy('suppressor', lambda: create_suppressor())
+twilio: LazyProxy[TwilioClient] = LazyProxy('twilio', lambda: create_twilio(), teardown=lambda c: close_twilio(c))
+LAZY_GLOBALS: dict[str, LazyProxy] = {
+    'j2': j2, 'db_engine': db_engine, 'AsyncSessionLocal': AsyncSessionLocal, 'redis': redis, 'aredis': aredis,
+    'mysql': mysql, 'zabbix': zabbix, 'task_jobs': task_jobs, 'notifier': notifier, 'teams_http': teams_http,
+    'outbox': outbox, 'suppressor': suppressor, 'twilio': twilio,
+}
+""" The lazily constructed app globals. """
+
+_snapshot: Optional[ConfigSnapshot] = None
+watcher: Optional[ConfigWatcher] = None
+broadcaster: Optional[ConfigBroadcaster] = None
+_lock = threading.RLock()
+
+
+def initialize(force: bool = False, announce: bool = True) -> Config:
+    """
+    Initializes the app globals from the current configuration snapshot. When none of the configuration inputs have
+    changed since the last call, the already-built objects are kept and this is a no-op unless forced. When the
+    configuration has changed, only the subsystems whose configuration section changed are reset, and clients are
+    then constructed on first use.
+    """
+    from lib import init_logging
+    from lib.snapshot import snapshots
+
+    global settings, config, notifications, schedules, _snapshot
+
+    with _lock, profiler.phase('initialize'):
+        # Initialize logging configuration with defaults
+        if config is None:
+            init_logging()
+
+        if not force and config is not None and not config.api.runtime.init.poll:
+            # Polling is disabled, so only apply snapshots refreshed by the config watcher or a broadcast
+            snapshot = snapshots.snapshot
+        else:
+            # Load the configuration snapshot, which is only rebuilt when its files or environment change
+            snapshot, _ = snapshots.refresh(force=force)
+
+        # The snapshot may have been refreshed elsewhere (e.g. load_config), so compare against the one last applied
+        if snapshot is _snapshot and not force:
+            if broadcaster is None and config.api.runtime.init.broadcast:
+                setup_broadcaster()
+            return config
+
+        # Determine which subsystem configuration sections differ from the previously applied snapshot
+        sections = snapshot.changed_sections(None if force else _snapshot)
+
+        # Load the application settings model based on the environment settings
+        settings = snapshot.settings
+
+        # Load app configuration into a statically typed object mimicking the hierarchy
+        config = snapshot.config
+
+        # Load app notifications configuration
+        notifications = snapshot.notifications
+
+        # Load app scheduling configuration
+        schedules = snapshot.schedules
+
+        _snapshot = snapshot
+
+        setup_subsystems(sections)
+
+        # Let other processes know about a configuration version detected by this process
+        if announce and broadcaster is not None:
+            broadcaster.announce(snapshot.version)
+
+        return config
+
+
+def setup_subsystems(sections: set[str]):
+    """Resets the app subsystems associated with the given changed configuration sections."""
+    from loguru import logger
+    from lib import init_logging
 
-def initialize():
-    from lib import load_environment, load_settings, init_logging, init_mysql, init_redis
-    from lib.jinja import JinjaFilters
+    logger.trace(f'Reinitializing app subsystems for changed configuration sections: {sorted(sections)}')
 
-    global settings, config, notifications, schedules, j2, mysql, redis, zabbix, db_engine, AsyncSessionLocal
+    # Re-initialize logging configuration with loaded environment and configuration settings
+    if 'logging' in sections:
+        init_logging(config=config, settings=settings)
 
-    # Initialize logging configuration with defaults
-    init_logging()
+    # Initialize SQL connection
+    if 'db.sql_url' in sections:
+        setup_sql()
 
-    # Get the environment variable prefix from the default configuration
-    env_prefix = AppConfig.EnvironmentConfig.model_fields['prefix'].default
+    # Initialize MySQL connection
+    if 'db.mysql' in sections:
+        setup_mysql()
 
-    # Load the environment settings from the file system
-    load_environment(env_prefix)
+    # Initialize Redis connection
+    if 'db.redis' in sections:
+        setup_redis()
 
-    # Load the application settings model based on default environment settings
-    settings = load_settings(env_prefix=env_prefix)
-    # Reload the application settings model based on prefix loaded from the environment if different from the default
-    if settings.env_prefix != env_prefix:
-        settings = load_settings(env_prefix=settings.env_prefix)
+    # Set up Jinja2 template rendering
+    if 'paths' in sections:
+        setup_jinja()
+    elif j2.initialized:
+        j2.globals['settings'] = settings
+        j2.globals['config'] = config
 
-    # Load app configuration into a statically typed object mimicking the hierarchy
-    config = settings.config
+    # Initialize Zabbix Reporter
+    if 'services.zabbix' in sections:
+        setup_zabbix()
 
-    # Load app notifications configuration
-    notifications = settings.notifications
+    # Initialize the task job transition buffer
+    if 'tasks.jobs' in sections:
+        setup_task_jobs()
 
-    # Load app scheduling configuration
-    schedules = settings.schedules
+    # Initialize the notification dispatcher
+    if 'notifications' in sections:
+        setup_notifier()
 
-    # Re-initialize logging configuration with loaded environment and configuration settings
-    init_logging(config=config, settings=settings)
+    # Initialize the Twilio client
+    if 'services.twilio' in sections or 'notifications' in sections:
+        setup_twilio()
 
-    # Close existing MySQL connection
-    if isinstance(mysql, MysqlClient):
-        try:
-            mysql.disconnect()
-        except Exception:
-            pass
+    # Initialize the configuration broadcaster
+    if 'db.redis' in sections or 'api.runtime.init' in sections:
+        setup_broadcaster()
+
+
+def setup_sql():
+    """Resets the SQL engine and session factory so that they are rebuilt from the current configuration on use."""
+    AsyncSessionLocal.reset()
+    db_engine.reset()
+
+
+def setup_mysql():
+    """Resets the MySQL client so that it is rebuilt from the current configuration on use."""
+    mysql.reset()
+
+
+def setup_redis():
+    """Resets the Redis client and its dependents so that they are rebuilt from the current configuration on use."""
+    suppressor.reset()
+    redis.reset()
+    aredis.reset()
+
+
+def setup_jinja():
+    """Resets the Jinja2 template environment so that it is rebuilt from the current configuration on use."""
+    j2.reset()
+
+
+def setup_zabbix():
+    """Resets the Zabbix reporter so that it is rebuilt from the current configuration on use."""
+    zabbix.reset()
+
+
+def setup_task_jobs():
+    """Resets the task job transition buffer, writing any buffered transitions, so that it is rebuilt on use."""
+    task_jobs.reset()
+
+
+def setup_notifier():
+    """
+    Resets the notification dispatcher, sending any queued notifications, the notification outbox and suppressor,
+    and the notification service HTTP clients so that they are rebuilt on use.
+    """
+    notifier.reset()
+    outbox.reset()
+    suppressor.reset()
+    teams_http.reset()
 
-    # Initialize SQL connection
-    db_engine = create_async_engine(
-        config.db.sql_url,
-        echo=False,
-        future=True,
-        pool_pre_ping=True,
-    )
 
-    AsyncSessionLocal = async_sessionmaker(
-        bind=db_engine,
+def setup_twilio():
+    """Resets the Twilio client so that it is rebuilt from the current configuration on use."""
+    twilio.reset()
+
+
+def create_sql_engine() -> AsyncEngine:
+    """Creates the SQL engine from the current configuration."""
+    with profiler.phase('engine.sql'):
+        return create_async_engine(
+            config.db.sql_url,
+            echo=False,
+            future=True,
+            pool_pre_ping=True,
+        )
+
+
+def create_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Creates the SQL session factory bound to the SQL engine."""
+    return async_sessionmaker(
+        bind=db_engine.resolve(),
         class_=AsyncSession,
         expire_on_commit=False,
         autocommit=False,
         autoflush=False,
     )
 
-    # Initialize MySQL connection
-    mysql = init_mysql(config=config)
 
-    # Close existing Redis connection
-    if redis:
-        try:
-            redis.close()
-        except Exception:
-            pass
+def create_mysql() -> MysqlClient:
+    """Creates the MySQL client from the current configuration."""
+    from lib import init_mysql
 
-    # Initialize Redis connection
-    redis = init_redis(config=config)
+    with profiler.phase('engine.mysql'):
+        return init_mysql(config=config)
 
-    # Set up Jinja2 template rendering
-    j2 = Environment(
+
+def close_mysql(client: MysqlClient):
+    """Closes the connection and connection pool of the given MySQL client."""
+    client.disconnect()
+    client.engine.dispose()
+
+
+def create_redis() -> Redis:
+    """Creates the Redis client from the current configuration."""
+    from lib import init_redis
+    return init_redis(config=config)
+
+
+def create_async_redis() -> AsyncRedis:
+    """Creates the asyncio Redis client from the current configuration, which is used by the API event loop."""
+    from lib import init_async_redis
+    return init_async_redis(config=config)
+
+
+def create_jinja() -> Environment:
+    """Creates the Jinja2 template environment from the current configuration."""
+    from lib.jinja import JinjaFilters
+
+    env = Environment(
         loader=FileSystemLoader(config.paths.templates),
         autoescape=select_autoescape(),
     )
 
-    j2.globals['settings'] = settings
-    j2.globals['config'] = config
-    j2.filters = JinjaFilters.implement_filters(j2.filters)
+    env.globals['settings'] = settings
+    env.globals['config'] = config
+    env.filters = JinjaFilters.implement_filters(env.filters)
 
-    # Initialize Zabbix Reporter
-    zabbix = ZabbixReporter(config=config.services.zabbix)
-    zabbix.start()
+    return env
 
-    return config
 
+def create_zabbix() -> ZabbixReporter:
+    """Creates and starts the Zabbix reporter from the current configuration."""
+    reporter = ZabbixReporter(config=config.services.zabbix)
+    reporter.start()
+    return reporter
 
-async def init_loop():
-    import asyncio
+
+def create_task_jobs() -> TaskJobBuffer:
+    """Creates the task job transition buffer from the current configuration, starting it if write-behind is on."""
+    buffer = TaskJobBuffer(config.tasks.jobs, lambda: mysql.engine)
+
+    if config.tasks.jobs.write_behind:
+        buffer.start()
+
+    return buffer
+
+
+def create_notifier() -> NotificationDispatcher:
+    """Creates the notification dispatcher from the current configuration, starting it if background dispatch is on."""
+    dispatcher = NotificationDispatcher(config.notifications, lambda: notifications)
+
+    if config.notifications.dispatch.background:
+        dispatcher.start()
+
+    return dispatcher
+
+
+def create_outbox() -> NotificationOutbox:
+    """Creates the notification outbox from the current configuration, stored with the MySQL engine."""
+    return NotificationOutbox(config.notifications.outbox, lambda: mysql.engine)
+
+
+def create_suppressor() -> NotificationSuppressor:
+    """Creates the notification suppressor from the current configuration."""
+    return NotificationSuppressor(config.notifications.suppression, redis)
+
+
+def create_teams_http() -> Session:
+    """
+    Creates the HTTP session that Microsoft Teams webhook requests are sent through from the current configuration.
+    Connections are kept alive in a pool sized to the concurrency of the service, and requests that are rate limited
+    or fail with a server error are retried with exponential backoff, honoring any Retry-After header.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    service = config.notifications.microsoft_teams
+
+    retry = Retry(
+        total=max(service.retries, 0),
+        connect=max(service.retries, 0),
+        read=0,
+        backoff_factor=service.retry_backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+    pool_size = max(service.concurrency, 1)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = Session()
+    session.headers['Content-Type'] = 'application/json'
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def create_twilio() -> TwilioClient:
+    """
+    Creates the Twilio REST client from the current configuration. Its HTTP connections are kept alive in a pool sized
+    to the concurrency of the notification service, and shared by the messages sent within the process.
+    """
+    from requests.adapters import HTTPAdapter
+    from twilio.http.http_client import TwilioHttpClient
+
+    service = config.services.twilio
+
+    if service is None:
+        raise ValueError('The Twilio service is not configured.')
+
+    http_client = TwilioHttpClient(pool_connections=True, timeout=config.notifications.twilio.timeout)
+
+    pool_size = max(config.notifications.twilio.concurrency, 1)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    http_client.session.mount('https://', adapter)
+    http_client.session.mount('http://', adapter)
+
+    client = TwilioClient(service.api.live.account_sid, service.api.live.auth_token, http_client=http_client)
+
+    if isinstance(service.base_url, str) and service.base_url:
+        client.api.base_url = service.base_url
+
+    return client
+
+
+def close_twilio(client: TwilioClient):
+    """Closes the pooled HTTP connections of the given Twilio client."""
+    client.http_client.session.close()
+
+
+def setup_broadcaster():
+    """Initializes the configuration broadcaster if enabled, stopping the existing broadcaster if any."""
+    global broadcaster
+
+    if isinstance(broadcaster, ConfigBroadcaster):
+        broadcaster.stop()
+        broadcaster = None
+
+    init = config.api.runtime.init
+
+    if not init.broadcast:
+        return
+
+    broadcaster = ConfigBroadcaster(redis, init.broadcast_channel, apply_version, version=_snapshot.version)
+    broadcaster.start()
+
+
+def apply_version(version: str):
+    """Applies a configuration version announced by another process once the local files have caught up."""
+    import time
     from loguru import logger
-    from lib import load_config
+    from lib.snapshot import snapshots
 
-    global config
+    for attempt in range(BROADCAST_APPLY_ATTEMPTS):
+        # Shared configuration storage (e.g. mounted ConfigMaps) may lag behind the announcing process
+        if attempt:
+            time.sleep(BROADCAST_APPLY_BACKOFF * (2 ** (attempt - 1)))
 
-    first_run = True
-    interval = INIT_INTERVAL_DEFAULT
+        snapshots.refresh()
+        initialize(announce=False)
 
-    while True:
-        try:
-            updated_config = load_config()
+        if _snapshot.version == version:
+            logger.debug(f'Applied announced configuration version: {version}')
+            return
 
-            repeat = updated_config.api.runtime.init.repeat
-            interval = updated_config.api.runtime.init.repeat_interval
+    logger.warning(f'Announced configuration version {version} was not applied as the local configuration is '
+                   + f'at version {_snapshot.version}.')
 
-            if not repeat:
-                interval = updated_config.api.runtime.init.repeat_recovery_interval
 
-            if interval < INIT_INTERVAL_THRESHOLD:
-                interval = INIT_INTERVAL_THRESHOLD
+def reset_after_fork():
+    """Discards the configuration broadcaster inherited from the parent process as its thread did not survive."""
+    global broadcaster, _lock
+    broadcaster = None
+    _lock = threading.RLock()
 
-            if not first_run and repeat:
-                config = initialize()
-                logger.trace('Application reinitialized.')
 
-        except Exception as e:
-            logger.error(f'Failed to reinitialize application: {e}')
+os.register_at_fork(after_in_child=reset_after_fork)
+
 
-        logger.trace(f'Waiting {interval} seconds until next app reinitialization cycle.')
+def startup_report() -> dict[str, Optional[float]]:
+    """Returns the construction time in seconds of each lazily constructed app global, or None if unused."""
+    return {k: p.build_time for k, p in LAZY_GLOBALS.items()}
+
+
+def log_startup_report(context: str):
+    """Logs which lazily constructed app globals have been initialized within the current process."""
+    from loguru import logger
 
-        await asyncio.sleep(interval)
+    report = startup_report()
+    initialized = [f'{k} ({v * 1000:.1f}ms)' for k, v in report.items() if v is not None]
+    deferred = [k for k, v in report.items() if v is None]
 
-        first_run = False
+    logger.info(f'[{context}:{os.getpid()}] Startup complete. Initialized: {", ".join(initialized) or "none"}; '
+                + f'deferred: {", ".join(deferred) or "none"}.')
 
+    if profiler.enabled:
+        logger.info(f'[{context}:{os.getpid()}] Startup phases:\n{profiler.format()}')
 
-async def init_db_loop():
+    profiler.complete()
+
+
+async def init_loop():
+    """
+    Watches the configuration inputs and reinitializes the app, and optionally the database schema, shortly after
+    they change. Changes are detected with inotify where available and by polling otherwise.
+    """
     import asyncio
     from loguru import logger
     from lib import init_db_schema, load_config
+    from lib.snapshot import snapshots
+    from lib.watcher import ConfigWatcher
 
-    global config
+    global watcher
 
-    first_run = True
-    interval = INIT_DB_INTERVAL_DEFAULT
+    runtime = config.api.runtime.init
 
-    while True:
+    if runtime.init_db:
         try:
-            updated_config = load_config()
+            init_db_schema(config)
+            logger.trace('Database initialized.')
+        except Exception as e:
+            logger.error(f'Failed to initialize database schema: {e}')
+
+    watcher = ConfigWatcher(
+        snapshots.snapshot.paths,
+        debounce=runtime.watch_debounce,
+        poll_interval=max(runtime.repeat_interval, INIT_INTERVAL_THRESHOLD),
+    )
 
-            enabled = updated_config.api.runtime.init.init_db
-            repeat = updated_config.api.runtime.init.repeat_db
-            interval = updated_config.api.runtime.init.repeat_db_interval
+    logger.trace(f'Watching configuration paths for changes using {watcher.backend}: {watcher.paths}')
 
-            if not repeat:
-                interval = updated_config.api.runtime.init.repeat_db_recovery_interval
+    try:
+        while True:
+            if not await asyncio.to_thread(watcher.wait):
+                break
 
-            if interval < INIT_DB_INTERVAL_THRESHOLD:
-                interval = INIT_DB_INTERVAL_THRESHOLD
+            try:
+                # Validate the updated configuration before deciding whether to apply it
+                runtime = load_config().api.runtime.init
 
-            if (enabled and first_run and not repeat) or (enabled and repeat and not first_run):
-                init_db_schema(config)
-                logger.trace('Database reinitialized.')
+                if not runtime.repeat:
+                    logger.trace('Configuration changed but app reinitialization is disabled.')
+                    continue
 
-        except Exception as e:
-            logger.error(f'Failed to initialize database schema: {e}')
+                previous = _snapshot
+
+                initialize()
+                logger.trace('Application reinitialized.')
+
+                if runtime.init_db and runtime.repeat_db and 'db.mysql' in _snapshot.changed_sections(previous):
+                    init_db_schema(config)
+                    logger.trace('Database reinitialized.')
 
-        logger.trace(f'Waiting {interval} seconds until next db reinitialization cycle.')
+            except Exception as e:
+                logger.error(f'Failed to reinitialize application: {e}')
 
-        await asyncio.sleep(interval)
+            watcher.update(snapshots.snapshot.paths)
 
-        first_run = False
+    finally:
+        watcher.close()
@@ -0,0 +1,5 @@
+"""
+Benchmarks for performance sensitive parts of the app. Each module is runnable on its own, for example:
+
+    python -m benchmarks.startup --target api --budget 5
+"""
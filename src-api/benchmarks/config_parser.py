@@ -0,0 +1,96 @@
+"""
+Measures configuration reference resolution for large generated env and template builds.
+
+    python -m benchmarks.config_parser --sections 200 --keys 25 --repeat 5
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+
+def generate_config(sections: int, keys: int) -> dict:
+    """
+    Generates a configuration dictionary in which values reference values of earlier sections, whole sections, and
+    environment variables, mimicking the layered references of generated deployment configurations.
+    """
+    config = {'base': {'host': 'example.com', 'port': 8080, 'path': '/srv/app'}}
+
+    for s in range(sections):
+        section = {}
+
+        for k in range(keys):
+            if s == 0:
+                section[f'key_{k}'] = f'$c{{base__host}}:$c{{base__port}}/{k}'
+            elif k % 5 == 0:
+                section[f'key_{k}'] = f'$c{{section_{s - 1}__key_{k}}}/$e{{HOME}}'
+            elif k % 7 == 0:
+                section[f'key_{k}'] = f'$c{{section_{max(s - 2, 0)}__key_{k}}}+$c{{base}}'
+            else:
+                section[f'key_{k}'] = f'$c{{section_{s - 1}__key_{k}}}.$c{{base__path}}'
+
+        config[f'section_{s}'] = section
+
+    return config
+
+
+def generate_template(config: dict) -> str:
+    """Generates a template that references every generated configuration value."""
+    lines = []
+
+    for name, section in config.items():
+        for key in section:
+            lines.append(f'{name}.{key} = $c{{{name}__{key}}}')
+
+    return '\n'.join(lines)
+
+
+def measure(fn: Callable, repeat: int) -> float:
+    """Returns the median duration in seconds of the given callable."""
+    durations = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
+
+
+def main(argv: list[str] = None) -> int:
+    from lib.util.config import ConfigBuilder, ConfigParser
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=200, help='The number of generated config sections.')
+    parser.add_argument('--keys', type=int, default=25, help='The number of keys within each generated section.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of timed runs of each benchmark.')
+    args = parser.parse_args(argv)
+
+    config = generate_config(args.sections, args.keys)
+    values = sum(len(s) for s in config.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / 'config.tpl'
+        template.write_text(generate_template(config))
+
+        benchmarks = {
+            'resolve': lambda: ConfigParser.compile(config).resolved,
+            'reference': lambda: ConfigParser.reference(config, f'section_{args.sections - 1}__key_1'),
+            'build_env_file': lambda: ConfigBuilder.build_env_file(config),
+            'build_tpl': lambda: ConfigBuilder.build_tpl(template, config),
+        }
+
+        print(f'== {values} values in {len(config)} sections, median of {args.repeat} runs')
+
+        for name, fn in benchmarks.items():
+            duration = measure(fn, args.repeat)
+            print(f'   {name:<20} {duration * 1000:>10.1f}ms {duration / values * 1e6:>10.2f}us/value')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
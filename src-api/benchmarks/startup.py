@@ -0,0 +1,199 @@
+"""
+Measures the cold start of the API and worker entry points and fails when it exceeds a budget.
+
+Each run imports the entry point in a fresh interpreter with `-X importtime` and startup phase profiling enabled,
+so the report includes per-module import costs alongside the recorded startup phases.
+
+    python -m benchmarks.startup --target api --repeat 5 --budget 4.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH: Path = Path(__file__).resolve().parent.parent
+""" The app source directory that the entry points are imported from. """
+
+TARGETS: dict[str, str] = {
+    'api': 'api',
+    'worker': 'worker',
+}
+""" The entry point modules that can be benchmarked, keyed by target name. """
+
+DEFAULT_BUDGET: float = 5.0
+""" The default cold start budget in seconds, used when no budget is given or configured in the environment. """
+
+BUDGET_ENV_VAR: str = 'PDA_STARTUP_BUDGET'
+""" The environment variable holding the cold start budget, optionally suffixed with the upper-cased target name. """
+
+RESULT_MARKER: str = '@@startup-result@@'
+""" Prefixes the JSON result line written by the child interpreter. """
+
+CHILD_CODE: str = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from lib.profiling import profiler
+sys.stdout.write('\\n{marker}' + json.dumps({{'import': elapsed, 'phases': profiler.report()}}) + '\\n')
+'''
+""" The code run by the child interpreter to import an entry point and report its startup phases. """
+
+
+def budget_for(target: str, budget: float = None) -> float:
+    """Returns the cold start budget for the given target from the given value, the environment, or the default."""
+    if budget is not None:
+        return budget
+
+    value = os.getenv(f'{BUDGET_ENV_VAR}_{target.upper()}', os.getenv(BUDGET_ENV_VAR))
+
+    return float(value) if value else DEFAULT_BUDGET
+
+
+def parse_import_times(stderr: str) -> dict[str, tuple[int, int]]:
+    """Parses `-X importtime` output into self and cumulative microseconds keyed by module name."""
+    times = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[len('import time:'):].split('|')
+
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+
+        times[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+
+    return times
+
+
+def run_once(target: str, config_cache: bool = True) -> dict:
+    """Imports the given target in a fresh interpreter and returns its timings."""
+    env = dict(os.environ)
+    env['PDA_PROFILE_STARTUP'] = '1'
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(SRC_PATH), env.get('PYTHONPATH')]))
+
+    if not config_cache:
+        env['PDA_CONFIG_CACHE'] = 'false'
+
+    code = CHILD_CODE.format(module=TARGETS[target], marker=RESULT_MARKER)
+
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise RuntimeError(f'Failed to start "{target}" (exit code {proc.returncode}):\n{proc.stderr[-4000:]}')
+
+    result = None
+
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+
+    if result is None:
+        raise RuntimeError(f'The "{target}" start up did not report its timings.')
+
+    result['wall'] = wall
+    result['imports'] = parse_import_times(proc.stderr)
+
+    return result
+
+
+def summarize(target: str, runs: list[dict], top: int) -> dict:
+    """Aggregates the timings of the given runs into medians."""
+    modules = {}
+
+    for run in runs:
+        for name, (self_us, cumulative_us) in run['imports'].items():
+            modules.setdefault(name, []).append((self_us, cumulative_us))
+
+    imports = sorted(
+        (
+            {
+                'module': name,
+                'self_ms': statistics.median(t[0] for t in times) / 1000,
+                'cumulative_ms': statistics.median(t[1] for t in times) / 1000,
+            }
+            for name, times in modules.items()
+        ),
+        key=lambda m: m['self_ms'],
+        reverse=True,
+    )
+
+    phases = {}
+
+    for run in runs:
+        for p in run['phases']:
+            phases.setdefault((p['depth'], p['name']), []).append(p['duration'])
+
+    return {
+        'target': target,
+        'runs': len(runs),
+        'wall': statistics.median(r['wall'] for r in runs),
+        'import': statistics.median(r['import'] for r in runs),
+        'phases': [
+            {'name': name, 'depth': depth, 'duration_ms': statistics.median(d) * 1000}
+            for (depth, name), d in phases.items()
+        ],
+        'imports': imports[:top],
+    }
+
+
+def print_summary(summary: dict, budget: float):
+    """Prints a human-readable report of the given summary."""
+    status = 'OK' if summary['wall'] <= budget else 'OVER BUDGET'
+
+    print(f'== {summary["target"]}: {summary["wall"]:.3f}s cold start (median of {summary["runs"]}), '
+          + f'{summary["import"]:.3f}s importing the entry point, budget {budget:.3f}s [{status}]')
+
+    print('-- Phases')
+    for p in summary['phases']:
+        print(f'   {"  " * p["depth"]}{p["name"]:<{40 - 2 * p["depth"]}} {p["duration_ms"]:>10.1f}ms')
+
+    print('-- Slowest imports (self / cumulative)')
+    for m in summary['imports']:
+        print(f'   {m["module"]:<60} {m["self_ms"]:>9.1f}ms {m["cumulative_ms"]:>9.1f}ms')
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', choices=[*TARGETS, 'all'], default='all', help='The entry point to start.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of cold starts to measure.')
+    parser.add_argument('--budget', type=float, default=None,
+                        help=f'The cold start budget in seconds (default: ${BUDGET_ENV_VAR} or {DEFAULT_BUDGET}).')
+    parser.add_argument('--top', type=int, default=20, help='The number of slowest imports to report.')
+    parser.add_argument('--no-config-cache', action='store_true',
+                        help='Disable the validated configuration cache to measure a first boot.')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args(argv)
+
+    targets = list(TARGETS) if args.target == 'all' else [args.target]
+    summaries = []
+    failed = False
+
+    for target in targets:
+        runs = [run_once(target, config_cache=not args.no_config_cache) for _ in range(max(args.repeat, 1))]
+        summary = summarize(target, runs, args.top)
+        summary['budget'] = budget_for(target, args.budget)
+        summaries.append(summary)
+
+        if summary['wall'] > summary['budget']:
+            failed = True
+
+        if not args.json:
+            print_summary(summary, summary['budget'])
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Measures the overhead and accuracy of Redis throttle decisions with concurrent workers sharing a single throttle key.
+
+Each worker repeatedly calls a function throttled with the raise mode for the given duration, so every call measures
+one admit or deny decision. Requires a Redis server that the benchmark keys can be written to.
+
+    python -m benchmarks.throttle --url redis://localhost:6379/15 --workers 32 --calls 50 --period 1 --duration 5
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+
+def run(algorithm: str, workers: int, calls: int, period: float, duration: float) -> dict:
+    """Runs the given number of workers against a fresh throttle key, returning their decision latencies and counts."""
+    from lib.decorators import ThrottleException, redis_throttle
+
+    key = f'benchmark-{uuid.uuid4().hex}'
+    throttled = redis_throttle(calls, period, mode='raise', key=key, algorithm=algorithm)(lambda: None)
+    barrier = threading.Barrier(workers + 1)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        latencies, admitted = [], 0
+        barrier.wait()
+        end = time.perf_counter() + duration
+
+        while (start := time.perf_counter()) < end:
+            try:
+                throttled()
+                admitted += 1
+            except ThrottleException:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+        with lock:
+            results.append((latencies, admitted))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    started = time.perf_counter()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for result in results for latency in result[0])
+
+    return {
+        'decisions': len(latencies),
+        'admitted': sum(result[1] for result in results),
+        'elapsed': elapsed,
+        'p50': latencies[len(latencies) // 2] if latencies else 0,
+        'p99': latencies[int(len(latencies) * 0.99)] if latencies else 0,
+        'mean': statistics.fmean(latencies) if latencies else 0,
+    }
+
+
+def main(argv: list[str] = None) -> int:
+    from redis import Redis
+    from lib.decorators import THROTTLE_ALGORITHMS, registry
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='redis://localhost:6379/15', help='The URL of the Redis server to use.')
+    parser.add_argument('--workers', type=int, default=32, help='The number of concurrent workers.')
+    parser.add_argument('--calls', type=int, default=50, help='The number of calls admitted within each period.')
+    parser.add_argument('--period', type=float, default=1.0, help='The throttle period in seconds.')
+    parser.add_argument('--duration', type=float, default=5.0, help='The seconds that each algorithm is run for.')
+    parser.add_argument('--algorithm', choices=THROTTLE_ALGORITHMS, action='append',
+                        help='An algorithm to benchmark, which may be given several times. Defaults to all.')
+    args = parser.parse_args(argv)
+
+    registry._redis_client = Redis.from_url(args.url, max_connections=args.workers * 2)
+    registry._redis_client.ping()
+
+    # Calls admitted by a window of the duration, plus the initial burst
+    limit = args.calls * args.duration / args.period + args.calls
+
+    print(f'== {args.workers} workers sharing one key, {args.calls} calls per {args.period}s for {args.duration}s')
+
+    for algorithm in args.algorithm or THROTTLE_ALGORITHMS:
+        result = run(algorithm, args.workers, args.calls, args.period, args.duration)
+
+        print(f'   {algorithm:<16} {result["decisions"] / result["elapsed"]:>10.0f} decisions/s'
+              + f'   p50 {result["p50"] * 1000:>7.2f}ms   p99 {result["p99"] * 1000:>7.2f}ms'
+              + f'   admitted {result["admitted"]:>6} (limit {limit:.0f})')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Delivers the notifications queued in the notification outbox, separately from the workers. Enable the outbox with the
+`notifications.outbox.enabled` setting so that notifications are queued rather than sent directly. Any number of
+delivery processes may run at once; each notification is only delivered by one of them at a time.
+
+    python3 delivery.py
+"""
+import signal
+import sys
+from app import initialize, log_startup_report, outbox
+from lib.notifications.outbox import NotificationDeliveryWorker
+
+# Initialize the app with logging, environment settings, and file-based configuration
+config = initialize()
+
+
+def configs():
+    """Returns the currently loaded notification configurations."""
+    from app import notifications
+    return notifications
+
+
+worker = NotificationDeliveryWorker(outbox, configs)
+
+
+def main() -> int:
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+
+    log_startup_report('delivery')
+
+    worker.run()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,10 @@
 import logging
 import os
-import sys
 from loguru import logger
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from typing import Union
 from lib.config import Config
 from lib.config.app import AppConfig
@@ -23,6 +23,12 @@ DEFAULT_ENV_NAME: str = AppConfig.EnvironmentConfig.model_fields['name'].default
 class AppSettings(BaseSettings):
     """ The application settings class that loads setting values from the application environment. """
 
+    config_cache: bool = True
+    """ Whether validated configuration objects are cached on disk to skip re-validation at process start. """
+
+    config_cache_dir: Union[str, Path, None] = None
+    """ The directory to cache validated configuration objects in, defaulting to a per-user temporary directory. """
+
     config_path: Union[str, Path] = 'config/config.yml'
     """ The path to the YAML file containing additional configuration settings. """
 
@@ -129,6 +135,12 @@ DEFAULT_SECRETS_PATH: Union[Path, None] = AppSettings.model_fields['env_secrets_
 """ The default path to the secrets directory to load environment variable values from. """
 
 
+def environment_paths(env_prefix: str) -> list[Path]:
+    """ Returns the environment file paths that are loaded for the current environment. """
+    env_name = os.getenv(f'{env_prefix}_ENV', DEFAULT_ENV_NAME).lower()
+    return [ROOT_PATH / '.app.env', ROOT_PATH / f'.app.{env_name}.env']
+
+
 def load_environment(env_prefix: str):
     """ Loads available environment files based on current environment. """
     from dotenv import load_dotenv
@@ -138,10 +150,8 @@ def load_environment(env_prefix: str):
 
     logger.trace(f'Loading environment file for environment: {env_name}; prefix: {env_prefix};)')
 
-    env_paths = ['.app.env', f'.app.{env_name}.env']
-
-    for file_path in env_paths:
-        if (env_path := ROOT_PATH / file_path).exists():
+    for env_path in environment_paths(env_prefix):
+        if env_path.exists():
             logger.trace(f'Loading environment file: {env_path}')
             load_dotenv(env_path)
 
@@ -196,45 +206,30 @@ def load_settings(env_prefix: str) -> AppSettings:
 
 
 def load_config() -> Config:
-    # Get the environment variable prefix from the default configuration
-    env_prefix = AppConfig.EnvironmentConfig.model_fields['prefix'].default
-    # Load the app settings from the environment
-    settings = load_settings(env_prefix=env_prefix)
-    # Reload the application settings model based on prefix loaded from the environment if different from the default
-    if settings.env_prefix != env_prefix:
-        settings = load_settings(env_prefix=settings.env_prefix)
-    # Load app configuration
-    return settings.config
+    """ Returns the app configuration from the current configuration snapshot. """
+    from lib.snapshot import snapshots
+    return snapshots.refresh()[0].config
 
 
 def load_notifications() -> list[NotificationConfig]:
-    # Get the environment variable prefix from the default configuration
-    env_prefix = AppConfig.EnvironmentConfig.model_fields['prefix'].default
-    # Load the app settings from the environment
-    settings = load_settings(env_prefix=env_prefix)
-    # Reload the application settings model based on prefix loaded from the environment if different from the default
-    if settings.env_prefix != env_prefix:
-        settings = load_settings(env_prefix=settings.env_prefix)
-    # Load app configuration
-    return settings.notifications if settings.notifications else []
+    """ Returns the notification configurations from the current configuration snapshot. """
+    from lib.snapshot import snapshots
+    notifications = snapshots.refresh()[0].notifications
+    return notifications if notifications else []
 
 
 def load_schedules() -> list[TaskSchedule]:
-    # Get the environment variable prefix from the default configuration
-    env_prefix = AppConfig.EnvironmentConfig.model_fields['prefix'].default
-    # Load the app settings from the environment
-    settings = load_settings(env_prefix=env_prefix)
-    # Reload the application settings model based on prefix loaded from the environment if different from the default
-    if settings.env_prefix != env_prefix:
-        settings = load_settings(env_prefix=settings.env_prefix)
-    # Load app configuration
-    return settings.schedules if settings.schedules else []
+    """ Returns the task schedules from the current configuration snapshot. """
+    from lib.snapshot import snapshots
+    schedules = snapshots.refresh()[0].schedules
+    return schedules if schedules else []
 
 
 def init_logging(config: Config = None, settings: AppSettings = None) -> None:
     """
     Initialize logging configuration
     """
+    from lib.capture import console_stream, log_sink
     from lib.config import Config
 
     log_format: str = '<green>{time}</green> <level>{level}</level>'
@@ -254,7 +249,10 @@ def init_logging(config: Config = None, settings: AppSettings = None) -> None:
 
     log_format += ' <level>{message}</level>'
     logger.remove()
-    logger.add(sys.stderr, colorize=True, format=log_format, level=log_level)
+    logger.add(console_stream(), colorize=True, format=log_format, level=log_level)
+
+    # Log messages are also copied to the output capture of the task executing within the current context (if any)
+    logger.add(log_sink, colorize=False, format=log_format, level=log_level)
 
     logging.getLogger('pydantic').setLevel(logging.ERROR)
     logging.getLogger('requests').setLevel(logging.WARNING)
@@ -276,6 +274,12 @@ def init_redis(config: Config) -> Redis:
     return Redis(host=conf.host, port=conf.port, db=conf.database)
 
 
+def init_async_redis(config: Config) -> AsyncRedis:
+    """ Initialize an asyncio Redis connection instance. """
+    conf = config.db.redis
+    return AsyncRedis(host=conf.host, port=conf.port, db=conf.database)
+
+
 def init_db_schema(config: Config):
     """
     Initialize the application database
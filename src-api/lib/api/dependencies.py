@@ -1,7 +1,8 @@
 from fastapi import Depends, Request, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Optional
+from lib.enums import ThrottleAlgorithmEnum
 from models.api.auth import UserSchema, ClientSchema
 
 oauth2_scheme_password = OAuth2PasswordBearer(tokenUrl='v1/token')
@@ -53,3 +54,95 @@ async def get_principal(request: Request, bearer_token: str = Depends(oauth2_sch
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Not authenticated'
     )
+
+
+class RateLimiter:
+    """
+    A FastAPI dependency that rate limits the requests of a route per client, or across all clients, with the
+    asyncio Redis throttle so that limited requests never block the event loop. The limits given in code can be
+    overridden per limiter name with the `api.rate_limits.routes` configuration. Requests over the limit are rejected
+    with a 429 response in the raise mode, or are held until admitted in the sleep mode. Should Redis be unavailable,
+    requests are allowed.
+    """
+
+    name: str
+    """The name of the limiter, which identifies its throttle key and its configuration overrides."""
+
+    calls: int
+    """The default number of requests admitted within the period."""
+
+    period: float
+    """The default period in seconds."""
+
+    per_client: bool
+    """Whether requests are limited per client rather than across all clients by default."""
+
+    algorithm: ThrottleAlgorithmEnum
+    """The default throttle algorithm."""
+
+    mode: str
+    """Whether requests over the limit are rejected ('raise') or held until admitted ('sleep')."""
+
+    def __init__(self, name: str, calls: int, period: float, *, per_client: bool = True,
+                 algorithm: ThrottleAlgorithmEnum = ThrottleAlgorithmEnum.GCRA, mode: str = 'raise',
+                 backoff_strategy: str = 'fixed', backoff_base: float = 1.0, backoff_cap: float = 60.0,
+                 jitter: bool = False, key: Optional[Callable[[Request], str]] = None):
+        self.name = name
+        self.calls = calls
+        self.period = period
+        self.per_client = per_client
+        self.algorithm = ThrottleAlgorithmEnum(algorithm)
+        self.mode = mode
+        self.backoff_strategy = backoff_strategy
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.key = key or self.client_key
+
+    @staticmethod
+    def client_key(request: Request) -> str:
+        """Returns the key that identifies the client of the given request, which is its address by default."""
+        return request.client.host if request.client is not None else 'unknown'
+
+    async def __call__(self, request: Request):
+        import asyncio
+        import math
+        import redis.exceptions
+        from loguru import logger
+        from app import config
+        from lib.decorators import async_redis_throttle_acquire, registry, throttle_backoff
+
+        limits = config.api.rate_limits if config is not None else None
+        route = limits.routes.get(self.name) if limits is not None else None
+
+        if (limits is not None and not limits.enabled) or (route is not None and not route.enabled):
+            return
+
+        calls = route.calls if route is not None and route.calls is not None else self.calls
+        period = route.period if route is not None and route.period is not None else self.period
+        per_client = route.per_client if route is not None and route.per_client is not None else self.per_client
+        algorithm = route.algorithm if route is not None and route.algorithm is not None else self.algorithm
+
+        key = f'api:{self.name}' + (f':{self.key(request)}' if per_client else '')
+
+        while True:
+            try:
+                allowed, wait, attempt = await async_redis_throttle_acquire(
+                    registry.get_async_redis_client(), key, calls, period, algorithm,
+                )
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+                logger.warning(f'Failed to check the "{self.name}" rate limit; allowing the request: {e}')
+                return
+
+            if allowed:
+                return
+
+            if self.mode != 'sleep':
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f'Rate limit of {calls} requests in {period}s exceeded.',
+                    headers={'Retry-After': str(max(math.ceil(wait), 1))},
+                )
+
+            await asyncio.sleep(throttle_backoff(wait, attempt, self.backoff_strategy, self.backoff_base,
+                                                 self.backoff_cap, self.jitter))
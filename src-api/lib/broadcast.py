@@ -0,0 +1,115 @@
+from loguru import logger
+from redis import Redis
+from threading import Event, Lock, Thread, current_thread
+from typing import Callable, Optional
+
+
+class ConfigBroadcaster:
+    """
+    Broadcasts configuration versions between processes over Redis pub/sub. The process that detects a new
+    configuration version announces it and every subscribed process applies it once.
+    """
+
+    _redis: Redis
+    """The Redis client used to publish and subscribe."""
+
+    _channel: str
+    """The Redis pub/sub channel that configuration versions are broadcast on."""
+
+    _on_version: Callable[[str], None]
+    """The callback invoked with each configuration version received from another process."""
+
+    _version: Optional[str]
+    """The last configuration version announced or received by this process."""
+
+    _lock: Lock
+    """A lock guarding the last seen version."""
+
+    _stop_event: Event
+    """Set when the subscriber thread should stop."""
+
+    _thread: Thread
+    """The subscriber thread."""
+
+    @property
+    def alive(self) -> bool:
+        """Whether the subscriber thread is running."""
+        return self._thread.is_alive()
+
+    def __init__(self, redis: Redis, channel: str, on_version: Callable[[str], None], version: Optional[str] = None):
+        self._redis = redis
+        self._channel = channel
+        self._on_version = on_version
+        self._version = version
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread = Thread(target=self._worker, daemon=True)
+
+    def start(self):
+        """Start the background subscriber thread."""
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self):
+        """Signal the subscriber thread to stop and wait for it."""
+        self._stop_event.set()
+        # The subscriber thread may stop itself while applying a configuration version that changes Redis settings
+        if self._thread.is_alive() and self._thread is not current_thread():
+            self._thread.join(timeout=5)
+
+    def announce(self, version: str):
+        """Publishes the given configuration version unless it is the version this process last saw."""
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+
+        try:
+            self._redis.publish(self._channel, version)
+            logger.debug(f'[ConfigBroadcaster] Announced configuration version: {version}')
+        except Exception as e:
+            logger.error(f'[ConfigBroadcaster] Failed to announce configuration version {version}: {e}')
+
+    def _receive(self, version: str):
+        """Applies a configuration version received from the channel once."""
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+
+        logger.debug(f'[ConfigBroadcaster] Received configuration version: {version}')
+
+        try:
+            self._on_version(version)
+        except Exception as e:
+            logger.error(f'[ConfigBroadcaster] Failed to apply configuration version {version}: {e}')
+
+    def _worker(self):
+        """Background thread that listens for configuration versions."""
+        while not self._stop_event.is_set():
+            pubsub = None
+
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+
+                    if message is None or message['type'] != 'message':
+                        continue
+
+                    data = message['data']
+                    self._receive(data.decode('utf-8') if isinstance(data, bytes) else str(data))
+
+            except Exception as e:
+                logger.error(f'[ConfigBroadcaster] Subscription to "{self._channel}" failed: {e}')
+                # Pause before resubscribing
+                self._stop_event.wait(5)
+
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
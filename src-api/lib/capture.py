@@ -0,0 +1,246 @@
+import io
+import sys
+from collections import deque
+from contextvars import ContextVar
+from threading import Lock, RLock
+from typing import Callable, Optional, TextIO
+
+_task_id: ContextVar[Optional[str]] = ContextVar('pda_capture_task_id', default=None)
+""" The id of the task whose output is captured within the current thread, greenlet, or asyncio task context. """
+
+_captures: dict[str, 'OutputCapture'] = {}
+""" The active output captures keyed by task id. """
+
+_lock = Lock()
+
+
+class OutputCapture(io.TextIOBase):
+    """
+    A text stream that captures written output in bounded memory while passing it through to another stream.
+
+    Output is handed to the `emit` callback in chunks of about `chunk_size` characters as it is written, up to
+    `max_size` characters in total. Beyond that, only the most recent `tail_size` characters are retained, which are
+    emitted when the capture is closed following a marker noting how much output was omitted.
+    """
+
+    max_size: int
+    """The maximum number of characters emitted from the start of the output."""
+
+    tail_size: int
+    """The number of most recent characters retained once the maximum size has been exceeded."""
+
+    chunk_size: int
+    """The number of characters buffered before they are emitted as a chunk."""
+
+    _stream: Optional[TextIO]
+    """The stream written output is passed through to (if any)."""
+
+    _emit: Callable[[str, int], None]
+    """Receives each chunk of captured output along with its position in the sequence of emitted chunks."""
+
+    _pending: list[str]
+    """The captured output not yet emitted."""
+
+    _tail: deque[str]
+    """The most recent output written once the maximum size has been exceeded."""
+
+    @property
+    def size(self) -> int:
+        """The total number of characters written."""
+        return self._size
+
+    @property
+    def sequence(self) -> int:
+        """The number of chunks emitted."""
+        return self._sequence
+
+    def __init__(self, emit: Callable[[str, int], None], stream: Optional[TextIO] = None, max_size: int = 1048576,
+                 tail_size: int = 65536, chunk_size: int = 8192):
+        super().__init__()
+        self.max_size = max_size
+        self.tail_size = tail_size
+        self.chunk_size = max(chunk_size, 1)
+        self._stream = stream
+        self._emit = emit
+        self._pending = []
+        self._pending_size = 0
+        self._head_size = 0
+        self._tail = deque()
+        self._tail_length = 0
+        self._size = 0
+        self._sequence = 0
+        # Re-entrant as emitting a chunk may itself write to the captured stream, such as when logging
+        self._lock = RLock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if self._stream is not None:
+            self._stream.write(data)
+
+        if self.closed or not data:
+            return len(data)
+
+        with self._lock:
+            self._size += len(data)
+            remaining = data
+
+            if self._head_size < self.max_size:
+                head = remaining[:self.max_size - self._head_size]
+                remaining = remaining[len(head):]
+                self._head_size += len(head)
+                self._pending.append(head)
+                self._pending_size += len(head)
+
+                if self._pending_size >= self.chunk_size:
+                    self._flush_pending(partial=False)
+
+            if remaining and self.tail_size > 0:
+                remaining = remaining[-self.tail_size:]
+                self._tail.append(remaining)
+                self._tail_length += len(remaining)
+
+                # Discard the oldest writes that lie entirely outside of the tail
+                while self._tail_length - len(self._tail[0]) >= self.tail_size:
+                    self._tail_length -= len(self._tail.popleft())
+
+        return len(data)
+
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+
+    def close(self):
+        """Emits any buffered output, followed by the retained tail of output beyond the maximum size."""
+        if self.closed:
+            return
+
+        with self._lock:
+            self._flush_pending()
+
+            tail = ''.join(self._tail)[-self.tail_size:] if self.tail_size > 0 else ''
+            omitted = self._size - self._head_size - len(tail)
+            self._tail.clear()
+            self._tail_length = 0
+
+            if omitted > 0:
+                tail = f'\n[... {omitted} characters omitted ...]\n' + tail
+
+            for i in range(0, len(tail), self.chunk_size):
+                self._emit_chunk(tail[i:i + self.chunk_size])
+
+        super().close()
+
+    def _flush_pending(self, partial: bool = True):
+        """Emits the buffered output in chunks of the chunk size, including a final partial chunk if requested."""
+        pending = ''.join(self._pending)
+        end = len(pending) if partial else len(pending) - len(pending) % self.chunk_size
+        self._pending = [pending[end:]] if end < len(pending) else []
+        self._pending_size = len(pending) - end
+
+        for i in range(0, end, self.chunk_size):
+            self._emit_chunk(pending[i:i + self.chunk_size])
+
+    def _emit_chunk(self, chunk: str):
+        sequence = self._sequence
+        self._sequence += 1
+        self._emit(chunk, sequence)
+
+
+class CaptureRouter(io.TextIOBase):
+    """
+    A text stream installed in place of STDERR that passes writes through to the original stream and copies them to
+    the output capture of the task executing within the current context. This allows tasks running concurrently in
+    thread, gevent, or eventlet worker pools to each capture only their own output.
+    """
+
+    stream: TextIO
+    """The original stream written output is passed through to."""
+
+    @property
+    def encoding(self) -> str:
+        return self.stream.encoding
+
+    def __init__(self, stream: TextIO):
+        super().__init__()
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        self.stream.write(data)
+        route(data)
+        return len(data)
+
+    def flush(self):
+        self.stream.flush()
+
+    def fileno(self) -> int:
+        return self.stream.fileno()
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+
+def install_router() -> CaptureRouter:
+    """Installs the capture router in place of STDERR (if not already installed) and returns it."""
+    with _lock:
+        if not isinstance(sys.stderr, CaptureRouter):
+            sys.stderr = CaptureRouter(sys.stderr)
+
+        return sys.stderr
+
+
+def console_stream() -> TextIO:
+    """Returns the original STDERR stream, bypassing the capture router if installed."""
+    stderr = sys.stderr
+    return stderr.stream if isinstance(stderr, CaptureRouter) else stderr
+
+
+def start_capture(task_id: str, capture: OutputCapture):
+    """Routes output written within the current context to the given capture for the given task."""
+    install_router()
+
+    with _lock:
+        previous = _captures.pop(_task_id.get(), None) if _task_id.get() is not None else None
+        _captures[task_id] = capture
+
+    _task_id.set(task_id)
+
+    # Release a capture left behind by a task of this context that didn't complete its run
+    if previous is not None and previous is not capture:
+        previous.close()
+
+
+def stop_capture(task_id: str) -> Optional[OutputCapture]:
+    """Stops routing output to the capture of the given task, and returns the capture (if any) after closing it."""
+    with _lock:
+        capture = _captures.pop(task_id, None)
+
+    if _task_id.get() == task_id:
+        _task_id.set(None)
+
+    if capture is not None:
+        capture.close()
+
+    return capture
+
+
+def route(data: str):
+    """Writes the given output to the capture of the task executing within the current context (if any)."""
+    task_id = _task_id.get()
+
+    if task_id is None:
+        return
+
+    capture = _captures.get(task_id)
+
+    if capture is not None:
+        capture.write(data)
+
+
+def log_sink(message: str):
+    """A loguru sink that routes log messages to the capture of the task executing within the current context."""
+    route(str(message))
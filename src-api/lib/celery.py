@@ -6,12 +6,18 @@ from celery.beat import Scheduler
 from celery.worker.request import Request
 from collections import namedtuple
 from kombu.transport.virtual.base import Message
-from typing import Any, Optional, Union
-from lib.mysql import MysqlClient, MysqlDbConfig
-from models.db.tasks import TaskJob
+from typing import Any, Callable, Optional
+from lib.capture import OutputCapture
+from lib.enums import TaskEnum
+from lib.jobs import TaskJobTransition
+from lib.notifications.events import ALL_EVENTS, ALL_EVENTS_TYPE
+from models.db.tasks import TaskJobStatusEnum
 
 event_t = namedtuple('event_t', ('time', 'priority', 'entry'))
 
+SILENT_TASKS: tuple[str, ...] = (TaskEnum.PDA_NOTIFICATION_DIGEST.value, TaskEnum.PDA_TWILIO_STATUS.value)
+""" The internal notification tasks that never dispatch notification events, so that notifications can't loop. """
+
 
 class DynamicScheduler(Scheduler):
     """Provides a custom scheduler for Celery Beat that loads the latest schedule configuration periodically."""
@@ -124,47 +130,18 @@ class SignalHandler:
     app: Optional[Celery]
     """The Celery app instance reference."""
 
-    mysql_client: Optional[MysqlClient]
-    """The MySQL client instance reference."""
-
-    _stdout = None
-
-    _stderr = None
-
-    _stdout_original = None
-
-    _stderr_original = None
-
     _ignored_tasks: list[str] = [
         'pda.mail',
         'pda.mail.send',
     ]
 
-    class TeeStream:
-        def __init__(self, *streams):
-            self.streams = streams
-
-        def write(self, data):
-            for s in self.streams:
-                s.write(data)
-                s.flush()
-
-        def flush(self):
-            for s in self.streams:
-                s.flush()
-
     def __init__(self, app: Optional[Celery] = None):
         from celery.signals import (
             task_received, task_revoked, task_rejected, task_prerun, task_postrun, task_retry, task_internal_error,
-            task_success, task_failure, task_unknown
+            task_success, task_failure, task_unknown, worker_ready, worker_process_shutdown, worker_shutdown
         )
 
         self.app = app
-        self.mysql_client = None
-        self._stdout = None
-        self._stderr = None
-        self._stdout_original = None
-        self._stderr_original = None
 
         # Connect Celery Signals
         task_received.connect(self.task_received_handler, weak=False)
@@ -177,128 +154,111 @@ class SignalHandler:
         task_success.connect(self.task_success_handler, weak=False)
         task_failure.connect(self.task_failure_handler, weak=False)
         task_unknown.connect(self.task_unknown_handler, weak=False)
+        worker_ready.connect(self.worker_ready_handler, weak=False)
+        worker_process_shutdown.connect(self.worker_process_shutdown_handler, weak=False)
+        worker_shutdown.connect(self.worker_process_shutdown_handler, weak=False)
+
+    @staticmethod
+    def worker_ready_handler(**kw):
+        from app import log_startup_report
+        log_startup_report('worker')
+
+    @staticmethod
+    def worker_process_shutdown_handler(**kw):
+        from app import mysql, notifier, task_jobs
+
+        # Send any queued notifications before the clients they are sent with are shut down
+        if notifier.initialized:
+            notifier.reset()
+
+        # Write any buffered task job transitions before the connections they are written with are closed
+        if task_jobs.initialized:
+            task_jobs.reset()
+
+        # Close the pooled connections of this worker process rather than leaving them for MySQL to time out
+        if mysql.initialized:
+            mysql.reset()
+
+    def start_capture(self, request: Context, name: str, task_id: str) -> Optional[OutputCapture]:
+        """
+        Starts capturing the STDERR and log output of the given task, recording the captured output in chunks as it
+        is written. Output is routed by the executing task's context, so concurrent tasks capture only their own.
+        """
+        from app import config
+        from lib.capture import start_capture
+
+        capture_config = config.tasks.capture
+
+        if not capture_config.enabled:
+            return None
+
+        def emit(chunk: str, sequence: int):
+            self.record_task_job(TaskJobTransition.from_request(
+                request, name=name, task_id=task_id, output=chunk, sequence=sequence,
+            ))
+
+        capture = OutputCapture(
+            emit,
+            max_size=capture_config.max_size,
+            tail_size=capture_config.tail_size,
+            chunk_size=capture_config.chunk_size,
+        )
 
-    def start_capture(self) -> Any:
-        import io, sys
-        self._stderr = io.StringIO()
-        self._stderr_original = sys.stderr
-        sys.stderr = self.TeeStream(self._stderr_original, self._stderr)
-        return self._stderr
-
-    def stop_capture(self) -> Any:
-        import sys
-        sys.stderr = self._stderr_original
-        return self._stderr
-
-    def setup_mysql(self):
-        from app import initialize
-        config = initialize()
-        self.mysql_client = MysqlClient(MysqlDbConfig(**config.db.mysql.model_dump()))
-
-    def destroy_mysql(self):
-        from app import initialize
-        initialize()
-        if self.mysql_client:
-            self.mysql_client.disconnect()
-        self.mysql_client = None
-
-    def get_task_job(self, task_id: str, request: Union[Request, Context] = None) -> TaskJob:
-        import json
-        from sqlalchemy import select
-        from sqlalchemy.exc import InvalidRequestError
-        from sqlalchemy.orm import Session
-        from sqlalchemy.orm.exc import UnmappedInstanceError
-        from uuid import UUID
-        from models.db.tasks import TaskJobStatusEnum
-
-        stmt = select(TaskJob).where(TaskJob.id == UUID(task_id))
-        session = Session(self.mysql_client.engine)
-        result = session.execute(stmt).fetchall()
+        start_capture(task_id, capture)
 
-        if result:
-            tj = result[0][0]
-        else:
-            tj = TaskJob()
+        return capture
 
-            if request.id:
-                tj.id = UUID(request.id)
+    @staticmethod
+    def stop_capture(task_id: str) -> Optional[OutputCapture]:
+        """Stops capturing the output of the given task, recording any captured output that hasn't been recorded yet."""
+        from lib.capture import stop_capture
+        return stop_capture(task_id)
 
-            if request.root_id:
-                tj.root_id = UUID(request.root_id)
+    @staticmethod
+    def subscribed(event_type: ALL_EVENTS_TYPE, task_name: Optional[str] = None) -> bool:
+        """Determines whether any notification configuration may apply to events of the given type and task name."""
+        from app import notifications
+        from lib.notifications.index import NotificationIndex
 
-            if request.parent_id:
-                tj.parent_id = UUID(request.parent_id)
+        if task_name in SILENT_TASKS:
+            return False
 
-            if hasattr(request, 'name') and request.name:
-                tj.name = request.name
+        return NotificationIndex.of(notifications).subscribed(event_type, task_name)
 
-            if hasattr(request, 'args') and isinstance(request.kwargs, list) and request.args:
-                tj.args = json.dumps(request.args)
-
-            if hasattr(request, 'kwargs') and isinstance(request.kwargs, dict) and request.kwargs:
-                tj.kwargs = json.dumps(request.kwargs)
+    @staticmethod
+    def notify(event: ALL_EVENTS):
+        """Dispatches the given notification event, which is handled in the background unless disabled."""
+        from loguru import logger
+        from app import notifier
 
-            tj.status = TaskJobStatusEnum.received
+        if getattr(event, 'task_name', None) in SILENT_TASKS:
+            return
 
         try:
-            session.expunge(tj)
-        except (InvalidRequestError, UnmappedInstanceError):
-            pass
-
-        session.close()
-
-        return tj
-
-    def save_task_job(self, task_job: TaskJob, create_activity: bool = True):
-        import json
-        from datetime import datetime
-        from sqlalchemy.exc import InvalidRequestError
-        from sqlalchemy.orm import Session
-        from sqlalchemy.orm.exc import UnmappedInstanceError
-        from models.db.tasks import TaskJobStatusEnum, TaskJobActivity
-
-        session = Session(self.mysql_client.engine)
-        session.add(task_job)
-
-        if task_job.status == TaskJobStatusEnum.running and task_job.started_at is None:
-            task_job.started_at = datetime.now()
-
-        elif (task_job.status in [TaskJobStatusEnum.success, TaskJobStatusEnum.failed, TaskJobStatusEnum.internal_error]
-              and task_job.started_at is not None):
-            task_job.ended_at = datetime.now()
-            task_job.runtime = abs((task_job.ended_at - task_job.started_at).total_seconds())
-
-        elif task_job.status == TaskJobStatusEnum.revoked and task_job.started_at is not None:
-            task_job.ended_at = datetime.now()
-            task_job.runtime = abs((task_job.ended_at - task_job.started_at).total_seconds())
-
-        if create_activity:
-            tja = TaskJobActivity()
-            tja.task_id = task_job.id
-            tja.status = task_job.status
-
-            try:
-                if task_job.status in [TaskJobStatusEnum.retry, TaskJobStatusEnum.failed]:
-                    tja.error = json.loads(task_job.errors)[-1]
-            except Exception:
-                pass
+            notifier.submit(event)
+        except Exception as e:
+            import traceback
+            logger.warning(e)
+            logger.warning(traceback.format_exception(type(e), e, e.__traceback__))
 
-            session.add(tja)
+    def record_task_job(self, transition: TaskJobTransition) -> TaskJobTransition:
+        """Records the given task job state transition, buffering it for a batched write if enabled, and returns it."""
+        from app import config, task_jobs
 
-        session.commit()
-        session.refresh(task_job)
+        # Status changes are recorded from the task event stream by the recorder process when it is enabled
+        if config.tasks.jobs.recorder and transition.status in TaskEventRecorder.statuses:
+            return transition
 
-        try:
-            session.expunge(task_job)
-        except (InvalidRequestError, UnmappedInstanceError):
-            pass
+        if config.tasks.jobs.write_behind:
+            task_jobs.put(transition)
+        else:
+            task_jobs.write([transition])
 
-        session.close()
+        return transition
 
     def task_received_handler(self, request: Request, **kwargs):
         from loguru import logger
-        from app import initialize, notifications
-        from lib.notifications import NotificationManager
+        from app import initialize
         from lib.notifications.events import TaskReceivedEvent
         from models.db.tasks import TaskJobStatusEnum
 
@@ -306,25 +266,22 @@ class SignalHandler:
 
         logger.debug(f'Task Received: Request: {request}')
 
-        self.setup_mysql()
+        self.record_task_job(TaskJobTransition.from_request(request, TaskJobStatusEnum.received))
 
-        if tj := self.get_task_job(request.id, request):
-            tj.status = TaskJobStatusEnum.received
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskReceivedEvent, request.name):
+            return
 
         event = TaskReceivedEvent(
             request=request,
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_revoked_handler(self, request: Context, terminated: bool, signum: int, expired: bool, **kwargs):
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskRevokedEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
@@ -334,16 +291,14 @@ class SignalHandler:
         logger.debug(
             f'Task Revoked: Request: {request}; Terminated: {terminated}; SigNum: {signum}; Expired: {expired}')
 
-        self.setup_mysql()
-
-        if tj := self.get_task_job(request.id, request):
-            tj.status = TaskJobStatusEnum.revoked
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(request, TaskJobStatusEnum.revoked))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', -2)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskRevokedEvent):
+            return
+
         event = TaskRevokedEvent(
             context=request,
             terminated=terminated,
@@ -352,104 +307,84 @@ class SignalHandler:
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_rejected_handler(self, message: str, exc: Exception, **kwargs):
         from loguru import logger
-        from app import initialize, notifications
-        from lib.notifications import NotificationManager
+        from app import initialize
         from lib.notifications.events import TaskRejectedEvent
 
         initialize()
 
         logger.debug(f'Task Rejected: {message}; Exception: {exc}')
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskRejectedEvent):
+            return
+
         event = TaskRejectedEvent(
             message=message,
             exception=exc,
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_pre_run_handler(self, task_id: str, task: Task, **kwargs):
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskPreRunEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
 
-        self.start_capture()
-
         initialize()
 
-        logger.debug(f'Task Pre-Run: Task ID: {task_id}; Task Name: {task.name}')
-
-        self.setup_mysql()
+        self.start_capture(task.request, task.name, task_id)
 
-        if tj := self.get_task_job(task_id, task.request):
-            tj.status = TaskJobStatusEnum.running
-            self.save_task_job(tj)
+        logger.debug(f'Task Pre-Run: Task ID: {task_id}; Task Name: {task.name}')
 
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(
+            task.request, TaskJobStatusEnum.running, name=task.name, task_id=task_id,
+        ))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', 2)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskPreRunEvent, task.name):
+            return
+
         event = TaskPreRunEvent(
             task=task,
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_post_run_handler(self, task_id: str, task: Task, **kwargs):
-        import json
         from loguru import logger
-        from app import initialize, notifications
-        from lib.notifications import NotificationManager
+        from app import initialize
         from lib.notifications.events import TaskPostRunEvent
 
         initialize()
 
         logger.debug(f'Task Post-Run: Task ID: {task_id}; Task Name: {task.name}')
 
-        stderr = self.stop_capture()
-
-        self.setup_mysql()
-
-        if tj := self.get_task_job(task_id, task.request):
-
-            output = None
-
-            if tj.output:
-                try:
-                    output = json.loads(tj.output)
-                except json.decoder.JSONDecodeError:
-                    pass
-
-            if not isinstance(output, list):
-                output = []
-
-            output.append(stderr.getvalue())
-            tj.output = json.dumps(output)
-
-            self.save_task_job(tj, False)
+        self.stop_capture(task_id)
 
-        self.destroy_mysql()
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskPostRunEvent, task.name):
+            return
 
         event = TaskPostRunEvent(
             task=task,
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_retry_handler(self, request: Context, reason: str, einfo: ExceptionInfo, **kwargs):
-        import json
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskRetryEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
@@ -458,30 +393,16 @@ class SignalHandler:
 
         logger.debug(f'Task Retry: Context: {request}; Reason: {reason};\n\nTraceback:\n\n{einfo.traceback}')
 
-        self.setup_mysql()
-
-        if tj := self.get_task_job(request.id, request):
-            tj.status = TaskJobStatusEnum.retry
-            tj.retries = request.retries
-
-            errors = None
-            if tj.output:
-                try:
-                    errors = json.loads(tj.errors)
-                except json.decoder.JSONDecodeError:
-                    pass
-            if not isinstance(errors, list):
-                errors = []
-            errors.append(str(einfo))
-            if errors:
-                tj.errors = json.dumps(errors)
-
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(
+            request, TaskJobStatusEnum.retry, retries=request.retries, error=str(einfo),
+        ))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', 3)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskRetryEvent):
+            return
+
         event = TaskRetryEvent(
             context=request,
             reason=reason,
@@ -489,12 +410,11 @@ class SignalHandler:
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_internal_error_handler(self, task_id: str, args, kwargs, request: Request, exception, traceback, einfo: ExceptionInfo, **kw):
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskInternalErrorEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
@@ -503,16 +423,16 @@ class SignalHandler:
 
         logger.debug(f'Task Internal Error: Task ID: {task_id}; Request: {request};\n\nTraceback:\n\n{einfo.traceback}')
 
-        self.setup_mysql()
-
-        if tj := self.get_task_job(task_id, request):
-            tj.status = TaskJobStatusEnum.internal_error
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(
+            request, TaskJobStatusEnum.internal_error, task_id=task_id,
+        ))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', -1)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskInternalErrorEvent, request.name):
+            return
+
         event = TaskInternalErrorEvent(
             request=request,
             exception=exception,
@@ -521,12 +441,11 @@ class SignalHandler:
         event.task_id = task_id
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_success_handler(self, sender, result: Any, **kwargs):
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskSuccessEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
@@ -535,30 +454,27 @@ class SignalHandler:
 
         logger.debug(f'Task Success: {sender.name}; Result: {result}')
 
-        self.setup_mysql()
-
-        if tj := self.get_task_job(sender.request.id, sender.request):
-            tj.status = TaskJobStatusEnum.success
-            tj.retries = sender.request.retries
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(
+            sender.request, TaskJobStatusEnum.success, name=sender.name, retries=sender.request.retries,
+        ))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', 4)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskSuccessEvent, sender.name):
+            return
+
         event = TaskSuccessEvent(
             task=sender,
             result=result,
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
 
     def task_failure_handler(self, sender, task_id: str, exception: Exception, args, kwargs, traceback, einfo: ExceptionInfo, **kw):
-        import json
         from loguru import logger
-        from app import initialize, notifications, zabbix
-        from lib.notifications import NotificationManager
+        from app import initialize, zabbix
         from lib.notifications.events import TaskFailedEvent
         from lib.services.zabbix import ZabbixMetric
         from models.db.tasks import TaskJobStatusEnum
@@ -567,30 +483,17 @@ class SignalHandler:
 
         logger.debug(f'Task Failure: {sender.name}; Task ID: {task_id};\n\nTraceback:\n\n{einfo.traceback};')
 
-        self.setup_mysql()
-
-        if tj := self.get_task_job(task_id, sender.request):
-            tj.status = TaskJobStatusEnum.failed
-            tj.retries = sender.request.retries
-
-            errors = None
-            if tj.output:
-                try:
-                    errors = json.loads(tj.errors)
-                except json.decoder.JSONDecodeError:
-                    pass
-            if not isinstance(errors, list):
-                errors = []
-            errors.append(str(einfo))
-            if errors:
-                tj.errors = json.dumps(errors)
-
-            self.save_task_job(tj)
-
-        self.destroy_mysql()
+        tj = self.record_task_job(TaskJobTransition.from_request(
+            sender.request, TaskJobStatusEnum.failed, name=sender.name, task_id=task_id,
+            retries=sender.request.retries, error=str(einfo),
+        ))
 
         zabbix.report([ZabbixMetric(f'task.{tj.name}.status', -1)])
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskFailedEvent, sender.name):
+            return
+
         event = TaskFailedEvent(
             task=sender,
             context=sender.request,
@@ -599,18 +502,12 @@ class SignalHandler:
         )
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        try:
-            NotificationManager(configs=notifications).handle_event(event)
-        except Exception as e:
-            import traceback
-            logger.warning(e)
-            logger.warning(traceback.format_exception(type(e), e, e.__traceback__))
+        self.notify(event)
 
     def task_unknown_handler(self, name: str, id: str, message: Message, exc: Exception, **kw):
         from loguru import logger
-        from app import initialize, notifications
+        from app import initialize
         from lib.enums import TaskEnum
-        from lib.notifications import NotificationManager
         from lib.notifications.events import TaskUnknownEvent
 
         initialize()
@@ -622,6 +519,10 @@ class SignalHandler:
         if name not in self._ignored_tasks:
             self.app.send_task(TaskEnum.PDA_ALERT.value, kwargs={'msg': msg, 'info': f'{message}\n\n{exc}'})
 
+        # Skip creating the event when no notification configuration is subscribed to it
+        if not self.subscribed(TaskUnknownEvent, name):
+            return
+
         event = TaskUnknownEvent(
             message=message,
             exception=exc,
@@ -630,4 +531,137 @@ class SignalHandler:
         event.task_name = name
 
         # TODO: Implement a way to handle mailing tasks to prevent infinite recursion
-        NotificationManager(configs=notifications).handle_event(event)
+        self.notify(event)
+
+
+class TaskEventRecorder:
+    """
+    Records task job state transitions from the Celery task event stream in a process separate from the workers, so
+    that a slow or unavailable database never holds up task execution.
+    """
+
+    app: Celery
+    """The Celery app instance whose broker task events are consumed from."""
+
+    node_id: str
+    """The name of the event queue. Recorders sharing a name share one queue and split the events between them."""
+
+    statuses: tuple[TaskJobStatusEnum, ...] = (
+        TaskJobStatusEnum.received, TaskJobStatusEnum.running, TaskJobStatusEnum.success, TaskJobStatusEnum.failed,
+        TaskJobStatusEnum.retry, TaskJobStatusEnum.revoked,
+    )
+    """The task job statuses that are recorded from task events rather than by the workers."""
+
+    _receiver = None
+
+    def __init__(self, app: Celery, node_id: str):
+        self.app = app
+        self.node_id = node_id
+        self._receiver = None
+
+    @property
+    def handlers(self) -> dict[str, Callable[[dict], None]]:
+        """The task event handlers keyed by event type."""
+        return {
+            'task-sent': self.task_sent_handler,
+            'task-received': self.task_received_handler,
+            'task-started': self.task_started_handler,
+            'task-succeeded': self.task_succeeded_handler,
+            'task-failed': self.task_failed_handler,
+            'task-retried': self.task_retried_handler,
+            'task-revoked': self.task_revoked_handler,
+        }
+
+    def run(self):
+        """Consumes task events until stopped, reconnecting to the broker whenever the connection is lost."""
+        from loguru import logger
+
+        with self.app.connection_for_read() as connection:
+            self._receiver = self.app.events.Receiver(
+                connection,
+                handlers=self.handlers,
+                node_id=self.node_id,
+                accept={self.app.conf.event_serializer, 'json'},
+            )
+
+            logger.info(f'Recording task events from queue: {self._receiver.queue.name}')
+
+            self._receiver.run(wakeup=True)
+
+    def stop(self):
+        """Stops consuming task events once the event being processed (if any) has been handled."""
+        if self._receiver is not None:
+            self._receiver.should_stop = True
+
+    def record(self, transition: TaskJobTransition):
+        """Records the given task job state transition, buffering it for a batched write if enabled."""
+        from app import config, task_jobs
+
+        if config.tasks.jobs.write_behind:
+            task_jobs.put(transition)
+        else:
+            task_jobs.write([transition])
+
+    def transition(self, event: dict, status: Optional[TaskJobStatusEnum] = None, **kwargs) -> TaskJobTransition:
+        """Creates a task job transition from the given task event."""
+        from datetime import datetime
+
+        return TaskJobTransition(
+            event['uuid'],
+            status,
+            timestamp=datetime.fromtimestamp(event['timestamp']) if event.get('timestamp') else None,
+            **kwargs,
+        )
+
+    def task_sent_handler(self, event: dict):
+        # The task job is created from the published message, but its status is left to the worker events
+        self.record(self.transition(event, **self._request(event)))
+
+    def task_received_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.received, **self._request(event)))
+
+    def task_started_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.running))
+
+    def task_succeeded_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.success))
+
+    def task_failed_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.failed, error=self._error(event)))
+
+    def task_retried_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.retry, error=self._error(event)))
+
+    def task_revoked_handler(self, event: dict):
+        self.record(self.transition(event, TaskJobStatusEnum.revoked))
+
+    @classmethod
+    def _request(cls, event: dict) -> dict:
+        """Returns the task job details published with task sent and received events."""
+        return {
+            'name': event.get('name'),
+            'root_id': event.get('root_id'),
+            'parent_id': event.get('parent_id'),
+            'args': cls._literal(event.get('args')),
+            'kwargs': cls._literal(event.get('kwargs')),
+            'retries': event.get('retries'),
+        }
+
+    @staticmethod
+    def _error(event: dict) -> Optional[str]:
+        """Returns the exception and traceback of a task failed or retried event."""
+        error = '\n\n'.join(v for v in (event.get('exception'), event.get('traceback')) if v)
+        return error or None
+
+    @staticmethod
+    def _literal(value: Any) -> Any:
+        """Returns the value of the given task argument representation, or None if it is truncated or not a literal."""
+        import ast
+
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
@@ -1,3 +1,5 @@
+from typing import Optional
+from lib.enums import ThrottleAlgorithmEnum
 from models.base import BaseConfig
 
 
@@ -8,11 +10,12 @@ class ApiConfig(BaseConfig):
         class ApiRuntimeInitConfig(BaseConfig):
             repeat: bool = False
             repeat_interval: float = 300
-            repeat_recovery_interval: float = 300
             init_db: bool = False
             repeat_db: bool = False
-            repeat_db_interval: float = 300
-            repeat_db_recovery_interval: float = 300
+            watch_debounce: float = 0.25
+            poll: bool = True
+            broadcast: bool = False
+            broadcast_channel: str = 'pda:config:version'
 
         init: ApiRuntimeInitConfig
 
@@ -33,5 +36,17 @@ class ApiConfig(BaseConfig):
                                               description='Provides task execution and monitoring features'),
                 ]
 
+    class ApiRateLimitConfig(BaseConfig):
+        class ApiRouteRateLimitConfig(BaseConfig):
+            enabled: bool = True
+            calls: Optional[int] = None
+            period: Optional[float] = None
+            per_client: Optional[bool] = None
+            algorithm: Optional[ThrottleAlgorithmEnum] = None
+
+        enabled: bool = True
+        routes: dict[str, ApiRouteRateLimitConfig] = {}
+
     metadata: ApiMetadataConfig
     runtime: ApiRuntimeConfig
+    rate_limits: ApiRateLimitConfig
@@ -1,6 +1,26 @@
+from enum import Enum
+from typing import Optional
 from models.base import BaseConfig
 
 
+class WorkerPoolEnum(str, Enum):
+    """Defines the supported Celery worker pool implementations."""
+    prefork = 'prefork'
+    """Runs tasks in forked child processes."""
+
+    threads = 'threads'
+    """Runs tasks in a pool of threads within the worker process."""
+
+    gevent = 'gevent'
+    """Runs tasks in gevent green threads within the worker process."""
+
+    eventlet = 'eventlet'
+    """Runs tasks in eventlet green threads within the worker process."""
+
+    solo = 'solo'
+    """Runs tasks one at a time within the worker process."""
+
+
 class CeleryConfig(BaseConfig):
     """A model that represents a configuration hierarchy for the Celery app."""
 
@@ -10,5 +30,17 @@ class CeleryConfig(BaseConfig):
     class BackendConfig(BaseConfig):
         url: str = 'redis://redis:6379/0'
 
+    class WorkerConfig(BaseConfig):
+        pool: WorkerPoolEnum = WorkerPoolEnum.prefork
+        """
+        The pool that worker tasks are executed in. Thread and green thread pools run many I/O-bound tasks in one
+        process. The gevent and eventlet pools must also be selected with the worker -P option so that Celery can
+        patch the standard library before the app is loaded.
+        """
+
+        concurrency: Optional[int] = None
+        """The number of tasks executed concurrently, which defaults to the number of CPUs."""
+
     broker: BrokerConfig
     backend: BackendConfig
+    worker: WorkerConfig
@@ -1,4 +1,5 @@
 from typing import Optional
+from lib.enums import ThrottleAlgorithmEnum
 from models.base import BaseConfig
 
 
@@ -9,12 +10,13 @@ class MailConfig(BaseConfig):
         class MailServerThrottle(BaseConfig):
             threshold: int = 5
             period: float = 30
-            mode: str = 'sleep' # sleep or raise
+            mode: str = 'sleep'  # sleep or raise
             key: Optional[str] = None
-            backoff_strategy: str = 'fixed' # fixed or exponential
+            backoff_strategy: str = 'fixed'  # fixed or exponential
             backoff_base: float = 1.0
             backoff_cap: float = 60.0
             jitter: bool = False
+            algorithm: ThrottleAlgorithmEnum = ThrottleAlgorithmEnum.SLIDING_WINDOW
 
         alias: str
         host: str
@@ -8,6 +8,63 @@ class NotificationsConfig(BaseConfig):
         """Provides an abstract class for notification services to inherent from."""
         enabled: bool = False
 
+        concurrency: int = 4
+        """The maximum number of notifications sent through the service at once."""
+
+        max_pending: int = 100
+        """The maximum number of notifications waiting to be sent through the service before more are discarded."""
+
+        timeout: float = 30.0
+        """The number of seconds to wait on the service when sending a notification."""
+
+    class MsTeamsServiceConfig(NotificationServiceConfig):
+        """Provides the Microsoft Teams notification service settings."""
+
+        retries: int = 3
+        """The number of times a webhook request is retried after a rate limited (429) or server error response."""
+
+        retry_backoff: float = 0.5
+        """The base number of seconds to back off between webhook request retries, doubling with each further retry."""
+
+    class NotificationDispatchConfig(BaseConfig):
+        background: bool = True
+        """Whether notification events are dispatched from a background thread rather than by their source."""
+
+        max_pending: int = 1000
+        """The maximum number of notification events waiting to be dispatched before more are discarded."""
+
+    class NotificationSuppressionConfig(BaseConfig):
+        enabled: bool = True
+        """Whether duplicate notifications to a recipient are suppressed and folded into a digest notification."""
+
+        window: float = 300.0
+        """The number of seconds after a notification is sent that duplicates of it are suppressed."""
+
+    class NotificationOutboxConfig(BaseConfig):
+        enabled: bool = False
+        """Whether notifications are queued in the database outbox and sent by delivery workers rather than directly."""
+
+        batch_size: int = 100
+        """The maximum number of notifications a delivery worker claims at once."""
+
+        poll_interval: float = 1.0
+        """The number of seconds a delivery worker waits before checking an empty outbox again."""
+
+        max_attempts: int = 5
+        """The number of delivery attempts made before a notification is marked as failed."""
+
+        retry_backoff: float = 30.0
+        """The number of seconds before a failed notification is retried, doubling with each further attempt."""
+
+        retry_backoff_cap: float = 3600.0
+        """The maximum number of seconds before a failed notification is retried."""
+
+        claim_timeout: float = 300.0
+        """The number of seconds after which a notification claimed by a delivery worker that stopped is reclaimed."""
+
     mail: NotificationServiceConfig
-    microsoft_teams: NotificationServiceConfig
+    microsoft_teams: MsTeamsServiceConfig
     twilio: NotificationServiceConfig
+    dispatch: NotificationDispatchConfig
+    suppression: NotificationSuppressionConfig
+    outbox: NotificationOutboxConfig
@@ -29,6 +29,19 @@ class ServicesConfig(BaseConfig):
             faxes: bool = False
 
         api: TwilioApiConfig
+
+        base_url: Optional[str] = None
+        """Overrides the base URL of the Twilio REST API, such as to send to a local Twilio API stand-in."""
+
+        status_lookup: bool = True
+        """Whether the delivery status of sent messages is looked up and logged by a deferred task."""
+
+        status_delay: float = 10
+        """The number of seconds after sending that the delivery status of sent messages is looked up."""
+
+        status_attempts: int = 4
+        """The number of times the delivery status of a message is looked up while its delivery is pending."""
+
         numbers: list[TwilioNumberConfig]
 
     class ZabbixConfig(BaseConfig):
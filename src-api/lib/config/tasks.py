@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 from models.base import BaseConfig
 
 
@@ -20,5 +20,48 @@ class TasksConfig(BaseConfig):
         tick_interval: int = 30
         max_schedule_lifetime: int = 30
 
+    class TaskJobsConfig(BaseConfig):
+        write_behind: bool = True
+        """Whether task job transitions are buffered and written in batches by a background thread."""
+
+        flush_interval: float = 0.25
+        """The maximum number of seconds a buffered transition waits before being written."""
+
+        batch_size: int = 500
+        """The number of buffered transitions that triggers an immediate write."""
+
+        max_pending: int = 10000
+        """The maximum number of buffered transitions before producers are blocked until they are written."""
+
+        write_attempts: int = 5
+        """
+        The number of attempts to write a batch that fails for reasons other than a lost database connection, after
+        which its transitions are written individually and those that still fail are discarded.
+        """
+
+        spool_path: Optional[str] = None
+        """A file that transitions which could not be written at shutdown are saved to and replayed from."""
+
+        recorder: bool = False
+        """Whether task job statuses are recorded from Celery task events by the recorder process instead of workers."""
+
+        recorder_queue: str = 'pda.recorder'
+        """The name of the task event queue shared by recorder processes, which split the events between them."""
+
+    class TaskCaptureConfig(BaseConfig):
+        enabled: bool = True
+        """Whether the STDERR output of task jobs is captured and recorded."""
+
+        max_size: int = 1048576
+        """The maximum number of characters recorded from the start of the output of a task job run."""
+
+        tail_size: int = 65536
+        """The number of most recent characters recorded once the output of a run exceeds the maximum size."""
+
+        chunk_size: int = 8192
+        """The number of characters of output buffered in memory before they are recorded as one chunk."""
+
     enabled: bool = True
     scheduler: TaskSchedulerConfig
+    jobs: TaskJobsConfig
+    capture: TaskCaptureConfig
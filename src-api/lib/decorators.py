@@ -1,3 +1,4 @@
+import asyncio
 import random
 import redis.exceptions
 import threading
@@ -5,6 +6,7 @@ import time
 from collections import deque
 from functools import wraps
 from loguru import logger
+from lib.enums import ThrottleAlgorithmEnum
 
 
 class ThrottleException(Exception):
@@ -19,6 +21,9 @@ _registry_lock = threading.Lock()
 
 class registry:
     _redis_client = None
+    _async_redis_client = None
+    _scripts = {}
+    _async_scripts = {}
 
     @classmethod
     def get_redis_client(cls):
@@ -37,6 +42,28 @@ class registry:
                 raise
         return cls._redis_client
 
+    @classmethod
+    def get_script(cls, source: str):
+        """Returns the given Lua script registered once per process, which is loaded into Redis on first use."""
+        if source not in cls._scripts:
+            cls._scripts[source] = cls.get_redis_client().register_script(source)
+        return cls._scripts[source]
+
+    @classmethod
+    def get_async_redis_client(cls):
+        """Returns the asyncio Redis client instance, which connects on first use."""
+        if cls._async_redis_client is None:
+            from app import aredis
+            cls._async_redis_client = aredis
+        return cls._async_redis_client
+
+    @classmethod
+    def get_async_script(cls, source: str):
+        """Returns the given Lua script registered once per process with the asyncio Redis client."""
+        if source not in cls._async_scripts:
+            cls._async_scripts[source] = cls.get_async_redis_client().register_script(source)
+        return cls._async_scripts[source]
+
 
 def throttle(
         calls: int,
@@ -226,6 +253,139 @@ def throttle_burst(
     return decorator
 
 
+THROTTLE_ALGORITHMS = tuple(a.value for a in ThrottleAlgorithmEnum)
+""" The algorithms that Redis throttles can admit calls with. """
+
+THROTTLE_KEY_PREFIXES = {
+    ThrottleAlgorithmEnum.SLIDING_WINDOW: 'throttle:window:',
+    ThrottleAlgorithmEnum.GCRA: 'throttle:gcra:',
+}
+""" The prefixes of the Redis keys that throttle state is stored under, keyed by algorithm. """
+
+THROTTLE_ATTEMPT_KEY_PREFIX = 'throttle:attempts:'
+""" The prefix of the Redis keys that the consecutive throttled attempts of a throttle key are counted under. """
+
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local period = tonumber(ARGV[1])
+local calls = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', string.format('%.0f', now - period))
+local count = redis.call('ZCARD', KEYS[1])
+
+if count < calls then
+    redis.call('ZADD', KEYS[1], string.format('%.0f', now), ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(period / 1000))
+    redis.call('DEL', KEYS[2])
+    return {1, 0, 0}
+end
+
+local oldest = redis.call('ZRANGE', KEYS[1], count - calls, count - calls, 'WITHSCORES')
+local wait = math.max(tonumber(oldest[2]) + period - now, 0)
+local attempt = redis.call('INCR', KEYS[2])
+redis.call('PEXPIRE', KEYS[2], math.ceil(math.max(wait, period) / 1000) + 5000)
+
+return {0, string.format('%.0f', wait), attempt}
+"""
+""" Admits a call within a sliding window log of the calls made, or returns the microseconds until a call clears. """
+
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local period = tonumber(ARGV[1])
+local interval = period / tonumber(ARGV[2])
+
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or 0), now) + interval
+local allow_at = tat - period
+
+if now >= allow_at then
+    redis.call('SET', KEYS[1], string.format('%.0f', tat), 'PX', math.ceil((tat - now) / 1000))
+    redis.call('DEL', KEYS[2])
+    return {1, 0, 0}
+end
+
+local wait = allow_at - now
+local attempt = redis.call('INCR', KEYS[2])
+redis.call('PEXPIRE', KEYS[2], math.ceil(math.max(wait, period) / 1000) + 5000)
+
+return {0, string.format('%.0f', wait), attempt}
+"""
+"""
+Admits a call with the generic cell rate algorithm, which stores only the theoretical arrival time of the next call,
+or returns the microseconds until a call would conform.
+"""
+
+
+def redis_throttle_acquire(r, key: str, calls: int, period: float,
+                           algorithm: ThrottleAlgorithmEnum = ThrottleAlgorithmEnum.SLIDING_WINDOW
+                           ) -> tuple[bool, float, int]:
+    """
+    Attempts to admit a call of the given throttle key with a single atomic script round trip to Redis, using the
+    Redis server time so that every process shares the same clock.
+
+    Returns:
+        Whether the call was admitted, the exact seconds until a call would be admitted if not, and the number of
+        consecutive throttled attempts of the key.
+    """
+    import uuid
+
+    if algorithm not in THROTTLE_ALGORITHMS:
+        raise ValueError(f'Unknown throttle algorithm: {algorithm}')
+
+    source = GCRA_SCRIPT if algorithm == ThrottleAlgorithmEnum.GCRA else SLIDING_WINDOW_SCRIPT
+    script = registry.get_script(source)
+    keys = [THROTTLE_KEY_PREFIXES[algorithm] + key, THROTTLE_ATTEMPT_KEY_PREFIX + key]
+    args = [int(period * 1000000), calls]
+
+    if algorithm == ThrottleAlgorithmEnum.SLIDING_WINDOW:
+        args.append(uuid.uuid4().hex)
+
+    allowed, wait, attempt = script(keys=keys, args=args, client=r)
+
+    return bool(allowed), int(wait) / 1000000, int(attempt)
+
+
+async def async_redis_throttle_acquire(r, key: str, calls: int, period: float,
+                                       algorithm: ThrottleAlgorithmEnum = ThrottleAlgorithmEnum.SLIDING_WINDOW
+                           ) -> tuple[bool, float, int]:
+    """The awaitable variant of redis_throttle_acquire using an asyncio Redis client."""
+    import uuid
+
+    if algorithm not in THROTTLE_ALGORITHMS:
+        raise ValueError(f'Unknown throttle algorithm: {algorithm}')
+
+    source = GCRA_SCRIPT if algorithm == ThrottleAlgorithmEnum.GCRA else SLIDING_WINDOW_SCRIPT
+    script = registry.get_async_script(source)
+    keys = [THROTTLE_KEY_PREFIXES[algorithm] + key, THROTTLE_ATTEMPT_KEY_PREFIX + key]
+    args = [int(period * 1000000), calls]
+
+    if algorithm == ThrottleAlgorithmEnum.SLIDING_WINDOW:
+        args.append(uuid.uuid4().hex)
+
+    allowed, wait, attempt = await script(keys=keys, args=args, client=r)
+
+    return bool(allowed), int(wait) / 1000000, int(attempt)
+
+
+def throttle_backoff(wait: float, attempt: int, backoff_strategy: str = 'fixed', backoff_base: float = 1.0,
+                     backoff_cap: float = 60.0, jitter: bool = False) -> float:
+    """Returns the seconds to back off for after the given throttled attempt, no less than the given wait time."""
+    if backoff_strategy == 'fixed':
+        base_wait_calculated = backoff_base
+    elif backoff_strategy == 'exponential':
+        base_wait_calculated = min(float(backoff_base) * (2 ** max(attempt - 1, 0)), backoff_cap)
+    else:
+        raise ValueError(f'Unknown backoff_strategy: {backoff_strategy}')
+
+    wait = max(base_wait_calculated, wait)
+
+    if jitter:
+        wait += random.uniform(0, 1)
+
+    return wait
+
+
 def redis_throttle(
         calls: int,
         period: float,
@@ -236,11 +396,14 @@ def redis_throttle(
         backoff_cap: float = 60.0,  # max seconds for backoff
         jitter=False,  # True = apply random jitter
         key=None,
+        algorithm=ThrottleAlgorithmEnum.SLIDING_WINDOW,  # 'sliding_window' or 'gcra'
 ):
     """
     A throttling decorator that uses Redis for cross-process/thread synchronization.
 
-    Throttle with backoff support.
+    Throttle with backoff support. Each admit or deny decision is made by a single atomic Lua script round trip, so
+    concurrent callers sharing a key never retry on contention, and throttled callers learn the exact time until a
+    call would be admitted.
 
     Args:
         calls: Max calls in period
@@ -251,11 +414,12 @@ def redis_throttle(
         backoff_cap: max backoff seconds
         jitter: add random 0-1s to backoff if True
         key: group key or key function
+        algorithm: 'sliding_window' for a log of the calls in the period, or 'gcra' to space calls evenly across the
+            period while allowing bursts of up to the max calls
     """
 
-    # Define Redis keys structure
-    HISTORY_KEY_PREFIX = "throttle:history:"
-    ATTEMPT_KEY_PREFIX = "throttle:attempts:"
+    if algorithm not in THROTTLE_ALGORITHMS:
+        raise ValueError(f'Unknown throttle algorithm: {algorithm}')
 
     def decorator(func):
         # Default group key
@@ -269,121 +433,267 @@ def redis_throttle(
             # Resolve the dynamic key if necessary
             resolved_key = group_key(args, kwargs) if callable(group_key) else group_key
 
-            # Specific keys for this function call
-            history_key = HISTORY_KEY_PREFIX + resolved_key
-            attempts_key = ATTEMPT_KEY_PREFIX + resolved_key
+            while True:
+                allowed, wait, attempt = redis_throttle_acquire(r, resolved_key, calls, period, algorithm)
+
+                if allowed:
+                    break
+
+                if mode == 'raise':
+                    raise ThrottleException(f"Exceeded {calls} calls in {period}s for key '{resolved_key}'.")
+
+                if mode != 'sleep':
+                    raise ValueError(f"Unknown mode: {mode}")
+
+                backoff = throttle_backoff(wait, attempt, backoff_strategy, backoff_base, backoff_cap, jitter)
+
+                logger.warning(
+                    f'[{resolved_key}] Backing off for {backoff:.2f}s (attempt {attempt}, min_to_clear: {wait:.2f}s)')
+
+                time.sleep(backoff)
+
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _throttle_acquire(resolved_key, calls: int, period: float) -> tuple[bool, float, int]:
+    """
+    Attempts to admit a call of the given key within the in-process sliding window shared with `throttle`, returning
+    whether it was admitted, the seconds until the oldest call clears if not, and the consecutive throttled attempts.
+    """
+    now = time.monotonic()
+
+    with _registry_lock:
+        if resolved_key not in _throttle_registry:
+            _throttle_registry[resolved_key] = (threading.Lock(), deque(), 0)
+
+        lock, history, current_attempt = _throttle_registry[resolved_key]
+
+        with lock:
+            while history and (now - history[0]) > period:
+                history.popleft()
+
+            if len(history) < calls:
+                history.append(now)
+                _throttle_registry[resolved_key] = (lock, history, 0)
+                return True, 0, 0
+
+            _throttle_registry[resolved_key] = (lock, history, current_attempt + 1)
+
+            return False, max(period - (now - history[0]), 0), current_attempt + 1
+
+
+def _throttle_burst_acquire(resolved_key, max_tokens: int, refill_rate: float) -> tuple[bool, float]:
+    """
+    Attempts to take a token of the given key from the in-process bucket shared with `throttle_burst`, returning
+    whether one was taken and the seconds until a token is refilled if not.
+    """
+    with _registry_lock:
+        if resolved_key not in _throttle_registry:
+            _throttle_registry[resolved_key] = {
+                'lock': threading.Lock(),
+                'tokens': max_tokens,
+                'last_refill': time.monotonic()
+            }
+        state = _throttle_registry[resolved_key]
+
+    with state['lock']:
+        now = time.monotonic()
+        refill = (now - state['last_refill']) * refill_rate
+        if refill > 0:
+            state['tokens'] = min(max_tokens, state['tokens'] + refill)
+            state['last_refill'] = now
+
+        if state['tokens'] >= 1:
+            state['tokens'] -= 1
+            return True, 0
+
+        return False, (1 - state['tokens']) / refill_rate if refill_rate > 0 else 0
+
+
+def async_throttle(
+        calls: int,
+        period: float,
+        *,
+        mode='sleep',
+        key=None,
+        backoff_strategy='fixed',  # 'fixed' or 'exponential'
+        backoff_base: float = 1.0,  # base seconds for backoff
+        backoff_cap: float = 60.0,  # max seconds for backoff
+        jitter=False  # True = apply random jitter
+):
+    """
+    The awaitable variant of `throttle` for coroutine functions, which backs off with `asyncio.sleep` so that the
+    event loop is never blocked. Calls share the in-process history of synchronous calls with the same key.
+
+    Args:
+        calls: Max calls in period
+        period: Time window (s)
+        mode: 'sleep' or 'raise'
+        key: group key or key function
+        backoff_strategy: 'fixed' or 'exponential'
+        backoff_base: base backoff seconds
+        backoff_cap: max backoff seconds
+        jitter: add random 0-1s to backoff if True
+    """
+
+    def decorator(func):
+        group_key = key or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            resolved_key = group_key(args, kwargs) if callable(group_key) else group_key
 
             while True:
-                # Use server time from Redis for consistency across processes
-                now = r.time()[0]
-                wait = 0
+                allowed, wait, attempt = _throttle_acquire(resolved_key, calls, period)
 
-                # Use a Redis pipeline/transaction for atomic operations within the while loop iteration
-                with r.pipeline() as pipe:
-                    try:
-                        pipe.watch(history_key, attempts_key)
+                if allowed:
+                    break
 
-                        # 1. Clean up old history and get current count
-                        # Use ZREMRANGEBYSCORE to remove timestamps older than (now - period)
-                        min_score_to_keep = now - period
-                        pipe.zremrangebyscore(history_key, 0, min_score_to_keep)
+                if mode == 'raise':
+                    raise ThrottleException(f"Exceeded {calls} calls in {period}s for key '{resolved_key}'.")
 
-                        # Get current number of calls remaining in the window
-                        current_calls = pipe.zcard(history_key)
+                if mode != 'sleep':
+                    raise ValueError(f"Unknown mode: {mode}")
 
-                        # Get the current attempt count (for backoff calculation)
-                        current_attempt_str = pipe.get(attempts_key)
-                        current_attempt = int(current_attempt_str) if current_attempt_str else 0
+                backoff = throttle_backoff(wait, attempt, backoff_strategy, backoff_base, backoff_cap, jitter)
 
-                        # 2. Check if we are clear to call the function
-                        if current_calls < calls:
-                            # Use MULTI/EXEC block for atomic update
-                            pipe.multi()
-                            # Add the current timestamp to the sorted set (score=timestamp, member=unique_id)
-                            # Using 'now' as member is problematic if multiple calls happen in the same second.
-                            # Use a UUID or an index, but for simplicity here we assume time precision is enough
-                            # Or better, just use ZADD if Redis version >= 6.2 supports ZADD NX/CH
-
-                            # Simple ZADD with a unique member (e.g., now.timestamp + random)
-                            member_id = f"{now}:{random.random()}"
-                            pipe.zadd(history_key, {member_id: now})
-
-                            # Set the key to expire to prevent indefinite growth if the application stops
-                            pipe.expire(history_key, int(period + 5))  # Set TTL slightly longer than the period
-
-                            # Reset attempts counter on success
-                            pipe.delete(attempts_key)
-
-                            # Execute the pipeline
-                            pipe.execute()
-                            break  # Exit while loop to run func
+                logger.warning(
+                    f'[{resolved_key}] Backing off for {backoff:.2f}s (attempt {attempt}, min_to_clear: {wait:.2f}s)')
 
-                        else:
-                            # 3. Throttled: calculate backoff logic (while loop continues after sleep)
-                            if mode == 'raise':
-                                raise ThrottleException(
-                                    f"Exceeded {calls} calls in {period}s for key '{resolved_key}'.")
+                await asyncio.sleep(backoff)
 
-                            elif mode == 'sleep':
-                                # Time until the oldest entry clears
-                                # We need the score of the oldest entry, which is the first one in the sorted set
-                                # ZRANGE returns members, we need ZRANGE with WITHSCORES to get the time back
-                                # The above pipeline didn't fetch the oldest time explicitly. Let's adjust the logic slightly
-
-                                # We can rely on ZREMRANGEBYSCORE keeping the set minimal.
-                                # To get the oldest time without another call, we'd need a more complex WATCH/MULTI block
-                                # Let's assume we can get it in a separate step if we fail the 'if current_calls < calls' check
-
-                                # Exit pipeline context temporarily to get the oldest time reliably if throttled
-                                pass
-
-                    except redis.exceptions.WatchError:
-                        # If the key was modified by another client during our watch, restart the while loop iteration
-                        logger.warning(f"WatchError on key {resolved_key}. Retrying throttle check.")
-                        continue  # continue the while loop
-
-                # Logic that happens OUTSIDE the Redis WATCH/MULTI block but still within the while True loop (if throttled)
-                if current_calls >= calls and mode == 'sleep':
-                    # We need the timestamp of the *oldest* item currently in the list to calculate time_until_first_clears
-                    # Since we are outside the atomic block, we run one more redis command.
-                    # This is safe because even if it changes, our calculation will lead to a 'sleep' that ends up re-evaluating correctly.
-                    oldest_entry = r.zrange(history_key, 0, 0, withscores=True)
-                    if oldest_entry:
-                        oldest_time = oldest_entry[0][1]  # (member_id, timestamp)
-                        time_until_first_clears = period - (now - oldest_time)
-                        if time_until_first_clears < 0: time_until_first_clears = 0  # Safety check
-
-                        if backoff_strategy == 'fixed':
-                            base_wait_calculated = backoff_base
-                        elif backoff_strategy == 'exponential':
-                            base_wait_calculated = min(float(backoff_base) * (2 ** current_attempt), backoff_cap)
-                        else:
-                            raise ValueError(f'Unknown backoff_strategy: {backoff_strategy}')
+            return await func(*args, **kwargs)
 
-                        wait = max(base_wait_calculated, time_until_first_clears)
+        return wrapper
 
-                        if jitter:
-                            wait += random.uniform(0, 1)
+    return decorator
 
-                        # Increment the attempt counter *in Redis* for the next loop iteration
-                        # Use INCR for atomicity
-                        new_attempt = r.incr(attempts_key)
-                        # Set a TTL for the attempt counter just in case
-                        r.expire(attempts_key, int(max(wait, period) + 5))
 
-                        logger.warning(
-                            f'[{resolved_key}] Backing off for {wait:.2f}s (attempt {new_attempt}, min_to_clear: {time_until_first_clears:.2f}s)')
+def async_throttle_burst(
+        max_tokens: int,
+        refill_rate: float,
+        *,
+        mode='sleep',
+        key=None,
+        backoff_strategy='fixed',
+        backoff_base=1.0,
+        backoff_cap=60.0,
+        jitter=False
+):
+    """
+    The awaitable variant of `throttle_burst` for coroutine functions, which backs off with `asyncio.sleep` so that
+    the event loop is never blocked. Calls share the in-process bucket of synchronous calls with the same key.
 
-                        # Sleep happens outside any Redis interaction
-                        time.sleep(wait)
-                        # Loop restarts, fetches new time, and re-evaluates
-                    else:
-                        # Should theoretically not happen if zcard >= calls, but as a safeguard:
-                        time.sleep(1)
-                        continue
+    Args:
+        max_tokens: burst capacity
+        refill_rate: tokens per second
+        mode: 'sleep' or 'raise'
+        key: shared group key or key function
+        backoff_strategy: 'fixed' or 'exponential'
+        backoff_base: base backoff seconds
+        backoff_cap: max backoff seconds
+        jitter: add random jitter if True
+    """
 
-            # Only reached via the 'break' statement in the success path
-            return func(*args, **kwargs)
+    def decorator(func):
+        group_key = key or f"{func.__module__}.{func.__qualname__}"
+        backoff_state = {}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            resolved_key = group_key(args, kwargs) if callable(group_key) else group_key
+
+            while True:
+                allowed, wait = _throttle_burst_acquire(resolved_key, max_tokens, refill_rate)
+
+                if allowed:
+                    backoff_state[resolved_key] = 0
+                    return await func(*args, **kwargs)
+
+                if mode == 'raise':
+                    raise ThrottleException(f"Throttled: {resolved_key}")
+
+                if mode != 'sleep':
+                    raise ValueError(f"Unknown mode: {mode}")
+
+                attempt = backoff_state.get(resolved_key, 0) + 1
+                backoff_state[resolved_key] = attempt
+                backoff = throttle_backoff(wait, attempt, backoff_strategy, backoff_base, backoff_cap, jitter)
+
+                logger.warning(f'[{resolved_key}] Backing off for {backoff:.2f}s (attempt {attempt})')
+
+                await asyncio.sleep(backoff)
+
+        return wrapper
+
+    return decorator
+
+
+def async_redis_throttle(
+        calls: int,
+        period: float,
+        *,
+        mode='sleep',
+        backoff_strategy='fixed',  # 'fixed' or 'exponential'
+        backoff_base: float = 1.0,  # base seconds for backoff
+        backoff_cap: float = 60.0,  # max seconds for backoff
+        jitter=False,  # True = apply random jitter
+        key=None,
+        algorithm=ThrottleAlgorithmEnum.SLIDING_WINDOW,  # 'sliding_window' or 'gcra'
+):
+    """
+    The awaitable variant of `redis_throttle` for coroutine functions, which makes its decisions with the asyncio
+    Redis client and backs off with `asyncio.sleep` so that the event loop is never blocked. Calls share the Redis
+    throttle state of synchronous calls with the same key and algorithm across every process.
+
+    Args:
+        calls: Max calls in period
+        period: Time window (s)
+        mode: 'sleep' or 'raise'
+        backoff_strategy: 'fixed' or 'exponential'
+        backoff_base: base backoff seconds
+        backoff_cap: max backoff seconds
+        jitter: add random 0-1s to backoff if True
+        key: group key or key function
+        algorithm: 'sliding_window' or 'gcra'
+    """
+
+    if algorithm not in THROTTLE_ALGORITHMS:
+        raise ValueError(f'Unknown throttle algorithm: {algorithm}')
+
+    def decorator(func):
+        group_key = key or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            r = registry.get_async_redis_client()
+
+            resolved_key = group_key(args, kwargs) if callable(group_key) else group_key
+
+            while True:
+                allowed, wait, attempt = await async_redis_throttle_acquire(r, resolved_key, calls, period, algorithm)
+
+                if allowed:
+                    break
+
+                if mode == 'raise':
+                    raise ThrottleException(f"Exceeded {calls} calls in {period}s for key '{resolved_key}'.")
+
+                if mode != 'sleep':
+                    raise ValueError(f"Unknown mode: {mode}")
+
+                backoff = throttle_backoff(wait, attempt, backoff_strategy, backoff_base, backoff_cap, jitter)
+
+                logger.warning(
+                    f'[{resolved_key}] Backing off for {backoff:.2f}s (attempt {attempt}, min_to_clear: {wait:.2f}s)')
+
+                await asyncio.sleep(backoff)
+
+            return await func(*args, **kwargs)
 
         return wrapper
 
@@ -45,11 +45,22 @@ class TaskEnum(str, Enum):
     PDA_ALERT = 'pda.alert'
     PDA_MAIL = 'pda.mail'
     PDA_MAIL_SEND = 'pda.mail.send'
+    PDA_NOTIFICATION_DIGEST = 'pda.notification.digest'
     PDA_TEST = 'pda.test'
     PDA_TEST_MAIL = 'pda.test.mail'
     PDA_TEST_EXCEPTION = 'pda.test.exception'
     PDA_TEST_EXCEPTION_RETRY = 'pda.test.exception_retry'
     PDA_TEST_DELAY = 'pda.test.delay'
+    PDA_TWILIO_STATUS = 'pda.twilio.status'
+
+
+class ThrottleAlgorithmEnum(str, Enum):
+    """Defines the algorithms that Redis throttles can admit calls with."""
+    SLIDING_WINDOW = 'sliding_window'
+    """Admits calls within a sliding window log of the calls made in the period."""
+
+    GCRA = 'gcra'
+    """Admits calls spaced evenly across the period with the generic cell rate algorithm, allowing bursts."""
 
 
 class TwilioNotificationTypeEnum(str, Enum):
@@ -0,0 +1,586 @@
+import json
+import os
+import time
+from datetime import datetime
+from queue import Empty, Full, Queue
+from sqlalchemy import Engine
+from sqlalchemy.sql import ColumnElement
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Optional, Union
+from uuid import UUID
+from lib.config.tasks import TasksConfig
+from models.db.tasks import TaskJob, TaskJobActivity, TaskJobOutput, TaskJobStatusEnum
+
+TERMINAL_STATUSES: tuple[TaskJobStatusEnum, ...] = (
+    TaskJobStatusEnum.success, TaskJobStatusEnum.failed, TaskJobStatusEnum.internal_error, TaskJobStatusEnum.revoked,
+)
+""" The task job statuses that end a task job run, recording its end time and runtime if it had started. """
+
+UNKNOWN_NAME: str = ''
+""" The placeholder name of task jobs first recorded by a transition without the task name, such as a started event. """
+
+ERROR_STATUSES: tuple[TaskJobStatusEnum, ...] = (TaskJobStatusEnum.retry, TaskJobStatusEnum.failed)
+""" The task job statuses whose activity records the error of the transition. """
+
+
+class TaskJobTransition:
+    """Represents a change to the state of a task job, such as a status change or captured output."""
+
+    id: UUID
+    """The unique identifier of the task job."""
+
+    status: Optional[TaskJobStatusEnum]
+    """The new status of the task job, or None if the status is unchanged."""
+
+    name: Optional[str]
+    """The name of the Celery task."""
+
+    root_id: Optional[UUID]
+    """The unique identifier of the Celery root task."""
+
+    parent_id: Optional[UUID]
+    """The unique identifier of the Celery parent task."""
+
+    args: Optional[str]
+    """The JSON-encoded arguments of the Celery task."""
+
+    kwargs: Optional[str]
+    """The JSON-encoded keyword arguments of the Celery task."""
+
+    retries: Optional[int]
+    """The number of execution retries performed, or None if unchanged."""
+
+    error: Optional[str]
+    """An error to append to the errors of the task job (if any)."""
+
+    output: Optional[str]
+    """A chunk of captured output to record for the task job (if any)."""
+
+    sequence: Optional[int]
+    """The position of the output chunk within the output captured from the task job run."""
+
+    activity: bool
+    """Whether an activity record is created for the transition."""
+
+    timestamp: datetime
+    """When the transition occurred."""
+
+    @property
+    def shape(self) -> tuple:
+        """The set of columns the transition changes, which determines the upsert statement used to write it."""
+        return self.status, self.retries is not None, self.error is not None
+
+    def __init__(self, id: Union[str, UUID], status: Optional[TaskJobStatusEnum] = None, name: Optional[str] = None,
+                 root_id: Union[str, UUID, None] = None, parent_id: Union[str, UUID, None] = None,
+                 args: Any = None, kwargs: Any = None, retries: Optional[int] = None, error: Optional[str] = None,
+                 output: Optional[str] = None, sequence: Optional[int] = None, activity: bool = True,
+                 timestamp: Optional[datetime] = None):
+        self.id = self._uuid(id)
+        self.status = TaskJobStatusEnum(status) if status is not None else None
+        self.name = name
+        # A task without a root is its own root task
+        self.root_id = self._uuid(root_id) or self.id
+        self.parent_id = self._uuid(parent_id)
+        self.args = json.dumps(list(args)) if isinstance(args, (list, tuple)) and args else None
+        self.kwargs = json.dumps(kwargs) if isinstance(kwargs, dict) and kwargs else None
+        self.retries = retries
+        self.error = error
+        self.output = output
+        self.sequence = sequence
+        self.activity = activity and status is not None
+        self.timestamp = timestamp or datetime.now()
+
+    def __repr__(self):
+        return f'<TaskJobTransition {self.id} {self.name}: {self.status.value if self.status else "-"}>'
+
+    @classmethod
+    def from_request(cls, request: Any, status: Optional[TaskJobStatusEnum] = None, name: Optional[str] = None,
+                     task_id: Optional[str] = None, **kwargs) -> 'TaskJobTransition':
+        """Creates a transition for the task job of the given Celery request or task context."""
+        return cls(
+            task_id or getattr(request, 'id', None),
+            status,
+            name=name or getattr(request, 'name', None) or getattr(request, 'task', None),
+            root_id=getattr(request, 'root_id', None),
+            parent_id=getattr(request, 'parent_id', None),
+            args=getattr(request, 'args', None),
+            kwargs=getattr(request, 'kwargs', None),
+            **kwargs,
+        )
+
+    def row(self) -> dict:
+        """Returns the task job row inserted when the task job doesn't exist yet."""
+        return {
+            'id': self.id,
+            'root_id': self.root_id,
+            'parent_id': self.parent_id,
+            # Worker events don't carry the task name, which is filled in once a transition that does is written
+            'name': self.name or UNKNOWN_NAME,
+            'args': self.args,
+            'kwargs': self.kwargs,
+            'retries': self.retries or 0,
+            'errors': json.dumps([self.error]) if self.error is not None else None,
+            'status': (self.status or TaskJobStatusEnum.received).value,
+            'started_at': self.timestamp if self.status == TaskJobStatusEnum.running else None,
+            'created_at': self.timestamp,
+            'updated_at': self.timestamp,
+        }
+
+    def activity_row(self) -> dict:
+        """Returns the task job activity row recorded for the transition."""
+        from uuid import uuid4
+
+        return {
+            'id': uuid4(),
+            'task_job_id': self.id,
+            'status': self.status.value,
+            'error': self.error if self.status in ERROR_STATUSES else None,
+            'created_at': self.timestamp,
+        }
+
+    def output_row(self) -> dict:
+        """Returns the task job output record of the captured output chunk of the transition."""
+        from uuid import uuid4
+
+        return {
+            'id': uuid4(),
+            'task_job_id': self.id,
+            'sequence': self.sequence or 0,
+            'content': self.output,
+            'created_at': self.timestamp,
+        }
+
+    @staticmethod
+    def _uuid(value: Union[str, UUID, None]) -> Optional[UUID]:
+        if value is None or isinstance(value, UUID):
+            return value
+        return UUID(str(value))
+
+
+class TaskJobWriter:
+    """
+    Writes task job transitions with a single upsert statement per kind of transition and one insert each of their
+    activity and output records, all within one transaction, instead of reading and re-saving each task job.
+    """
+
+    _engine: Engine
+    """The database engine written to."""
+
+    _statements: dict[tuple, Any]
+    """The compiled upsert statements keyed by transition shape."""
+
+    @property
+    def engine(self) -> Engine:
+        """The database engine written to."""
+        return self._engine
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._statements = {}
+
+    def write(self, transition: TaskJobTransition):
+        """Writes the given transition."""
+        self.write_many([transition])
+
+    def write_many(self, transitions: list[TaskJobTransition]):
+        """Writes the given transitions in order within a single transaction."""
+        if not transitions:
+            return
+
+        with self._engine.begin() as conn:
+            # Consecutive transitions of the same shape are written with one multi-row statement, preserving order
+            batch: list[TaskJobTransition] = []
+
+            for transition in transitions:
+                if batch and batch[0].shape != transition.shape:
+                    conn.execute(self._statement(batch[0].shape), [t.row() for t in batch])
+                    batch = []
+                batch.append(transition)
+
+            conn.execute(self._statement(batch[0].shape), [t.row() for t in batch])
+
+            activities = [t.activity_row() for t in transitions if t.activity]
+
+            if activities:
+                conn.execute(TaskJobActivity.__table__.insert(), activities)
+
+            outputs = [t.output_row() for t in transitions if t.output is not None]
+
+            if outputs:
+                conn.execute(TaskJobOutput.__table__.insert(), outputs)
+
+    def _statement(self, shape: tuple):
+        """Returns the upsert statement for transitions of the given shape."""
+        if shape not in self._statements:
+            self._statements[shape] = self._build(*shape)
+
+        return self._statements[shape]
+
+    def _build(self, status: Optional[TaskJobStatusEnum], retries: bool, error: bool):
+        dialect = self._engine.dialect.name
+        table = TaskJob.__table__
+        c = table.c
+
+        if dialect in ('mysql', 'mariadb'):
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table)
+            new = stmt.inserted
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table)
+            new = stmt.excluded
+        else:
+            raise NotImplementedError(f'Task job upserts are not supported for the "{dialect}" database dialect.')
+
+        # Only columns referencing existing or inserted values are used so the statement works for multi-row inserts
+        values: dict[str, ColumnElement] = {
+            'root_id': self._coalesce(c.root_id, new.root_id),
+            'parent_id': self._coalesce(c.parent_id, new.parent_id),
+            'name': self._coalesce(self._nullif_unknown(c.name), new.name),
+            'args': self._coalesce(c.args, new.args),
+            'kwargs': self._coalesce(c.kwargs, new.kwargs),
+        }
+
+        # Transitions recorded by different processes may arrive out of order, so older ones don't replace the state
+        if status is not None:
+            values['status'] = self._if_newer(c, new, new.status, c.status)
+
+        if retries:
+            values['retries'] = self._if_newer(c, new, new.retries, c.retries)
+
+        if error:
+            values['errors'] = self._json_append(dialect, c.errors, new.errors)
+
+        if status == TaskJobStatusEnum.running:
+            values['started_at'] = self._coalesce(c.started_at, new.started_at)
+
+        elif status in TERMINAL_STATUSES:
+            # A run only ends, and has a runtime, if it was started
+            values['ended_at'] = self._if_started(c, new.updated_at, c.ended_at)
+            values['runtime'] = self._if_started(c, self._runtime(dialect, c.started_at, new.updated_at), c.runtime)
+
+        values['updated_at'] = self._if_newer(c, new, new.updated_at, c.updated_at)
+
+        if dialect == 'sqlite':
+            return stmt.on_conflict_do_update(index_elements=[c.id], set_=values)
+
+        return stmt.on_duplicate_key_update(**values)
+
+    @staticmethod
+    def _coalesce(existing: ColumnElement, new: ColumnElement) -> ColumnElement:
+        from sqlalchemy import func
+        return func.coalesce(existing, new)
+
+    @staticmethod
+    def _nullif_unknown(name: ColumnElement) -> ColumnElement:
+        from sqlalchemy import func, literal_column
+        return func.nullif(name, literal_column(f"'{UNKNOWN_NAME}'"))
+
+    @staticmethod
+    def _if_newer(c, new, value: ColumnElement, otherwise: ColumnElement) -> ColumnElement:
+        from sqlalchemy import case
+        return case((c.updated_at > new.updated_at, otherwise), else_=value)
+
+    @staticmethod
+    def _if_started(c, value: ColumnElement, otherwise: ColumnElement) -> ColumnElement:
+        from sqlalchemy import case
+        return case((c.started_at.is_not(None), value), else_=otherwise)
+
+    @staticmethod
+    def _runtime(dialect: str, started: ColumnElement, ended: ColumnElement) -> ColumnElement:
+        """Returns the number of seconds between the given timestamps."""
+        from sqlalchemy import func, literal_column
+
+        if dialect == 'sqlite':
+            return func.abs((func.julianday(ended) - func.julianday(started)) * literal_column('86400.0'))
+
+        return func.abs(
+            func.timestampdiff(literal_column('MICROSECOND'), started, ended) / literal_column('1000000.0')
+        )
+
+    @staticmethod
+    def _json_append(dialect: str, existing: ColumnElement, new: ColumnElement) -> ColumnElement:
+        """Appends the single item of the given new JSON array to the existing JSON array, replacing invalid values."""
+        from sqlalchemy import case, func, literal_column
+
+        # Constants are rendered inline as drivers don't bind parameters after the VALUES clause of multi-row inserts
+        item = func.json_extract(new, literal_column("'$[0]'"))
+
+        if dialect == 'sqlite':
+            array, append = literal_column("'array'"), func.json_insert(existing, literal_column("'$[#]'"), item)
+        else:
+            array, append = literal_column("'ARRAY'"), func.json_array_append(existing, literal_column("'$'"), item)
+
+        return case(
+            (func.json_valid(existing) == literal_column('1'), case(
+                (func.json_type(existing) == array, append),
+                else_=new,
+            )),
+            else_=new,
+        )
+
+
+class TaskJobBuffer:
+    """
+    Buffers task job transitions in memory and writes them in batches from a background thread, so that recording
+    a transition doesn't add database latency to task execution. The buffer is bounded: producers block while it
+    is full. Buffered transitions are drained when the buffer is stopped, and any that can't be written are saved
+    to the spool file (if configured) to be replayed when a buffer is next started.
+    """
+
+    RETRY_BACKOFF: float = 1.0
+    """The initial number of seconds to wait before retrying a failed batch write."""
+
+    RETRY_BACKOFF_MAX: float = 30.0
+    """The maximum number of seconds to wait before retrying a failed batch write."""
+
+    _config: TasksConfig.TaskJobsConfig
+    """The task job persistence configuration."""
+
+    _engine: Callable[[], Engine]
+    """Returns the database engine to write to."""
+
+    _writer: Optional[TaskJobWriter] = None
+    """The writer for the current database engine."""
+
+    _queue: Queue
+    """The queue of buffered transitions."""
+
+    _stop_event: Event
+    """Set when the writer thread should drain the buffer and stop."""
+
+    _thread: Thread
+    """The writer thread."""
+
+    _lock: Lock
+    """A lock serializing writes from the writer thread and producers."""
+
+    _pid: int
+    """The id of the process that created the buffer."""
+
+    @property
+    def pending(self) -> int:
+        """The approximate number of buffered transitions."""
+        return self._queue.qsize()
+
+    def __init__(self, config: TasksConfig.TaskJobsConfig, engine: Callable[[], Engine]):
+        self._config = config
+        self._engine = engine
+        self._queue = Queue(maxsize=max(config.max_pending, 1))
+        self._stop_event = Event()
+        self._thread = Thread(target=self._worker, daemon=True)
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    def start(self):
+        """Replays any spooled transitions and starts the background writer thread."""
+        import atexit
+
+        if self._thread.is_alive():
+            return
+
+        self._replay()
+        self._thread.start()
+
+        # Drain the buffer when the interpreter exits without the buffer having been stopped explicitly
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 30.0):
+        """Stops the writer thread once it has written all buffered transitions."""
+        from loguru import logger
+
+        # A forked process inherits a copy of the buffer whose transitions are written by the parent process
+        if os.getpid() != self._pid or self._stop_event.is_set():
+            return
+
+        self._stop_event.set()
+
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+        if self._thread.is_alive():
+            logger.warning(f'[TaskJobBuffer] Writer thread did not stop within {timeout}s.')
+            return
+
+        # Write anything left behind by a writer thread that wasn't running, saving what can't be written
+        batch = self._take(self._queue.qsize())
+
+        if batch and not self._write(batch, attempts=1):
+            self._spool(batch)
+
+    def put(self, transition: TaskJobTransition):
+        """Buffers the given transition, blocking while the buffer is full."""
+        if not self._thread.is_alive() or self._stop_event.is_set():
+            self.write([transition])
+            return
+
+        while True:
+            try:
+                self._queue.put(transition, timeout=1.0)
+                return
+            except Full:
+                # Fall back to writing directly if the writer thread has gone away while waiting
+                if not self._thread.is_alive():
+                    self.write([transition])
+                    return
+
+    def write(self, transitions: list[TaskJobTransition]):
+        """Writes the given transitions immediately."""
+        with self._lock:
+            engine = self._engine()
+
+            # The writer caches its statements, so it is only replaced when the engine is rebuilt
+            if self._writer is None or self._writer.engine is not engine:
+                self._writer = TaskJobWriter(engine)
+
+            self._writer.write_many(transitions)
+
+    def _worker(self):
+        """Background thread that writes buffered transitions in batches."""
+        while not self._stop_event.is_set() or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=self._config.flush_interval)]
+            except Empty:
+                continue
+
+            # Collect more transitions until the batch is full or the oldest has waited the flush interval
+            deadline = time.monotonic() + self._config.flush_interval
+
+            while len(batch) < self._config.batch_size:
+                remaining = 0 if self._stop_event.is_set() else deadline - time.monotonic()
+
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except Empty:
+                    break
+
+            if not self._write(batch):
+                self._spool(batch)
+
+    def _write(self, batch: list[TaskJobTransition], attempts: Optional[int] = None) -> bool:
+        """
+        Writes the given batch, retrying with backoff. Batches are retried for as long as the database connection is
+        lost, until the buffer stops or the given attempts run out. Any other failure is retried up to the configured
+        write attempts, after which the transitions are written individually and those that still fail are discarded,
+        so that a batch which can never be written doesn't block those buffered after it. Returns False if the batch
+        is left unwritten for the lack of a database connection.
+        """
+        from loguru import logger
+
+        backoff = self.RETRY_BACKOFF
+        attempt = 0
+        failures = 0
+
+        while True:
+            attempt += 1
+
+            try:
+                self.write(batch)
+                logger.trace(f'[TaskJobBuffer] Wrote {len(batch)} task job transitions.')
+                return True
+            except Exception as e:
+                logger.error(f'[TaskJobBuffer] Failed to write {len(batch)} task job transitions: {e}')
+                disconnected = self._disconnected(e)
+
+            if not disconnected:
+                failures += 1
+
+                if failures >= self._config.write_attempts or (attempts is not None and attempt >= attempts):
+                    return self._write_each(batch)
+
+            if (attempts is not None and attempt >= attempts) or self._stop_event.is_set():
+                return False
+
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, self.RETRY_BACKOFF_MAX)
+
+    def _write_each(self, batch: list[TaskJobTransition]) -> bool:
+        """
+        Writes the transitions of a failed batch individually, discarding those that fail. Should the database
+        connection be lost, the written transitions are removed from the batch, leaving the rest to be spooled, and
+        False is returned.
+        """
+        from loguru import logger
+
+        for i, transition in enumerate(batch):
+            try:
+                self.write([transition])
+            except Exception as e:
+                if self._disconnected(e):
+                    del batch[:i]
+                    return False
+
+                logger.error(f'[TaskJobBuffer] Discarding task job transition {transition!r} that cannot be written: '
+                             + f'{e}')
+
+        return True
+
+    @staticmethod
+    def _disconnected(e: Exception) -> bool:
+        """Determines whether the given write failure is due to a lost or unavailable database connection."""
+        from sqlalchemy.exc import DBAPIError, DisconnectionError, InterfaceError, OperationalError
+
+        if isinstance(e, (DisconnectionError, InterfaceError, OperationalError)):
+            return True
+
+        return isinstance(e, DBAPIError) and e.connection_invalidated
+
+    def _take(self, count: int) -> list[TaskJobTransition]:
+        batch = []
+
+        for _ in range(count):
+            try:
+                batch.append(self._queue.get_nowait())
+            except Empty:
+                break
+
+        return batch
+
+    def _spool(self, batch: list[TaskJobTransition]):
+        """Saves the given unwritten transitions to the spool file, if configured."""
+        import pickle
+        from loguru import logger
+
+        if not self._config.spool_path:
+            logger.error(f'[TaskJobBuffer] Discarding {len(batch)} unwritten task job transitions.')
+            return
+
+        try:
+            with open(self._config.spool_path, 'ab') as f:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+            logger.warning(f'[TaskJobBuffer] Spooled {len(batch)} unwritten task job transitions.')
+        except Exception as e:
+            logger.error(f'[TaskJobBuffer] Failed to spool {len(batch)} task job transitions: {e}')
+
+    def _replay(self):
+        """Writes transitions saved to the spool file by a previous buffer and removes them from the file."""
+        import fcntl
+        import pickle
+        from loguru import logger
+
+        path = self._config.spool_path
+
+        if not path or not os.path.exists(path):
+            return
+
+        try:
+            with open(path, 'r+b') as f:
+                # Only one process replays the spool file
+                fcntl.flock(f, fcntl.LOCK_EX)
+
+                transitions = []
+
+                while True:
+                    try:
+                        transitions.extend(pickle.load(f))
+                    except EOFError:
+                        break
+
+                if transitions:
+                    self.write(transitions)
+                    logger.info(f'[TaskJobBuffer] Replayed {len(transitions)} spooled task job transitions.')
+
+                f.truncate(0)
+
+        except Exception as e:
+            logger.error(f'[TaskJobBuffer] Failed to replay spooled task job transitions from "{path}": {e}')
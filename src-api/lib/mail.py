@@ -155,6 +155,7 @@ class SmtpClient:
                     backoff_base=self._server.throttle.backoff_base,
                     backoff_cap=self._server.throttle.backoff_cap,
                     jitter=self._server.throttle.jitter,
+                    algorithm=self._server.throttle.algorithm,
                 )(lambda: self._connection.send_message(message, from_address, to_addresses, mail_options,
                                                         rcpt_options))
 
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import Callable, Iterator, Optional, TypeVar, Union
 from zoneinfo import ZoneInfo
+from lib.config.notifications import NotificationsConfig
 from lib.enums import NotificationServiceEnum, TaskEnum
 from lib.notifications.config import (
     ALL_SERVICE_RECIPIENTS_TYPE, ALL_NOTIFICATION_SERVICES_TYPE,
@@ -9,9 +10,33 @@ from lib.notifications.config import (
     MailServiceRecipient, MsTeamsServiceRecipient, TwilioServiceRecipient
 )
 from lib.notifications.events import ALL_EVENTS, ALL_EVENTS_TYPE
+from lib.notifications.outbox import NotificationOutbox
+from lib.notifications.schedules import ScheduleEvaluator
+from lib.notifications.suppression import NotificationSuppressor
 
 UTC_TZ = ZoneInfo('UTC')
 
+T = TypeVar('T')
+
+
+class NotificationDeliveryException(Exception):
+    """Raised when a notification service rejects the delivery of a notification, so that it can be retried."""
+
+    BODY_LIMIT: int = 500
+    """The maximum number of characters of the response body included in the exception."""
+
+    status_code: int
+    """The status code of the service response."""
+
+    body: str
+    """The response body of the service, truncated to the body limit."""
+
+    def __init__(self, service: str, status_code: int, body: Optional[str] = None):
+        self.status_code = status_code
+        self.body = (body or '')[:self.BODY_LIMIT]
+        truncated = '...' if body is not None and len(body) > self.BODY_LIMIT else ''
+        super().__init__(f'{service} responded with status code {status_code}: {self.body}{truncated}')
+
 
 class NotificationSender:
     """Provides an abstract interface for sending notifications."""
@@ -28,11 +53,18 @@ class NotificationSender:
     service: ALL_NOTIFICATION_SERVICES_TYPE
     """Defines the service configuration to be used for this sender instance."""
 
+    timeout: Optional[float] = None
+    """Defines the number of seconds to wait on the service when sending a notification (if limited)."""
+
+    CONCURRENT: bool = False
+    """Defines whether notifications to multiple recipients of an event may be sent concurrently."""
+
     def __init__(self, event: ALL_EVENTS, config: NotificationConfig, service: ALL_NOTIFICATION_SERVICES_TYPE):
         """Initializes a new instance of the notification sender class."""
         self.event = event
         self.config = config
         self.service = service
+        self.timeout = None
 
         if not self.config.enabled:
             raise ValueError(f'NotificationConfig provided to NotificationSender is disabled.')
@@ -51,6 +83,49 @@ class NotificationSender:
 
         raise NotImplementedError()
 
+    @staticmethod
+    def endpoint(recipient: ALL_SERVICE_RECIPIENTS_TYPE) -> str:
+        """Returns the address that notifications are delivered to for the given service recipient."""
+        raise NotImplementedError()
+
+    def prepare(self):
+        """Prepares whatever is shared by the notifications to each recipient, before they are sent concurrently."""
+        pass
+
+    def send_many(self, recipients: list[ALL_SERVICE_RECIPIENTS_TYPE], concurrency: int = 1):
+        """Sends a notification to each of the given service recipients for the given event."""
+        self.fan_out(self.send, recipients, concurrency=concurrency)
+
+    def fan_out(self, fn: Callable[[ALL_SERVICE_RECIPIENTS_TYPE], T], recipients: list[ALL_SERVICE_RECIPIENTS_TYPE],
+                concurrency: int = 1) -> list[Optional[T]]:
+        """
+        Calls the given function for each of the given recipients, concurrently up to the given concurrency if the
+        sender supports it. Failures are logged rather than raised, and the results are returned in the order of the
+        recipients with None in place of those that failed.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from loguru import logger
+
+        def call(recipient: ALL_SERVICE_RECIPIENTS_TYPE) -> Optional[T]:
+            try:
+                return fn(recipient)
+            except Exception as e:
+                logger.warning(f'Failed to send {self.SERVICE.value} notification to {recipient.label}: {e}')
+                return None
+
+        workers = min(max(concurrency, 1), len(recipients)) if self.CONCURRENT else 1
+
+        if workers <= 1:
+            return [call(recipient) for recipient in recipients]
+
+        try:
+            self.prepare()
+        except Exception as e:
+            logger.warning(f'Failed to prepare {self.SERVICE.value} notifications: {e}')
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'pda-notify-{self.SERVICE.value}') as executor:
+            return list(executor.map(call, recipients))
+
 
 class MailNotificationSender(NotificationSender):
     """Provides an API for sending mail notifications."""
@@ -61,6 +136,11 @@ class MailNotificationSender(NotificationSender):
     service: MailNotificationService
     """Defines the service configuration to be used for this sender instance."""
 
+    @staticmethod
+    def endpoint(recipient: MailServiceRecipient) -> str:
+        """Returns the email address that notifications are delivered to for the given service recipient."""
+        return recipient.email
+
     def send(self, recipient: MailServiceRecipient):
         """Sends a notification to the given service recipient for the given event."""
         from loguru import logger
@@ -102,34 +182,55 @@ class MsTeamsNotificationSender(NotificationSender):
     service: MsTeamsNotificationService
     """Defines the service configuration to be used for this sender instance."""
 
-    def send(self, recipient: MsTeamsServiceRecipient):
-        """Sends a notification to the given service recipient for the given event."""
+    CONCURRENT: bool = True
+    """Defines whether notifications to multiple recipients of an event may be sent concurrently."""
+
+    _payload: Optional[str] = None
+    """The serialized message payload, which is the same for every recipient of the event."""
+
+    @property
+    def payload(self) -> str:
+        """The serialized adaptive card message payload of the event."""
         import json
-        import requests
-        from loguru import logger
         from lib.services.microsoft.adaptivecards import ContainerStyleEnum
         from lib.services.microsoft.teams import MessageFactory
 
+        if self._payload is None:
+            self._payload = json.dumps(MessageFactory.create_simple_message(
+                segments=(self.event.message_body_plain or '').split('\n'),
+                title=self.event.message_title,
+                style=ContainerStyleEnum.attention,
+            ).model_dump(mode='json', by_alias=True, exclude_none=True))
+
+        return self._payload
+
+    @staticmethod
+    def endpoint(recipient: MsTeamsServiceRecipient) -> str:
+        """Returns the webhook URL that notifications are delivered to for the given service recipient."""
+        return recipient.webhook
+
+    def prepare(self):
+        """Renders the message payload once up front, rather than within each thread."""
+        _ = self.payload
+
+    def send(self, recipient: MsTeamsServiceRecipient):
+        """Sends a notification to the given service recipient for the given event."""
+        from loguru import logger
+        from app import teams_http
+
         try:
             super().send(recipient)
         except NotImplementedError:
             pass
 
-        headers = {'Content-Type': 'application/json'}
-
-        payload = MessageFactory.create_simple_message(
-            segments=self.event.message_body_plain.split('\n'),
-            title=self.event.message_title,
-            style=ContainerStyleEnum.attention,
-        ).model_dump(mode='json', by_alias=True, exclude_none=True)
-
-        response = requests.post(recipient.webhook, headers=headers, data=json.dumps(payload))
+        # Requests share the pooled connections of the process and are retried when rate limited or failing
+        response = teams_http.post(recipient.webhook, data=self.payload, timeout=self.timeout)
 
         if 200 <= response.status_code < 300:
             logger.debug(f'MicrosoftTeams: Successfully sent alert to Microsoft Teams webhook.')
         else:
-            logger.error(f'MicrosoftTeams: Failed to send alert to Microsoft Teams webhook:'
-                         + f'\nStatus Code: {response.status_code}\nResponse: {response.text}')
+            # Raised so that the failed delivery can be retried, such as from the notification outbox
+            raise NotificationDeliveryException('Microsoft Teams webhook', response.status_code, response.text)
 
 
 class TwilioNotificationSender(NotificationSender):
@@ -141,12 +242,62 @@ class TwilioNotificationSender(NotificationSender):
     service: TwilioNotificationService
     """Defines the service configuration to be used for this sender instance."""
 
-    def send(self, recipient: TwilioServiceRecipient):
-        """Sends a notification to the given service recipient for the given event."""
-        import time
+    CONCURRENT: bool = True
+    """Defines whether notifications to multiple recipients of an event may be sent concurrently."""
+
+    _message: Optional[str] = None
+    """The message text, which is the same for every recipient of the event."""
+
+    @property
+    def message(self) -> str:
+        """The SMS message text of the event."""
+
+        if self._message is None:
+            message = ''
+
+            if isinstance(message_title := self.event.message_title, str):
+                message += f'{message_title}\n\n'
+
+            if isinstance(message_body := self.event.message_body_plain, str):
+                message += f'{message_body}'
+
+            self._message = message
+
+        return self._message
+
+    @staticmethod
+    def endpoint(recipient: TwilioServiceRecipient) -> str:
+        """Returns the phone number that notifications are delivered to for the given service recipient."""
+        return recipient.number
+
+    def prepare(self):
+        """Renders the message text once up front, rather than within each thread."""
+        _ = self.message
+
+    def send(self, recipient: TwilioServiceRecipient) -> str:
+        """
+        Sends a notification to the given service recipient for the given event, and returns the SID of the sent
+        message. Its delivery status is looked up later by a deferred task rather than waited on.
+        """
+        sid = self.create_message(recipient)
+        self.track_status({sid: recipient.label})
+        return sid
+
+    def send_many(self, recipients: list[TwilioServiceRecipient], concurrency: int = 1):
+        """
+        Sends a notification to each of the given service recipients for the given event, looking up the delivery
+        status of all sent messages in a single deferred task.
+        """
+        sids = self.fan_out(self.create_message, recipients, concurrency=concurrency)
+        self.track_status({sid: r.label for sid, r in zip(sids, recipients) if sid is not None})
+
+    def create_message(self, recipient: TwilioServiceRecipient) -> str:
+        """
+        Sends a notification to the given service recipient and returns the SID of the sent message. Raises a
+        ValueError if no SMS capable number is configured to send it from, so that the failure is recorded.
+        """
         from loguru import logger
-        from twilio.rest import Client
-        from app import config
+        from app import config, twilio
         from lib.config.services import ServicesConfig
 
         try:
@@ -156,51 +307,48 @@ class TwilioNotificationSender(NotificationSender):
 
         sender: Optional[ServicesConfig.TwilioConfig.TwilioNumberConfig] = None
 
-        for number in config.services.twilio.numbers:
-            if not number.sms:
-                continue
-            sender = number
-            break
+        if config.services.twilio is not None:
+            for number in config.services.twilio.numbers:
+                if not number.sms:
+                    continue
+                sender = number
+                break
 
         if not isinstance(sender, ServicesConfig.TwilioConfig.TwilioNumberConfig):
-            logger.warning(
+            logger.error(
                 f'Unable to send Twilio message to {recipient.label} with no SMS capable numbers configured!')
-            return
-
-        message = ''
-
-        if isinstance(message_title := self.event.message_title, str):
-            message += f'{message_title}\n\n'
-
-        if isinstance(message_body := self.event.message_body_plain, str):
-            message += f'{message_body}'
+            raise ValueError('No SMS capable Twilio numbers are configured.')
 
         logger.debug(f'Sending notification SMS: Config: {self.config.label}, Recipient: {recipient.label}, '
                      + f'Category: {self.event.category}')
 
-        client = Client(config.services.twilio.api.live.account_sid, config.services.twilio.api.live.auth_token)
-
-        messages_sent = []
-
-        messages_sent.append(client.messages.create(
-            body=message,
+        # Messages share the pooled connections of the process-wide Twilio client
+        result = twilio.messages.create(
+            body=self.message,
             from_=sender.number,
             to=recipient.number,
-        ))
+        )
 
-        time.sleep(2)
+        return result.sid
 
-        for result in messages_sent:
-            msg = client.messages(result.sid).fetch()
+    @staticmethod
+    def track_status(messages: dict[str, str]):
+        """Defers the lookup of the delivery status of the given sent messages, keyed by SID with recipient labels."""
+        from loguru import logger
+        from app import config
 
-            log_msg = f'Sent Twilio message: From: {msg.from_}, To: {msg.to} ({recipient.label}), Status: {msg.status}'
+        twilio_config = config.services.twilio
 
-            if msg.price is not None:
-                log_msg += f', Price: {msg.price} {msg.price_unit}'
+        if not messages or twilio_config is None or not twilio_config.status_lookup:
+            return
 
-            log_msg += f'\nMessage:\n{msg.body}'
+        from worker import app as celery_app
 
-            logger.debug(log_msg)
+        try:
+            celery_app.send_task(TaskEnum.PDA_TWILIO_STATUS.value, kwargs={'messages': messages},
+                                 countdown=twilio_config.status_delay)
+        except Exception as e:
+            logger.warning(f'Failed to schedule the delivery status lookup of {len(messages)} Twilio messages: {e}')
 
 
 ALL_SENDERS = Union[MailNotificationSender, MsTeamsNotificationSender, TwilioNotificationSender]
@@ -216,8 +364,17 @@ class NotificationManager:
         NotificationServiceEnum.TWILIO: TwilioNotificationSender,
     }
 
+    SERVICE_CONFIGS: dict[NotificationServiceEnum, str] = {
+        NotificationServiceEnum.MAIL: 'mail',
+        NotificationServiceEnum.MSTEAMS: 'microsoft_teams',
+        NotificationServiceEnum.TWILIO: 'twilio',
+    }
+    """Defines the global notification configuration section of each service."""
+
     _configs: list[NotificationConfig]
 
+    _evaluator: Optional[ScheduleEvaluator] = None
+
     def __init__(self, configs: Optional[list[NotificationConfig]] = None):
         """Initializes the notification manager."""
 
@@ -226,6 +383,7 @@ class NotificationManager:
             configs = notifications
 
         self._configs = configs
+        self._evaluator = None
 
     def handle_event(self, event: ALL_EVENTS):
         """Handles one or more notification events and sends appropriate notifications."""
@@ -242,14 +400,32 @@ class NotificationManager:
         NotificationConfig]:
         """Provides a list of notification configurations for a particular event."""
 
+        from lib.notifications.index import NotificationIndex
+
         configs = []
 
-        for nc in self._configs:
-            if nc.applicable(event=event, timestamp=timestamp):
+        evaluator = self.get_schedule_evaluator(timestamp)
+
+        # Only the configurations whose category and task criteria match the event are checked further
+        for nc in NotificationIndex.of(self._configs).candidates(event):
+            if nc.applicable(event=event, criteria=False, evaluator=evaluator):
                 configs.append(nc)
 
         return configs
 
+    def subscribed(self, event_type: ALL_EVENTS_TYPE, task_name: Optional[str] = None) -> bool:
+        """Determines whether any configuration may apply to events of the given type and task name."""
+        from lib.notifications.index import NotificationIndex
+        return NotificationIndex.of(self._configs).subscribed(event_type, task_name)
+
+    def get_schedule_evaluator(self, timestamp: Optional[datetime] = None) -> ScheduleEvaluator:
+        """Provides the recipient schedule evaluator for the given timestamp, shared by the checks of an event."""
+
+        if self._evaluator is None or self._evaluator.timestamp != timestamp or timestamp is None:
+            self._evaluator = ScheduleEvaluator(timestamp)
+
+        return self._evaluator
+
     def get_service_sender(self, service: NotificationServiceEnum) -> ALL_SENDERS_TYPE:
         """Retrieves the notification sender class associated with the given service identifier."""
 
@@ -262,6 +438,117 @@ class NotificationManager:
                            timestamp: Optional[datetime] = None):
         """Sends notifications for the given event based on the given configurations."""
 
+        from itertools import groupby
+
+        deliveries = self.get_deliveries(event=event, configs=configs, timestamp=timestamp)
+
+        # Notifications are left to the delivery workers when queued in the outbox
+        if (outbox := self.get_outbox()) is not None:
+            outbox.append(event, deliveries)
+            return
+
+        # Each sender is handed all of its recipients at once so that it may send to them concurrently
+        for sender, group in groupby(deliveries, key=lambda d: d[0]):
+            service_config = self.get_service_config(sender.SERVICE)
+            concurrency = 1
+
+            if service_config is not None:
+                sender.timeout = service_config.timeout
+                concurrency = service_config.concurrency
+
+            sender.send_many([recipient for _, recipient in group], concurrency=concurrency)
+
+    def get_service_config(self, service: NotificationServiceEnum) -> Optional[
+        NotificationsConfig.NotificationServiceConfig]:
+        """Retrieves the global configuration of the given notification service (if the app is configured)."""
+        from app import config
+
+        notifications = getattr(config, 'notifications', None)
+
+        if not isinstance(notifications, NotificationsConfig):
+            return None
+
+        return getattr(notifications, self.SERVICE_CONFIGS[service])
+
+    def get_suppressor(self) -> Optional[NotificationSuppressor]:
+        """Retrieves the notification suppressor of the process (if suppression is enabled)."""
+        from app import config, suppressor
+
+        notifications = getattr(config, 'notifications', None)
+
+        if not isinstance(notifications, NotificationsConfig) or not notifications.suppression.enabled:
+            return None
+
+        return suppressor
+
+    def get_outbox(self) -> Optional[NotificationOutbox]:
+        """Retrieves the notification outbox (if notifications are queued in the outbox)."""
+        from app import config, outbox
+
+        notifications = getattr(config, 'notifications', None)
+
+        if not isinstance(notifications, NotificationsConfig) or not notifications.outbox.enabled:
+            return None
+
+        return outbox
+
+    def find_recipient(self, config: str, service: str, recipient: str) -> Optional[tuple]:
+        """
+        Finds the enabled notification configuration, service, and recipient with the given configuration label,
+        service name, and recipient label, such as for a notification that is delivered later. Returns them as a
+        (config, service, recipient) tuple, or None if not found.
+        """
+        nc = next((c for c in self._configs if c.enabled and c.label == config), None)
+        ns = next((s for s in nc.services or [] if s.enabled and s.name.value == service), None) if nc else None
+        nr = next((r for r in ns.recipients or [] if r.enabled and r.label == recipient), None) if ns else None
+
+        return (nc, ns, nr) if nr is not None else None
+
+    def send_digest(self, key: str, config: str, service: str, recipient: str, category: Optional[str] = None,
+                    task_name: Optional[str] = None):
+        """
+        Sends the digest of the notifications suppressed within the given suppression window to the recipient of the
+        given notification configuration and service, if any notifications were suppressed.
+        """
+        from datetime import datetime
+        from loguru import logger
+        from lib.enums import NotificationCategoryEnum
+        from lib.notifications.events import NotificationDigestEvent
+
+        suppressor = self.get_suppressor()
+
+        if suppressor is None or (digest := suppressor.collect(key)) is None:
+            return
+
+        if (found := self.find_recipient(config, service, recipient)) is None:
+            logger.warning(f'Unable to send the digest of {digest.get("count")} suppressed notifications to '
+                           + f'{recipient} as it is no longer configured.')
+            return
+
+        event = NotificationDigestEvent(
+            category=NotificationCategoryEnum(category) if category is not None else None,
+            subject=digest.get('subject') or None,
+            task_name=task_name,
+            count=int(digest.get('count', 0)),
+            first=datetime.fromisoformat(digest['first']) if digest.get('first') else None,
+            last=datetime.fromisoformat(digest['last']) if digest.get('last') else None,
+        )
+
+        nc, ns, nr = found
+        sender = self.get_service_sender(service=ns.name)(event=event, config=nc, service=ns)
+
+        if (service_config := self.get_service_config(ns.name)) is not None:
+            sender.timeout = service_config.timeout
+
+        sender.send_many([nr])
+
+    def get_deliveries(self, event: ALL_EVENTS, configs: list[NotificationConfig],
+                       timestamp: Optional[datetime] = None) -> Iterator[tuple[ALL_SENDERS, ALL_SERVICE_RECIPIENTS_TYPE]]:
+        """Provides the sender and recipient of each notification to send for the given event and configurations."""
+
+        evaluator = self.get_schedule_evaluator(timestamp)
+        suppressor = self.get_suppressor()
+
         for config in configs:
             if not isinstance(config.services, list) or not config.services:
                 continue
@@ -269,7 +556,7 @@ class NotificationManager:
             for service in config.services:
                 # TODO: Check if service is enabled in global configuration
 
-                if not service.enabled or not service.applicable(timestamp=timestamp):
+                if not service.enabled or not service.applicable(evaluator=evaluator):
                     continue
 
                 if not isinstance(service.recipients, list) or not service.recipients:
@@ -277,8 +564,12 @@ class NotificationManager:
 
                 sender = self.get_service_sender(service=service.name)(event=event, config=config, service=service)
 
-                for recipient in service.recipients:
-                    if not recipient.enabled or not recipient.applicable(timestamp=timestamp):
-                        continue
+                # The schedules of all recipients of the service are evaluated in one pass
+                recipients = evaluator.filter(service.recipients)
+
+                # Duplicates of notifications recently sent to a recipient are folded into a digest instead
+                if suppressor is not None:
+                    recipients = suppressor.admit(event=event, config=config, service=service, recipients=recipients)
 
-                    sender.send(recipient=recipient)
+                for recipient in recipients:
+                    yield sender, recipient
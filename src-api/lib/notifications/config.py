@@ -1,6 +1,6 @@
 import re
 from datetime import date, datetime, time
-from pydantic import field_validator, model_validator
+from pydantic import PrivateAttr, field_validator, model_validator
 from typing import Optional, Union, Any
 from zoneinfo import ZoneInfo
 from lib.enums import (
@@ -8,6 +8,8 @@ from lib.enums import (
     NotificationCategoryEnum, TwilioNotificationTypeEnum, NotificationServiceEnum
 )
 from lib.notifications.events import ALL_EVENTS
+from lib.notifications.meta import CompiledMeta
+from lib.notifications.schedules import CompiledSchedule, ScheduleEvaluator
 from models.base import BaseModel
 
 UTC_TZ = ZoneInfo('UTC')
@@ -26,6 +28,22 @@ class NotificationCriteria(BaseModel):
     """A dictionary of key/value pairs that should be used to as additional matching criteria to determine a
     notification configuration's relevant to a particular event."""
 
+    _compiled_meta: Optional[CompiledMeta] = PrivateAttr(default=None)
+    """The meta criteria compiled into matchers for evaluation."""
+
+    @property
+    def compiled_meta(self) -> CompiledMeta:
+        """The meta criteria compiled into matchers for evaluation."""
+        if self._compiled_meta is None:
+            self._compiled_meta = CompiledMeta(self.meta)
+        return self._compiled_meta
+
+    @model_validator(mode='after')
+    def compile_meta(self) -> 'NotificationCriteria':
+        """After instantiation, compile the meta criteria so that invalid criteria are rejected when loaded."""
+        self._compiled_meta = CompiledMeta(self.meta)
+        return self
+
     def applicable(self, event: ALL_EVENTS) -> bool:
         """Determines if this object is applicable for use based on the given criteria."""
 
@@ -47,7 +65,8 @@ class NotificationCriteria(BaseModel):
             if TaskEnum(event.task_name) not in self.task:
                 return False
 
-        # TODO: Check meta
+        if self.compiled_meta.matchers and not self.compiled_meta.applicable(event.metadata):
+            return False
 
         return True
 
@@ -61,35 +80,6 @@ class RecipientScheduleDates(BaseModel):
     end: Optional[Union[date, datetime]] = None
     """The latest date/time the recipient schedule should be restricted to."""
 
-    def applicable(self, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this object is applicable for use based on the given timestamp."""
-
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=UTC_TZ)
-
-        # Check the start datetime
-        if isinstance(self.start, datetime):
-            if timestamp < self.start:
-                return False
-
-        # Check the start date
-        elif isinstance(self.start, date):
-            if timestamp.date() < self.start:
-                return False
-
-        # Check the end datetime
-        if isinstance(self.end, datetime):
-            if timestamp > self.end:
-                return False
-
-        # Check the end date
-        elif isinstance(self.end, date):
-            if timestamp.date() > self.end:
-                return False
-
-        return True
-
     @field_validator('start', 'end', mode='before')
     @classmethod
     def parse_custom_datetime(cls, v: str) -> Union[date, datetime, str, None]:
@@ -134,36 +124,6 @@ class RecipientScheduleTimes(BaseModel):
     end: Optional[time] = None
     """The latest time of a day that the recipient schedule should be restricted to."""
 
-    def applicable(self, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this object is applicable for use based on the given timestamp."""
-
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=UTC_TZ)
-
-        # Check the days
-        if isinstance(self.days, list) and self.days:
-            check = False
-            ts_day = timestamp.strftime('%A').lower()
-
-            for day in self.days:
-                if day.value.lower() == ts_day:
-                    check = True
-                    break
-
-            if not check:
-                return False
-
-        # Check the start time
-        if isinstance(self.start, time) and timestamp.time() < self.start:
-            return False
-
-        # Check the end time
-        if isinstance(self.end, time) and timestamp.time() > self.end:
-            return False
-
-        return True
-
     @field_validator('start', 'end', mode='before')
     @classmethod
     def parse_custom_time(cls, v: str) -> Union[time, str, None]:
@@ -211,45 +171,23 @@ class RecipientSchedule(BaseModel):
     """Defines the weekdays and/or start and/or end times that the recipient schedule should be restricted to
     while respecting the dates and optionally time ranges defined by the 'dates' attribute if set."""
 
-    def applicable(self, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this recipient is applicable for use based on the given timestamp."""
-
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=ZoneInfo(self.timezone))
-        elif str(timestamp.tzinfo.tzname).lower() != self.timezone.lower():
-            timestamp = timestamp.astimezone(ZoneInfo(self.timezone))
-
-        # If no schedule dates or times are defined then assume applicable
-        if ((not isinstance(self.dates, list) or not self.dates)
-                and (not isinstance(self.times, list) or not self.times)):
-            return True
-
-        # Check that defined dates/times (if any) meet the criteria
-        if isinstance(self.dates, list) and self.dates:
-            check = False
-
-            for d in self.dates:
-                if d.applicable(timestamp=timestamp):
-                    check = True
-                    break
-
-            if not check:
-                return False
+    _compiled: Optional[CompiledSchedule] = PrivateAttr(default=None)
+    """The date ranges and weekly time intervals of the schedule compiled for evaluation."""
 
-        # Check that defined days/times (if any) meets the criteria
-        if isinstance(self.times, list) and self.times:
-            check = False
+    @property
+    def compiled(self) -> CompiledSchedule:
+        """The date ranges and weekly time intervals of the schedule compiled for evaluation."""
+        if self._compiled is None:
+            self._compiled = CompiledSchedule(self.timezone, self.dates, self.times)
+        return self._compiled
 
-            for t in self.times:
-                if t.applicable(timestamp=timestamp):
-                    check = True
-                    break
+    def applicable(self, timestamp: Optional[datetime] = None, evaluator: Optional[ScheduleEvaluator] = None) -> bool:
+        """Determines if this recipient is applicable for use based on the given timestamp or schedule evaluator."""
 
-            if not check:
-                return False
+        if evaluator is None:
+            evaluator = ScheduleEvaluator(timestamp)
 
-        return True
+        return evaluator.schedule_applicable(self.compiled)
 
     @model_validator(mode='after')
     def set_timezone_for_dates_and_times(self) -> 'RecipientSchedule':
@@ -292,6 +230,12 @@ class RecipientSchedule(BaseModel):
 
         return self
 
+    @model_validator(mode='after')
+    def compile_schedule(self) -> 'RecipientSchedule':
+        """After instantiation, compile the localized dates and times of the schedule for evaluation."""
+        self._compiled = CompiledSchedule(self.timezone, self.dates, self.times)
+        return self
+
 
 class ServiceRecipient(BaseModel):
     """Represents a recipient configuration associated with a notification service configuration."""
@@ -305,27 +249,27 @@ class ServiceRecipient(BaseModel):
     schedules: Optional[list[RecipientSchedule]] = None
     """Defines schedules to be used to determine when notifications should be sent to a recipient."""
 
-    def applicable(self, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this recipient is applicable for use based on the given timestamp."""
+    def applicable(self, timestamp: Optional[datetime] = None, evaluator: Optional[ScheduleEvaluator] = None) -> bool:
+        """Determines if this recipient is applicable for use based on the given timestamp or schedule evaluator."""
 
         # Check that the recipient is enabled
         if not self.enabled:
             return False
 
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=UTC_TZ)
-
         # If no schedules are defined then assume applicable
         if not isinstance(self.schedules, list) or not self.schedules or all(not s.enabled for s in self.schedules):
             return True
 
+        # Evaluate schedules at the given timestamp, or now if none provided, unless given an evaluator
+        if evaluator is None:
+            evaluator = ScheduleEvaluator(timestamp)
+
         # Check that at least one recipient schedule applies to the timestamp
         for schedule in self.schedules:
             if not schedule.enabled:
                 continue
 
-            if schedule.applicable(timestamp=timestamp):
+            if evaluator.schedule_applicable(schedule.compiled):
                 return True
 
         return False
@@ -380,23 +324,23 @@ class NotificationService(BaseModel):
     recipients: list[ServiceRecipient]
     """Defines recipients to be used for delivering notifications for a particular service."""
 
-    def applicable(self, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this service is applicable for use based on the given timestamp."""
+    def applicable(self, timestamp: Optional[datetime] = None, evaluator: Optional[ScheduleEvaluator] = None) -> bool:
+        """Determines if this service is applicable for use based on the given timestamp or schedule evaluator."""
 
         # Check that the service is enabled
         if not self.enabled:
             return False
 
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=UTC_TZ)
+        # Evaluate schedules at the given timestamp, or now if none provided, unless given an evaluator
+        if evaluator is None:
+            evaluator = ScheduleEvaluator(timestamp)
 
         # Check that at least one recipient applies to the timestamp
         for recipient in self.recipients:
             if not recipient.enabled:
                 continue
 
-            if recipient.applicable(timestamp=timestamp):
+            if recipient.applicable(evaluator=evaluator):
                 return True
 
         return False
@@ -462,19 +406,23 @@ class NotificationConfig(BaseModel):
     services: list[Union[MailNotificationService, MsTeamsNotificationService, TwilioNotificationService]]
     """Defines services to be used for delivering notifications related to a particular event."""
 
-    def applicable(self, event: ALL_EVENTS, timestamp: Optional[datetime] = None) -> bool:
-        """Determines if this configuration is applicable for use based on the given timestamp."""
+    def applicable(self, event: ALL_EVENTS, timestamp: Optional[datetime] = None, criteria: bool = True,
+                   evaluator: Optional[ScheduleEvaluator] = None) -> bool:
+        """Determines if this configuration is applicable for use based on the given timestamp or schedule evaluator.
+        The criteria check can be skipped for configurations already matched to the event, such as by a notification
+        index."""
 
         # Check that the configuration is enabled
         if not self.enabled:
             return False
 
-        # Default timestamp to now with a UTC timezone if none provided
-        if not isinstance(timestamp, datetime):
-            timestamp = datetime.now(tz=UTC_TZ)
+        # Evaluate schedules at the given timestamp, or now if none provided, unless given an evaluator
+        if evaluator is None:
+            evaluator = ScheduleEvaluator(timestamp)
 
         # Check the notification criteria if any
-        if isinstance(self.criteria, NotificationCriteria) and not self.criteria.applicable(event=event):
+        if (criteria and isinstance(self.criteria, NotificationCriteria)
+                and not self.criteria.applicable(event=event)):
             return False
 
         # Check that at least one service schedule applies to the timestamp
@@ -482,7 +430,7 @@ class NotificationConfig(BaseModel):
             if not service.enabled:
                 continue
 
-            if service.applicable(timestamp=timestamp):
+            if service.applicable(evaluator=evaluator):
                 return True
 
         return False
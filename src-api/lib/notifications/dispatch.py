@@ -0,0 +1,202 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Empty, Full, Queue
+from threading import BoundedSemaphore, Event, Lock, Thread
+from typing import Callable, Optional
+from lib.config.notifications import NotificationsConfig
+from lib.enums import NotificationServiceEnum
+from lib.notifications import UTC_TZ, ALL_SENDERS, NotificationManager
+from lib.notifications.config import ALL_SERVICE_RECIPIENTS_TYPE, NotificationConfig
+from lib.notifications.events import ALL_EVENTS
+
+
+class NotificationDispatcher:
+    """
+    Dispatches notification events from a background thread so that sending notifications doesn't hold up the
+    caller, such as a Celery signal handler. Events are queued in a bounded queue and discarded once it is full.
+    Each notification service sends from its own pool of threads, limited to the concurrency of the service, and
+    discards notifications once too many are pending, so that a slow service only delays its own notifications.
+    """
+
+    STOP_TIMEOUT: float = 10.0
+    """The maximum number of seconds to wait for queued notifications to be sent when stopping."""
+
+    config: NotificationsConfig
+    """The notification dispatch and service configuration."""
+
+    _configs: Callable[[], Optional[list[NotificationConfig]]]
+    """Returns the current notification configurations events are matched against."""
+
+    _queue: Queue
+    """The queue of events with the timestamps they were submitted at."""
+
+    _executors: dict[NotificationServiceEnum, ThreadPoolExecutor]
+    """The thread pools that notifications are sent from, keyed by service."""
+
+    _slots: dict[NotificationServiceEnum, BoundedSemaphore]
+    """Limits the number of notifications pending for each service."""
+
+    _stopping: Event
+    """Set when the dispatcher thread should drain the queue and stop."""
+
+    _thread: Optional[Thread]
+    """The dispatcher thread."""
+
+    _pid: int
+    """The id of the process that created the dispatcher."""
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatcher thread is running within the current process."""
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def __init__(self, config: NotificationsConfig, configs: Callable[[], Optional[list[NotificationConfig]]]):
+        self.config = config
+        self._configs = configs
+        self._queue = Queue(maxsize=max(config.dispatch.max_pending, 1))
+        self._executors = {}
+        self._slots = {}
+        self._stopping = Event()
+        self._thread = None
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    def service_config(self, service: NotificationServiceEnum) -> NotificationsConfig.NotificationServiceConfig:
+        """Returns the global configuration of the given notification service."""
+        return getattr(self.config, NotificationManager.SERVICE_CONFIGS[service])
+
+    def start(self):
+        """Starts the background dispatcher thread."""
+        import atexit
+
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = Thread(target=self._run, name='pda-notification-dispatcher', daemon=True)
+            self._thread.start()
+
+        atexit.register(self.stop)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the dispatcher, waiting up to the given timeout for queued notifications to be sent."""
+        from loguru import logger
+
+        if self._pid != os.getpid():
+            return
+
+        timeout = self.STOP_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        self._stopping.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+            if self._thread.is_alive():
+                logger.warning(f'Notification dispatcher did not finish within {timeout}s; '
+                               + f'{self._queue.qsize()} notification events were not dispatched.')
+
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=deadline <= time.monotonic())
+
+    def submit(self, event: ALL_EVENTS) -> bool:
+        """
+        Queues the given event to be dispatched in the background, or dispatches it directly if background dispatch
+        is disabled or the dispatcher isn't running. Returns False if the event was discarded as the queue is full.
+        """
+        from loguru import logger
+
+        timestamp = datetime.now(tz=UTC_TZ)
+
+        if not self.config.dispatch.background or not self.running or self._stopping.is_set():
+            NotificationManager(configs=self._configs()).handle_event(event)
+            return True
+
+        try:
+            self._queue.put_nowait((event, timestamp))
+        except Full:
+            logger.warning(f'Notification dispatch queue is full; discarding {type(event).__name__} event.')
+            return False
+
+        return True
+
+    def dispatch(self, event: ALL_EVENTS, timestamp: datetime):
+        """Sends the notifications of the given event from the thread pools of their services, or queues them."""
+        manager = NotificationManager(configs=self._configs())
+        configs = manager.get_event_configurations(event=event, timestamp=timestamp)
+        deliveries = manager.get_deliveries(event=event, configs=configs, timestamp=timestamp)
+
+        # Notifications are left to the delivery workers when queued in the outbox
+        if (outbox := manager.get_outbox()) is not None:
+            outbox.append(event, deliveries)
+            return
+
+        for sender, recipient in deliveries:
+            self._send(sender, recipient)
+
+    def _run(self):
+        from loguru import logger
+
+        while True:
+            try:
+                event, timestamp = self._queue.get(timeout=0.5)
+            except Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            try:
+                self.dispatch(event, timestamp)
+            except Exception as e:
+                logger.warning(f'Failed to dispatch {type(event).__name__} notification event: {e}')
+
+    def _send(self, sender: ALL_SENDERS, recipient: ALL_SERVICE_RECIPIENTS_TYPE):
+        """Sends the given notification from the thread pool of its service, unless too many are pending."""
+        from loguru import logger
+
+        service = sender.SERVICE
+        service_config = self.service_config(service)
+        sender.timeout = service_config.timeout
+
+        with self._lock:
+            if service not in self._executors:
+                self._executors[service] = ThreadPoolExecutor(
+                    max_workers=max(service_config.concurrency, 1), thread_name_prefix=f'pda-notify-{service.value}',
+                )
+                self._slots[service] = BoundedSemaphore(max(service_config.max_pending, 1))
+
+            executor, slots = self._executors[service], self._slots[service]
+
+        if not slots.acquire(blocking=False):
+            logger.warning(f'Too many {service.value} notifications are pending; discarding notification to '
+                           + f'{recipient.label}.')
+            return
+
+        def send():
+            start = time.monotonic()
+
+            try:
+                sender.send(recipient=recipient)
+            except Exception as e:
+                logger.warning(f'Failed to send {service.value} notification to {recipient.label}: {e}')
+            finally:
+                slots.release()
+
+            elapsed = time.monotonic() - start
+
+            if elapsed > service_config.timeout:
+                logger.warning(f'Sending {service.value} notification to {recipient.label} took {elapsed:.1f}s, '
+                               + f'exceeding the {service_config.timeout}s timeout.')
+
+        try:
+            executor.submit(send)
+        except RuntimeError:
+            # The executor has been shut down
+            slots.release()
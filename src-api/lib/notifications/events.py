@@ -3,8 +3,9 @@ from celery.app.task import Task, Context
 from celery.worker.request import Request
 from datetime import datetime
 from kombu.transport.virtual.base import Message
-from pydantic import PrivateAttr, ConfigDict, model_validator
-from typing import Any, Optional, Union
+from pydantic import Field, PrivateAttr, ConfigDict, model_validator
+from functools import wraps
+from typing import Any, Callable, Optional, Union
 from zoneinfo import ZoneInfo
 from lib.enums import NotificationCategoryEnum
 from models.base import BaseModel
@@ -15,10 +16,30 @@ BLOCK_STYLES = ("font-family: monospace, Consolas, 'Courier New', sans-serif; ba
                 + "white-space: pre-wrap; word-wrap: break-word;")
 
 
+def rendered(fn: Callable) -> Callable:
+    """
+    Memoizes the given event property so that its representation is rendered at most once per event and shared by
+    every sender and recipient of the event. Cached representations are discarded whenever the event is modified.
+    """
+    key = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(self):
+        cache = self._rendered
+
+        if key not in cache:
+            cache[key] = fn(self)
+
+        return cache[key]
+
+    return wrapper
+
+
 class TaskInfoMixin:
     """Provides a mixin for notification events that contain task information."""
 
     @property
+    @rendered
     def task_info_plain(self) -> Optional[str]:
         """Defines the formatted task information in plain format of the notification event (if applicable)."""
         import json
@@ -53,6 +74,7 @@ class TaskInfoMixin:
         return message.rstrip() or None
 
     @property
+    @rendered
     def task_info_html(self) -> Optional[str]:
         """Defines the task information in HTML format of the notification event (if applicable)."""
         import html, json
@@ -95,6 +117,7 @@ class ExceptionEventMixin:
     """Provides a mixin for notification events that contain exception information."""
 
     @property
+    @rendered
     def exception_traceback(self) -> Optional[str]:
         """Defines the formatted traceback of the associated exception information (if applicable)."""
         import traceback
@@ -112,6 +135,7 @@ class ExceptionEventMixin:
         return None
 
     @property
+    @rendered
     def exception_info_plain(self) -> Optional[str]:
         """Defines the message exception in plain format of the notification event (if applicable)."""
 
@@ -121,6 +145,7 @@ class ExceptionEventMixin:
         return None
 
     @property
+    @rendered
     def exception_info_html(self) -> Optional[str]:
         """Defines the message exception in HTML format of the notification event (if applicable)."""
         import html
@@ -145,6 +170,24 @@ class NotificationEvent(BaseModel):
     category: Optional[NotificationCategoryEnum] = None
     """Defines the notification category for the event (if applicable)."""
 
+    meta: dict[str, Any] = Field(default_factory=dict)
+    """Defines the metadata of the event that notification configurations may be matched by, such as a tenant."""
+
+    _rendered: dict[str, Any] = PrivateAttr(default_factory=dict)
+    """Defines the rendered message representations of the event keyed by the property that rendered them."""
+
+    def __setattr__(self, name: str, value: Any):
+        """Sets the given attribute, discarding the rendered message representations which may depend on it."""
+        super().__setattr__(name, value)
+
+        if name != '_rendered' and self.__pydantic_private__ is not None:
+            self._rendered.clear()
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """Defines the metadata that notification configuration meta criteria are evaluated against."""
+        return self.meta
+
     @model_validator(mode='after')
     def set_timestamp(self) -> 'NotificationEvent':
         """After instantiation, set the event timestamp."""
@@ -153,21 +196,25 @@ class NotificationEvent(BaseModel):
         return self
 
     @property
+    @rendered
     def message_subject(self) -> Optional[str]:
         """Defines the message subject of the event (if applicable)."""
         raise NotImplementedError()
 
     @property
+    @rendered
     def message_title(self) -> Optional[str]:
         """Defines the message title of the event (if applicable)."""
         raise NotImplementedError()
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the event (if applicable)."""
         raise NotImplementedError()
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the event (if applicable)."""
         raise NotImplementedError()
@@ -192,6 +239,7 @@ class AlertEvent(ExceptionEventMixin, NotificationEvent):
     """Defines the exception associated with the event (if applicable)."""
 
     @property
+    @rendered
     def message_subject(self) -> Optional[str]:
         """Defines the message subject of the notification event (if applicable)."""
 
@@ -204,6 +252,7 @@ class AlertEvent(ExceptionEventMixin, NotificationEvent):
         return None
 
     @property
+    @rendered
     def message_title(self) -> Optional[str]:
         """Defines the message title of the notification event (if applicable)."""
 
@@ -216,6 +265,7 @@ class AlertEvent(ExceptionEventMixin, NotificationEvent):
         return None
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -229,6 +279,7 @@ class AlertEvent(ExceptionEventMixin, NotificationEvent):
         return message.rstrip()
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -304,6 +355,38 @@ class TaskEvent(TaskInfoMixin, NotificationEvent):
         self._task_name = value
 
     @property
+    def metadata(self) -> dict[str, Any]:
+        """
+        Defines the metadata that notification configuration meta criteria are evaluated against, which includes the
+        scalar keyword arguments of the task, such as a tenant or zone, unless set explicitly in the event meta.
+        """
+        import json
+
+        kwargs = None
+
+        if isinstance(self.request, Request):
+            kwargs = self.request.kwargs
+
+        elif isinstance(self.context, Context):
+            kwargs = self.context.kwargs
+
+        if isinstance(kwargs, str):
+            try:
+                kwargs = json.loads(kwargs)
+            except ValueError:
+                kwargs = None
+
+        if not isinstance(kwargs, dict):
+            return self.meta
+
+        metadata = {k: v for k, v in kwargs.items() if isinstance(k, str)
+                    and (v is None or isinstance(v, (str, int, float, bool, list)))}
+        metadata.update(self.meta)
+
+        return metadata
+
+    @property
+    @rendered
     def task_label(self) -> Optional[str]:
         """Defines the friendly label of the task associated with the event (if available)."""
 
@@ -321,6 +404,7 @@ class TaskEvent(TaskInfoMixin, NotificationEvent):
         return None
 
     @property
+    @rendered
     def message_subject(self) -> Optional[str]:
         """Defines the message subject of the notification event (if applicable)."""
 
@@ -330,16 +414,19 @@ class TaskEvent(TaskInfoMixin, NotificationEvent):
         return self.label
 
     @property
+    @rendered
     def message_title(self) -> Optional[str]:
         """Defines the message title of the notification event (if applicable)."""
         return self.message_subject
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         return self.task_info_plain
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         return self.task_info_html
@@ -358,6 +445,7 @@ class TaskExceptionEvent(ExceptionEventMixin, TaskEvent):
     """Defines the exception info associated with the event (if applicable)."""
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -371,6 +459,7 @@ class TaskExceptionEvent(ExceptionEventMixin, TaskEvent):
         return message.rstrip() or None
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -413,6 +502,7 @@ class TaskRevokedEvent(TaskEvent):
     """Defines the signal number for the event."""
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -432,6 +522,7 @@ class TaskRevokedEvent(TaskEvent):
         return message.rstrip() or None
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -464,6 +555,7 @@ class TaskRejectedEvent(TaskExceptionEvent):
     """Defines the message for the event."""
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -480,6 +572,7 @@ class TaskRejectedEvent(TaskExceptionEvent):
         return message.rstrip() or None
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -529,6 +622,7 @@ class TaskSuccessEvent(TaskEvent):
     """Defines the result of the task."""
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -545,6 +639,7 @@ class TaskSuccessEvent(TaskEvent):
         return message.rstrip() or None
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -574,6 +669,7 @@ class TaskRetryEvent(TaskExceptionEvent):
     """Defines the reason associated with the event (if applicable)."""
 
     @property
+    @rendered
     def message_body_plain(self) -> Optional[str]:
         """Defines the message body in plain format of the notification event (if applicable)."""
         message = ''
@@ -590,6 +686,7 @@ class TaskRetryEvent(TaskExceptionEvent):
         return message.rstrip() or None
 
     @property
+    @rendered
     def message_body_html(self) -> Optional[str]:
         """Defines the message body in HTML format of the notification event (if applicable)."""
         message = ''
@@ -639,10 +736,118 @@ class TaskUnknownEvent(TaskExceptionEvent):
     """Defines the message for the event."""
 
 
+class NotificationDigestEvent(NotificationEvent):
+    """Defines an event summarizing the duplicate notifications suppressed within a suppression window."""
+
+    subject: Optional[str] = None
+    """Defines the message subject of the first suppressed notification (if available)."""
+
+    task_name: Optional[str] = None
+    """Defines the task name of the suppressed notifications (if applicable)."""
+
+    count: int = 0
+    """Defines the number of suppressed notifications."""
+
+    first: Optional[datetime] = None
+    """Defines the timestamp of the first suppressed notification."""
+
+    last: Optional[datetime] = None
+    """Defines the timestamp of the last suppressed notification."""
+
+    @property
+    @rendered
+    def message_subject(self) -> Optional[str]:
+        """Defines the message subject of the notification event."""
+        subject = self.subject or (self.category.value if self.category is not None else 'Notification')
+        return f'{subject} ({self.count} suppressed)'
+
+    @property
+    @rendered
+    def message_title(self) -> Optional[str]:
+        """Defines the message title of the notification event."""
+        return self.message_subject
+
+    @property
+    @rendered
+    def message_body_plain(self) -> Optional[str]:
+        """Defines the message body in plain format of the notification event."""
+        return '\n'.join(f'{label}: {value}' for label, value in self.summary)
+
+    @property
+    @rendered
+    def message_body_html(self) -> Optional[str]:
+        """Defines the message body in HTML format of the notification event."""
+        import html
+
+        return '\n'.join(f'<p style="margin-bottom: 10px;"><strong>{label}:</strong> {html.escape(str(value))}</p>'
+                         for label, value in self.summary)
+
+    @property
+    def summary(self) -> list[tuple[str, Any]]:
+        """Defines the labelled details of the suppressed notifications."""
+        summary = [('Suppressed Notifications', self.count)]
+
+        if self.category is not None:
+            summary.append(('Category', self.category.value))
+
+        if isinstance(self.task_name, str):
+            summary.append(('Task', self.task_name))
+
+        if isinstance(self.first, datetime):
+            summary.append(('First Occurrence', self.first.isoformat()))
+
+        if isinstance(self.last, datetime):
+            summary.append(('Last Occurrence', self.last.isoformat()))
+
+        return summary
+
+
+class RenderedEvent(NotificationEvent):
+    """
+    Defines an event whose message representations were rendered ahead of time, such as a notification that was
+    queued in the notification outbox for later delivery.
+    """
+
+    task_name: Optional[str] = None
+    """Defines the task name associated with the event (if applicable)."""
+
+    subject: Optional[str] = None
+    """Defines the rendered message subject of the event."""
+
+    title: Optional[str] = None
+    """Defines the rendered message title of the event."""
+
+    body_plain: Optional[str] = None
+    """Defines the rendered message body in plain format of the event."""
+
+    body_html: Optional[str] = None
+    """Defines the rendered message body in HTML format of the event."""
+
+    @property
+    def message_subject(self) -> Optional[str]:
+        """Defines the message subject of the notification event."""
+        return self.subject
+
+    @property
+    def message_title(self) -> Optional[str]:
+        """Defines the message title of the notification event."""
+        return self.title
+
+    @property
+    def message_body_plain(self) -> Optional[str]:
+        """Defines the message body in plain format of the notification event."""
+        return self.body_plain
+
+    @property
+    def message_body_html(self) -> Optional[str]:
+        """Defines the message body in HTML format of the notification event."""
+        return self.body_html
+
+
 ALL_EVENTS = Union[
     NotificationEvent, AlertEvent, TaskEvent, TaskExceptionEvent, TaskReceivedEvent, TaskRevokedEvent,
     TaskRejectedEvent, TaskPreRunEvent, TaskPostRunEvent, TaskSuccessEvent, TaskRetryEvent, TaskFailedEvent,
-    TaskInternalErrorEvent, TaskUnknownEvent
+    TaskInternalErrorEvent, TaskUnknownEvent, NotificationDigestEvent, RenderedEvent
 ]
 
 ALL_EVENTS_TYPE = type[ALL_EVENTS]
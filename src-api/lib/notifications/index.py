@@ -0,0 +1,148 @@
+from threading import Lock
+from typing import Hashable, Optional
+from lib.notifications.config import NotificationConfig, NotificationCriteria
+from lib.notifications.events import ALL_EVENTS, ALL_EVENTS_TYPE
+from lib.notifications.meta import normalize, values
+
+ANY = '*'
+""" The index key of configurations that don't restrict the category or task name of the events they apply to. """
+
+
+class NotificationIndex:
+    """
+    Indexes notification configurations by the event categories and task names their criteria are restricted to, so
+    that the configurations that may apply to an event are found with a few lookups rather than by evaluating every
+    configuration. Configurations with meta criteria are further indexed by the values of their most selective meta
+    criterion, so that only those whose anchor value appears in the event meta are evaluated against it. The index is
+    built once for each list of configurations loaded from a configuration snapshot.
+    """
+
+    configs: list[NotificationConfig]
+    """The indexed notification configurations."""
+
+    _entries: dict[tuple[str, str], list[int]]
+    """The positions of the indexed configurations keyed by their (category, task name) criteria."""
+
+    _categories: set[str]
+    """The event categories that configurations are indexed under, including ANY."""
+
+    _unmetered: set[int]
+    """The positions of the indexed configurations without meta criteria."""
+
+    _meta_values: dict[tuple[str, Hashable], set[int]]
+    """The positions of the configurations with meta criteria keyed by (meta key, comparison key) of their anchor."""
+
+    _meta_keys: dict[str, set[int]]
+    """The positions of the configurations with meta criteria whose anchor accepts values that can't be enumerated."""
+
+    _latest: Optional['NotificationIndex'] = None
+
+    _lock = Lock()
+
+    def __init__(self, configs: Optional[list[NotificationConfig]]):
+        self.configs = configs if isinstance(configs, list) else []
+        self._entries = {}
+        self._categories = set()
+        self._unmetered = set()
+        self._meta_values = {}
+        self._meta_keys = {}
+
+        for i, config in enumerate(self.configs):
+            # Configurations that can never apply are left out of the index entirely
+            if not config.enabled or not any(s.enabled for s in config.services or []):
+                continue
+
+            criteria = config.criteria if isinstance(config.criteria, NotificationCriteria) else None
+            anchor = criteria.compiled_meta.anchor if criteria else None
+
+            if anchor is None:
+                self._unmetered.add(i)
+            elif anchor.anchors is not None:
+                for value in anchor.anchors:
+                    self._meta_values.setdefault((anchor.key, value), set()).add(i)
+            else:
+                self._meta_keys.setdefault(anchor.key, set()).add(i)
+
+            for category in self._keys(criteria.category if criteria else None):
+                for task in self._keys(criteria.task if criteria else None):
+                    self._entries.setdefault((category, task), []).append(i)
+                    self._categories.add(category)
+
+    @classmethod
+    def of(cls, configs: Optional[list[NotificationConfig]]) -> 'NotificationIndex':
+        """Returns the index of the given configurations, building it only if they have changed since last indexed."""
+        index = cls._latest
+
+        if index is None or index.configs is not configs:
+            with cls._lock:
+                index = cls._latest
+
+                if index is None or index.configs is not configs:
+                    index = cls._latest = cls(configs)
+
+        return index
+
+    def subscribed(self, event_type: ALL_EVENTS_TYPE, task_name: Optional[str] = None) -> bool:
+        """
+        Determines whether any configuration may apply to events of the given type and task name, allowing callers
+        to skip creating events that nothing is subscribed to. Meta criteria are not considered, as the meta of an
+        event is only known once it has been created.
+        """
+        category = self._key(event_type.model_fields['category'].default)
+
+        if ANY not in self._categories and category not in self._categories:
+            return False
+
+        return bool(self._candidates(category, self._key(task_name)))
+
+    def candidates(self, event: ALL_EVENTS) -> list[NotificationConfig]:
+        """Returns the configurations whose category, task and meta criteria match the given event, in loaded order."""
+        task_name = getattr(event, 'task_name', None)
+        positions = self._candidates(self._key(event.category), self._key(task_name))
+
+        if not positions or not (self._meta_values or self._meta_keys):
+            return [self.configs[i] for i in positions]
+
+        metadata = event.metadata
+        metered = self._metered(metadata)
+
+        return [self.configs[i] for i in positions if i in self._unmetered
+                or (i in metered and self.configs[i].criteria.compiled_meta.applicable(metadata))]
+
+    def _metered(self, metadata: dict) -> set[int]:
+        """Returns the positions of the configurations with meta criteria whose anchor may match the given meta."""
+        positions = set()
+
+        for key, value in metadata.items():
+            positions.update(self._meta_keys.get(key, ()))
+
+            for v in values(value):
+                positions.update(self._meta_values.get((key, normalize(v)), ()))
+
+        return positions
+
+    def _candidates(self, category: Optional[str], task: Optional[str]) -> list[int]:
+        positions = []
+
+        for key in ((category, task), (category, ANY), (ANY, task), (ANY, ANY)):
+            positions.extend(self._entries.get(key, ()))
+
+        return sorted(set(positions))
+
+    @staticmethod
+    def _key(value) -> Optional[str]:
+        if value is None:
+            return None
+
+        return value.value if hasattr(value, 'value') else str(value)
+
+    @classmethod
+    def _keys(cls, criterion) -> list[str]:
+        """Returns the index keys of the given category or task criterion."""
+        if isinstance(criterion, (set, list, tuple)) and criterion:
+            return [cls._key(v) for v in criterion]
+
+        if criterion is not None and not isinstance(criterion, (set, list, tuple)):
+            return [cls._key(criterion)]
+
+        return [ANY]
@@ -0,0 +1,153 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, Iterable, Optional
+
+RANGE_OPERATORS = ('min', 'max', 'gt', 'lt')
+""" The operators of numeric range meta criteria, as inclusive (min, max) or exclusive (gt, lt) bounds. """
+
+
+def normalize(value: Any) -> Hashable:
+    """
+    Returns the comparison key of the given meta value, so that numbers compare equal regardless of their type while
+    booleans, numbers, and strings never compare equal to one another.
+    """
+    if isinstance(value, bool):
+        return 'b', value
+
+    if isinstance(value, (int, float)):
+        return 'n', float(value)
+
+    return 's', str(value)
+
+
+def values(value: Any) -> list:
+    """Returns the given event meta value as a list of the values it holds."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+
+    return [value]
+
+
+class MetaMatcher(ABC):
+    """Matches the value of a single event meta key against a meta criterion compiled from a notification config."""
+
+    key: str
+    """The meta key that the matcher applies to."""
+
+    anchors: Optional[frozenset]
+    """The comparison keys of the values that the matcher accepts, if it only accepts a known set of values."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.anchors = None
+
+    def match(self, value: Any) -> bool:
+        """Determines if the given event meta value, or any of its values if it holds several, is matched."""
+        return any(self.match_one(v) for v in values(value))
+
+    @abstractmethod
+    def match_one(self, value: Any) -> bool:
+        """Determines if the given single event meta value is matched."""
+
+
+class SetMatcher(MetaMatcher):
+    """Matches values equal to the criterion value, or to any of the criterion values if given several."""
+
+    def __init__(self, key: str, accepted: Iterable):
+        super().__init__(key)
+        self.anchors = frozenset(normalize(v) for v in accepted)
+
+    def match_one(self, value: Any) -> bool:
+        return normalize(value) in self.anchors
+
+
+class RangeMatcher(MetaMatcher):
+    """Matches numeric values within the criterion bounds."""
+
+    def __init__(self, key: str, min: Optional[float] = None, max: Optional[float] = None,
+                 gt: Optional[float] = None, lt: Optional[float] = None):
+        super().__init__(key)
+        self.min, self.max, self.gt, self.lt = min, max, gt, lt
+
+    def match_one(self, value: Any) -> bool:
+        if isinstance(value, bool):
+            return False
+
+        if not isinstance(value, (int, float)):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+
+        return ((self.min is None or value >= self.min) and (self.max is None or value <= self.max)
+                and (self.gt is None or value > self.gt) and (self.lt is None or value < self.lt))
+
+
+class RegexMatcher(MetaMatcher):
+    """Matches values whose string representation the criterion regular expression is found in."""
+
+    def __init__(self, key: str, pattern: str):
+        super().__init__(key)
+        self.pattern = re.compile(pattern)
+
+    def match_one(self, value: Any) -> bool:
+        return value is not None and self.pattern.search(str(value)) is not None
+
+
+class CompiledMeta:
+    """
+    The meta criteria of a notification config compiled into a matcher per meta key. An event applies when every
+    key is present in its meta and matched. The matcher whose accepted values are most selective is offered as the
+    anchor that notification indexes look configs up by.
+    """
+
+    matchers: list[MetaMatcher]
+    """The matchers of the meta criteria, one for each key."""
+
+    anchor: Optional[MetaMatcher]
+    """The matcher that the config is indexed by, preferring the one accepting the fewest known values."""
+
+    def __init__(self, meta: Optional[dict[str, Any]]):
+        self.matchers = [self.compile(k, v) for k, v in (meta or {}).items()]
+
+        anchored = [m for m in self.matchers if m.anchors is not None]
+        self.anchor = min(anchored, key=lambda m: len(m.anchors)) if anchored else (
+            self.matchers[0] if self.matchers else None)
+
+    @staticmethod
+    def compile(key: str, criterion: Any) -> MetaMatcher:
+        """
+        Compiles the given meta criterion. Scalars match equal values and lists match any of their values. Mappings
+        match with the `in`, `regex`, or numeric range (`min`, `max`, `gt`, `lt`) operators.
+        """
+        if isinstance(criterion, dict):
+            operators = set(criterion)
+
+            if operators == {'in'}:
+                return SetMatcher(key, values(criterion['in']))
+
+            if operators == {'regex'}:
+                try:
+                    return RegexMatcher(key, criterion['regex'])
+                except re.error as e:
+                    raise ValueError(f'Invalid regular expression for meta criterion "{key}": {e}')
+
+            if operators and operators <= set(RANGE_OPERATORS):
+                bounds = criterion.values()
+
+                if not all(isinstance(b, (int, float)) and not isinstance(b, bool) for b in bounds):
+                    raise ValueError(f'Range bounds of meta criterion "{key}" must be numbers.')
+
+                return RangeMatcher(key, **criterion)
+
+            raise ValueError(f'Meta criterion "{key}" has unsupported operators: {sorted(operators)}')
+
+        return SetMatcher(key, values(criterion))
+
+    def applicable(self, meta: dict[str, Any]) -> bool:
+        """Determines if the given event meta matches every meta criterion."""
+        for matcher in self.matchers:
+            if matcher.key not in meta or not matcher.match(meta[matcher.key]):
+                return False
+
+        return True
@@ -0,0 +1,302 @@
+import os
+import socket
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from sqlalchemy import Engine, and_, bindparam, or_, select
+from threading import Event, Lock
+from typing import Any, Callable, Iterable, Optional
+from lib.config.notifications import NotificationsConfig
+from lib.enums import NotificationCategoryEnum, NotificationServiceEnum
+from lib.notifications.config import ALL_SERVICE_RECIPIENTS_TYPE, NotificationConfig
+from lib.notifications.events import ALL_EVENTS, RenderedEvent
+from models.db.notifications import NotificationOutboxEntry, NotificationOutboxStatusEnum
+
+
+class NotificationOutbox:
+    """
+    Stores notifications in the database outbox so that they survive failed delivery attempts and restarts. Each
+    notification is stored with its rendered message as one entry per recipient, which delivery workers claim in
+    batches that concurrent workers skip over, so that every entry is only delivered by a single worker at a time.
+    """
+
+    config: NotificationsConfig.NotificationOutboxConfig
+    """The outbox configuration."""
+
+    _engine: Callable[[], Engine]
+    """Returns the database engine the outbox is stored in."""
+
+    @property
+    def engine(self) -> Engine:
+        """The database engine the outbox is stored in."""
+        return self._engine()
+
+    def __init__(self, config: NotificationsConfig.NotificationOutboxConfig, engine: Callable[[], Engine]):
+        self.config = config
+        self._engine = engine
+
+    def append(self, event: ALL_EVENTS, deliveries: Iterable[tuple[Any, ALL_SERVICE_RECIPIENTS_TYPE]]) -> int:
+        """Stores a notification of the given event for each of the given deliveries, returning the number stored."""
+        now = datetime.now()
+        rows = []
+
+        for sender, recipient in deliveries:
+            rows.append({
+                'service': sender.SERVICE.value,
+                'endpoint': sender.endpoint(recipient),
+                'config': sender.config.label,
+                'recipient': recipient.label,
+                'category': event.category.value if event.category is not None else None,
+                'task_name': getattr(event, 'task_name', None),
+                'subject': event.message_subject,
+                'title': event.message_title,
+                'body_plain': event.message_body_plain,
+                'body_html': event.message_body_html,
+                'status': NotificationOutboxStatusEnum.pending.value,
+                'attempts': 0,
+                'available_at': now,
+            })
+
+        if rows:
+            with self.engine.begin() as conn:
+                conn.execute(NotificationOutboxEntry.__table__.insert(), rows)
+
+        return len(rows)
+
+    def claim(self, worker_id: str, limit: Optional[int] = None) -> list[dict]:
+        """
+        Claims a batch of the notifications that are due for delivery for the given worker, along with those claimed
+        by workers that stopped before completing them. Entries locked by concurrent workers are skipped over.
+        """
+        table = NotificationOutboxEntry.__table__
+        now = datetime.now()
+
+        # The available timestamp of claimed entries records when they were claimed
+        query = (
+            select(table)
+            .where(or_(
+                and_(table.c.status == NotificationOutboxStatusEnum.pending.value, table.c.available_at <= now),
+                and_(table.c.status == NotificationOutboxStatusEnum.sending.value,
+                     table.c.available_at <= now - timedelta(seconds=self.config.claim_timeout)),
+            ))
+            .order_by(table.c.available_at)
+            .limit(limit or self.config.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        with self.engine.begin() as conn:
+            entries = [dict(row) for row in conn.execute(query).mappings()]
+
+            if entries:
+                conn.execute(
+                    table.update()
+                    .where(table.c.id.in_([e['id'] for e in entries]))
+                    .values(status=NotificationOutboxStatusEnum.sending.value, claimed_by=worker_id,
+                            available_at=now, attempts=table.c.attempts + 1)
+                )
+
+        for entry in entries:
+            entry['attempts'] += 1
+
+        return entries
+
+    def complete(self, ids: list):
+        """Marks the notifications of the given entry ids as sent."""
+        table = NotificationOutboxEntry.__table__
+
+        if not ids:
+            return
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.id.in_(ids))
+                .values(status=NotificationOutboxStatusEnum.sent.value, error=None, sent_at=datetime.now())
+            )
+
+    def fail(self, failures: list[tuple[dict, str]]):
+        """
+        Reschedules the notifications of the given claimed entries that failed to be delivered with exponential
+        backoff, or marks them as failed once they have exhausted their delivery attempts.
+        """
+        table = NotificationOutboxEntry.__table__
+        now = datetime.now()
+        rows = []
+
+        if not failures:
+            return
+
+        for entry, error in failures:
+            attempts = entry['attempts']
+            exhausted = attempts >= self.config.max_attempts
+            backoff = min(self.config.retry_backoff * (2 ** max(attempts - 1, 0)), self.config.retry_backoff_cap)
+
+            rows.append({
+                '_id': entry['id'],
+                '_status': (NotificationOutboxStatusEnum.failed if exhausted
+                            else NotificationOutboxStatusEnum.pending).value,
+                '_error': error,
+                '_available_at': now if exhausted else now + timedelta(seconds=backoff),
+            })
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.id == bindparam('_id'))
+                .values(status=bindparam('_status'), error=bindparam('_error'),
+                        available_at=bindparam('_available_at')),
+                rows,
+            )
+
+
+class NotificationDeliveryWorker:
+    """
+    Delivers the notifications stored in the notification outbox. Batches of due notifications are claimed and
+    grouped by service and endpoint; each group is delivered in order from the thread pool of its service, limited to
+    the concurrency of the service. Notifications that fail to be delivered are rescheduled with backoff.
+    """
+
+    outbox: NotificationOutbox
+    """The outbox that notifications are claimed from."""
+
+    worker_id: str
+    """The identifier of the worker recorded on the notifications it claims."""
+
+    _configs: Callable[[], Optional[list[NotificationConfig]]]
+    """Returns the current notification configurations that claimed notifications are delivered with."""
+
+    _executors: dict[NotificationServiceEnum, ThreadPoolExecutor]
+    """The thread pools that notifications are delivered from, keyed by service."""
+
+    _stopping: Event
+    """Set when the worker should stop once the current batch has been delivered."""
+
+    def __init__(self, outbox: NotificationOutbox, configs: Callable[[], Optional[list[NotificationConfig]]],
+                 worker_id: Optional[str] = None):
+        self.outbox = outbox
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self._configs = configs
+        self._executors = {}
+        self._stopping = Event()
+        self._lock = Lock()
+
+    def run(self):
+        """Claims and delivers batches of notifications until stopped."""
+        from loguru import logger
+
+        logger.info(f'Notification delivery worker {self.worker_id} started.')
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    entries = self.outbox.claim(self.worker_id)
+                except Exception as e:
+                    logger.warning(f'Failed to claim notifications from the outbox: {e}')
+                    entries = []
+
+                if not entries:
+                    self._stopping.wait(self.outbox.config.poll_interval)
+                    continue
+
+                self.deliver(entries)
+        finally:
+            with self._lock:
+                executors = list(self._executors.values())
+                self._executors.clear()
+
+            for executor in executors:
+                executor.shutdown(wait=True)
+
+            logger.info(f'Notification delivery worker {self.worker_id} stopped.')
+
+    def stop(self):
+        """Stops the worker once the current batch has been delivered."""
+        self._stopping.set()
+
+    def deliver(self, entries: list[dict]):
+        """Delivers the given claimed notifications, then records which were sent and which failed."""
+        from loguru import logger
+        from lib.notifications import NotificationManager
+
+        manager = NotificationManager(configs=self._configs())
+        groups: dict[tuple[str, str], list[dict]] = defaultdict(list)
+
+        for entry in entries:
+            groups[(entry['service'], entry['endpoint'])].append(entry)
+
+        futures = []
+
+        for (service, _), group in groups.items():
+            futures.append(self._executor(manager, NotificationServiceEnum(service)).submit(
+                self._deliver_group, manager, group,
+            ))
+
+        wait(futures)
+
+        sent, failures = [], []
+
+        for future in futures:
+            group_sent, group_failures = future.result()
+            sent += group_sent
+            failures += group_failures
+
+        self.outbox.complete(sent)
+        self.outbox.fail(failures)
+
+        logger.debug(f'Delivered {len(sent)} of {len(entries)} notifications from the outbox.')
+
+    def _executor(self, manager, service: NotificationServiceEnum) -> ThreadPoolExecutor:
+        """Returns the thread pool of the given service, creating it with the concurrency of the service if needed."""
+        with self._lock:
+            if service not in self._executors:
+                service_config = manager.get_service_config(service)
+                concurrency = service_config.concurrency if service_config is not None else 1
+
+                self._executors[service] = ThreadPoolExecutor(
+                    max_workers=max(concurrency, 1), thread_name_prefix=f'pda-deliver-{service.value}',
+                )
+
+            return self._executors[service]
+
+    def _deliver_group(self, manager, group: list[dict]) -> tuple[list, list[tuple[dict, str]]]:
+        """Delivers the given notifications to a single endpoint in order, returning the sent ids and failures."""
+        from loguru import logger
+
+        sent, failures = [], []
+
+        for entry in group:
+            try:
+                self._deliver_entry(manager, entry)
+                sent.append(entry['id'])
+            except Exception as e:
+                logger.warning(f'Failed to deliver {entry["service"]} notification to {entry["recipient"]} '
+                               + f'(attempt {entry["attempts"]}): {e}')
+                failures.append((entry, str(e)))
+
+        return sent, failures
+
+    @staticmethod
+    def _deliver_entry(manager, entry: dict):
+        """Delivers the given notification with the sender of its service."""
+        found = manager.find_recipient(entry['config'], entry['service'], entry['recipient'])
+
+        if found is None:
+            raise ValueError('The recipient is no longer configured.')
+
+        config, service, recipient = found
+
+        event = RenderedEvent(
+            category=NotificationCategoryEnum(entry['category']) if entry['category'] is not None else None,
+            task_name=entry['task_name'],
+            subject=entry['subject'],
+            title=entry['title'],
+            body_plain=entry['body_plain'],
+            body_html=entry['body_html'],
+        )
+
+        sender = manager.get_service_sender(service=service.name)(event=event, config=config, service=service)
+
+        if (service_config := manager.get_service_config(service.name)) is not None:
+            sender.timeout = service_config.timeout
+
+        sender.send(recipient=recipient)
@@ -0,0 +1,165 @@
+from bisect import bisect_right
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Iterable, Optional, TypeVar
+from zoneinfo import ZoneInfo
+
+T = TypeVar('T')
+
+DAY_US = 86400 * 1000000
+""" The number of microseconds in a day. """
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+""" The names of the days of the week ordered by their `datetime.weekday()` number. """
+
+
+@lru_cache(maxsize=None)
+def zone(name: str) -> ZoneInfo:
+    """Returns the timezone of the given IANA name."""
+    return ZoneInfo(name)
+
+
+class LocalTime:
+    """Represents an instant converted to the local date and time of a timezone."""
+
+    timestamp: datetime
+    """The timezone aware instant."""
+
+    date: date
+    """The local date of the instant."""
+
+    week_us: int
+    """The number of microseconds into the local week (starting Monday) of the instant."""
+
+    def __init__(self, timestamp: datetime):
+        self.timestamp = timestamp
+        self.date = timestamp.date()
+        self.week_us = timestamp.weekday() * DAY_US + self.time_us(timestamp.time())
+
+    @staticmethod
+    def time_us(value: time) -> int:
+        """Returns the number of microseconds into the day of the wall clock time of the given time."""
+        return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+
+
+class CompiledSchedule:
+    """
+    A recipient schedule compiled into the date ranges and the table of weekly time intervals it is restricted to,
+    which are evaluated against the local time of an instant with a few comparisons and a binary search.
+    """
+
+    timezone: str
+    """The IANA timezone the schedule is interpreted in."""
+
+    dates: Optional[list[tuple]]
+    """The (start, end) date or datetime ranges the schedule is restricted to, or None if unrestricted."""
+
+    intervals: Optional[list[tuple[int, int]]]
+    """The sorted, merged (start, end) weekly intervals in microseconds the schedule is restricted to, if any."""
+
+    _starts: list[int]
+    """The start of each weekly interval, for binary searches."""
+
+    def __init__(self, timezone: str, dates: Optional[list] = None, times: Optional[list] = None):
+        self.timezone = timezone
+        zone(timezone)
+        self.dates = [(d.start, d.end) for d in dates] if dates else None
+        self.intervals = self.compile_times(times) if times else None
+        self._starts = [start for start, _ in self.intervals or []]
+
+    @staticmethod
+    def compile_times(times: list) -> list[tuple[int, int]]:
+        """Compiles the given day of week and time restrictions into sorted, merged weekly intervals."""
+        intervals = []
+
+        for t in times:
+            days = [WEEKDAYS.index(d.value.lower()) for d in t.days] if t.days else range(7)
+            start = LocalTime.time_us(t.start) if isinstance(t.start, time) else 0
+            end = LocalTime.time_us(t.end) if isinstance(t.end, time) else DAY_US - 1
+
+            # A start time after the end time matches no time of the day
+            if start > end:
+                continue
+
+            for day in days:
+                intervals.append((day * DAY_US + start, day * DAY_US + end))
+
+        merged: list[tuple[int, int]] = []
+
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+
+        return merged
+
+    def applicable(self, local: LocalTime) -> bool:
+        """Determines if the schedule applies at the given local time of its timezone."""
+
+        if self.dates is not None and not any(self._in_range(local, s, e) for s, e in self.dates):
+            return False
+
+        if self.intervals is not None:
+            i = bisect_right(self._starts, local.week_us) - 1
+
+            if i < 0 or local.week_us > self.intervals[i][1]:
+                return False
+
+        return True
+
+    @staticmethod
+    def _in_range(local: LocalTime, start, end) -> bool:
+        if isinstance(start, datetime):
+            if local.timestamp < start:
+                return False
+        elif isinstance(start, date) and local.date < start:
+            return False
+
+        if isinstance(end, datetime):
+            if local.timestamp > end:
+                return False
+        elif isinstance(end, date) and local.date > end:
+            return False
+
+        return True
+
+
+class ScheduleEvaluator:
+    """
+    Evaluates recipient schedules for a single instant, such as the timestamp of an event. The instant is converted
+    to the local time of each timezone only once, however many schedules and recipients are evaluated.
+    """
+
+    timestamp: datetime
+    """The timezone aware instant schedules are evaluated for."""
+
+    _local: dict[str, LocalTime]
+    """The local times of the instant keyed by timezone."""
+
+    def __init__(self, timestamp: Optional[datetime] = None):
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.now(tz=zone('UTC'))
+        elif timestamp.tzinfo is None:
+            # Naive timestamps are taken to be in the system timezone, as with `datetime.astimezone`
+            timestamp = timestamp.astimezone()
+
+        self.timestamp = timestamp
+        self._local = {}
+
+    def local(self, timezone: str) -> LocalTime:
+        """Returns the local time of the instant in the given timezone."""
+        local = self._local.get(timezone)
+
+        if local is None:
+            local = self._local[timezone] = LocalTime(self.timestamp.astimezone(zone(timezone)))
+
+        return local
+
+    def schedule_applicable(self, schedule: CompiledSchedule) -> bool:
+        """Determines if the given compiled schedule applies at the instant."""
+        return schedule.applicable(self.local(schedule.timezone))
+
+    def filter(self, recipients: Iterable[T]) -> list[T]:
+        """Returns the given recipients that are applicable at the instant, evaluated in one pass."""
+        return [r for r in recipients if r.applicable(evaluator=self)]
@@ -0,0 +1,136 @@
+import hashlib
+from datetime import datetime
+from typing import Optional, TypeVar
+from redis import Redis
+from lib.config.notifications import NotificationsConfig
+from lib.notifications.config import ALL_NOTIFICATION_SERVICES_TYPE, NotificationConfig
+from lib.notifications.events import UTC_TZ, ALL_EVENTS
+
+T = TypeVar('T')
+
+KEY_PREFIX = 'pda:notifications:suppress:'
+""" The prefix of the Redis keys that suppression windows and digests are stored under. """
+
+ADMIT_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return {1, 0, 0}
+end
+
+local count = redis.call('HINCRBY', KEYS[2], 'count', 1)
+redis.call('HSETNX', KEYS[2], 'first', ARGV[1])
+redis.call('HSET', KEYS[2], 'last', ARGV[1])
+redis.call('HSETNX', KEYS[2], 'subject', ARGV[3])
+redis.call('PEXPIRE', KEYS[2], ARGV[4])
+
+return {0, count, redis.call('PTTL', KEYS[1])}
+"""
+""" Admits a notification opening a suppression window, or counts it towards the digest of the open window. """
+
+
+class NotificationSuppressor:
+    """
+    Suppresses duplicate notifications to a recipient across worker processes. The first notification of a config,
+    recipient, event category and task name is sent and opens a suppression window in Redis. Duplicates within the
+    window are counted rather than sent, and are summarized in a single digest notification once the window closes.
+    This keeps the number of notifications sent during a failure burst bounded to two per recipient per window.
+    """
+
+    DIGEST_DELAY: float = 1.0
+    """The number of seconds after a suppression window closes that its digest is sent."""
+
+    config: NotificationsConfig.NotificationSuppressionConfig
+    """The suppression configuration."""
+
+    _redis: Redis
+    """The Redis client that suppression windows and digests are stored with."""
+
+    def __init__(self, config: NotificationsConfig.NotificationSuppressionConfig, redis: Redis):
+        self.config = config
+        self._redis = redis
+        self._admit = redis.register_script(ADMIT_SCRIPT)
+
+    @staticmethod
+    def key(config: NotificationConfig, service: ALL_NOTIFICATION_SERVICES_TYPE, recipient, event: ALL_EVENTS) -> str:
+        """Returns the Redis key prefix of the suppression window of the given notification."""
+        category = event.category.value if event.category is not None else ''
+        task_name = getattr(event, 'task_name', None) or ''
+        identity = '\0'.join((config.label, service.name.value, recipient.label, category, task_name))
+        return KEY_PREFIX + hashlib.sha1(identity.encode()).hexdigest()
+
+    def admit(self, event: ALL_EVENTS, config: NotificationConfig, service: ALL_NOTIFICATION_SERVICES_TYPE,
+              recipients: list[T]) -> list[T]:
+        """
+        Returns the given recipients that the notification of the given event should be sent to, suppressing those
+        that were sent a duplicate within the suppression window, with a single round trip to Redis. The digest of a
+        suppression window is scheduled when its first duplicate is suppressed. Should Redis be unavailable, every
+        recipient is admitted.
+        """
+        from loguru import logger
+
+        if not recipients or not self.config.enabled or self.config.window <= 0:
+            return recipients
+
+        timestamp = (event.timestamp or datetime.now(tz=UTC_TZ)).isoformat()
+        window = int(self.config.window * 1000)
+        keys = [self.key(config, service, r, event) for r in recipients]
+
+        try:
+            with self._redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    self._admit(keys=[f'{key}:window', f'{key}:digest'],
+                                args=[timestamp, window, event.message_subject or '', window * 2], client=pipe)
+
+                results = pipe.execute()
+        except Exception as e:
+            logger.warning(f'Failed to check notification suppression; sending without suppression: {e}')
+            return recipients
+
+        admitted = []
+
+        for recipient, key, (allowed, count, remaining) in zip(recipients, keys, results):
+            if allowed:
+                admitted.append(recipient)
+                continue
+
+            logger.debug(f'Suppressed duplicate {service.name.value} notification to {recipient.label}.')
+
+            if count == 1:
+                self.schedule_digest(key, event, config, service, recipient, max(remaining, 0) / 1000)
+
+        return admitted
+
+    def schedule_digest(self, key: str, event: ALL_EVENTS, config: NotificationConfig,
+                        service: ALL_NOTIFICATION_SERVICES_TYPE, recipient, delay: float):
+        """Schedules the digest of the given suppression window to be sent once the window has closed."""
+        from loguru import logger
+        from lib.enums import TaskEnum
+        from worker import app as celery_app
+
+        kwargs = {
+            'key': key,
+            'config': config.label,
+            'service': service.name.value,
+            'recipient': recipient.label,
+            'category': event.category.value if event.category is not None else None,
+            'task_name': getattr(event, 'task_name', None),
+        }
+
+        try:
+            celery_app.send_task(TaskEnum.PDA_NOTIFICATION_DIGEST.value, kwargs=kwargs,
+                                 countdown=delay + self.DIGEST_DELAY)
+        except Exception as e:
+            logger.warning(f'Failed to schedule the notification digest for {recipient.label}: {e}')
+
+    def collect(self, key: str) -> Optional[dict[str, str]]:
+        """Returns and clears the digest of the suppressed notifications of the given suppression window (if any)."""
+
+        with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(f'{key}:digest')
+            pipe.delete(f'{key}:digest')
+            digest, _ = pipe.execute()
+
+        if not digest:
+            return None
+
+        return {k.decode() if isinstance(k, bytes) else k: v.decode() if isinstance(v, bytes) else v
+                for k, v in digest.items()}
@@ -0,0 +1,82 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+PROFILE_ENV_VAR = 'PDA_PROFILE_STARTUP'
+""" The environment variable that enables startup phase profiling when set to a truthy value. """
+
+
+class StartupProfiler:
+    """
+    Records the duration of named startup phases such as environment loading, configuration validation, router
+    installation and task discovery. Recording is a no-op unless the profiler is enabled.
+    """
+
+    enabled: bool
+    """Whether phase timings are recorded."""
+
+    _origin: float
+    """The performance counter value that phase offsets are measured from."""
+
+    _phases: list[dict]
+    """The recorded phases in the order they started."""
+
+    _depth: int
+    """The nesting depth of the currently running phase."""
+
+    _complete: bool
+    """Whether startup has completed, after which no further phases are recorded."""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.getenv(PROFILE_ENV_VAR, '').lower() in ('1', 'true', 'yes', 'on')
+
+        self.enabled = enabled
+        self._origin = time.perf_counter()
+        self._phases = []
+        self._depth = 0
+        self._complete = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Records the duration of the wrapped block as a startup phase with the given name."""
+        if not self.enabled or self._complete:
+            yield
+            return
+
+        record = {'name': name, 'depth': self._depth, 'pid': os.getpid(), 'offset': None, 'duration': None}
+        self._phases.append(record)
+        self._depth += 1
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._depth -= 1
+            record['offset'] = start - self._origin
+            record['duration'] = end - start
+
+    def complete(self):
+        """Marks startup as complete so that phases run while serving (e.g. reinitialization) aren't recorded."""
+        self._complete = True
+
+    def report(self) -> list[dict]:
+        """Returns the recorded phases of the current process."""
+        pid = os.getpid()
+        return [dict(p) for p in self._phases if p['pid'] == pid and p['duration'] is not None]
+
+    def format(self) -> str:
+        """Returns the recorded phases formatted as an indented table."""
+        lines = []
+
+        for p in self.report():
+            name = f'{"  " * p["depth"]}{p["name"]}'
+            lines.append(f'{name:<40} {p["offset"] * 1000:>10.1f}ms {p["duration"] * 1000:>10.1f}ms')
+
+        return '\n'.join(lines)
+
+
+profiler = StartupProfiler()
+""" The process-wide startup profiler. """
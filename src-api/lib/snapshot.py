@@ -0,0 +1,397 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Any, Optional, Union
+from lib import AppSettings
+from lib.config import Config
+from lib.config.app import AppConfig
+from lib.config.tasks import TaskSchedule
+from lib.notifications.config import NotificationConfig
+
+SUBSYSTEM_SECTIONS: tuple[str, ...] = (
+    'api.runtime.init', 'db.mysql', 'db.redis', 'db.sql_url', 'logging', 'mail', 'notifications', 'paths',
+    'services.twilio', 'services.zabbix', 'tasks.jobs',
+)
+""" The dotted configuration section paths that app subsystems are built from. """
+
+
+def input_paths(settings: AppSettings) -> list[Path]:
+    """Returns the file and directory paths that the configuration referenced by the given settings is loaded from."""
+    from lib import environment_paths
+
+    paths = environment_paths(settings.env_prefix) + [
+        settings.env_file, settings.env_secrets_dir,
+        settings.config_path, settings.notification_path, settings.schedule_path,
+    ]
+
+    return [Path(p) for p in paths if p is not None]
+
+
+class ConfigFingerprint:
+    """Computes a fingerprint of every file and environment variable that the app configuration is derived from."""
+
+    _digests: dict[str, tuple[tuple, str]]
+    """A cache of file content digests keyed by path and validated against the file's stat identity."""
+
+    _lock: threading.Lock
+    """A lock guarding access to the digest cache."""
+
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def file_identity(self, path: Union[str, Path, None]) -> tuple:
+        """Returns the identity of the given path as its mtime, size, inode and content digest."""
+
+        if path is None:
+            return (None,)
+
+        path = str(path)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+
+        if os.path.isdir(path):
+            try:
+                entries = sorted(os.listdir(path))
+            except OSError:
+                entries = []
+            return path, stat.st_mtime_ns, stat.st_ino, tuple(
+                self.file_identity(os.path.join(path, e)) for e in entries
+            )
+
+        stat_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            cached = self._digests.get(path)
+
+        # Only re-hash the file contents when the stat identity of the file has changed
+        if cached is not None and cached[0] == stat_key:
+            digest = cached[1]
+        else:
+            try:
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                digest = None
+
+            with self._lock:
+                self._digests[path] = (stat_key, digest)
+
+        return path, *stat_key, digest
+
+    @staticmethod
+    def environment_identity(prefixes: set[str]) -> tuple:
+        """Returns the sorted environment variables that start with any of the given prefixes."""
+        return tuple(sorted(
+            (k, v) for k, v in os.environ.items() if any(k.startswith(f'{p}_') for p in prefixes)
+        ))
+
+    def compute(self, settings: AppSettings, env_prefix: str) -> str:
+        """Computes the fingerprint of the configuration inputs referenced by the given settings."""
+
+        prefixes = {env_prefix, settings.env_prefix}
+
+        identity = (
+            self.environment_identity(prefixes),
+            tuple(self.file_identity(p) for p in input_paths(settings)),
+        )
+
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    def version(self, settings: AppSettings) -> str:
+        """
+        Computes the content version of the YAML configuration files referenced by the given settings. Unlike the
+        fingerprint, the version only depends on file contents so that it is comparable across hosts.
+        """
+        paths = (settings.config_path, settings.notification_path, settings.schedule_path)
+        digests = tuple(self.file_identity(p)[-1] for p in paths)
+        return hashlib.sha256(repr(digests).encode('utf-8')).hexdigest()
+
+
+class ConfigSnapshot:
+    """Represents a loaded and validated set of app settings and configuration objects."""
+
+    fingerprint: str
+    """The fingerprint of the configuration inputs that the snapshot was built from."""
+
+    version: str
+    """The content version of the configuration files that the snapshot was built from."""
+
+    settings: AppSettings
+    """The application settings loaded from the environment."""
+
+    config: Config
+    """The app configuration loaded from the config file."""
+
+    notifications: Optional[list[NotificationConfig]]
+    """The notification configurations loaded from the notifications file (if any)."""
+
+    schedules: Optional[list[TaskSchedule]]
+    """The task schedules loaded from the schedules file (if any)."""
+
+    def __init__(self, fingerprint: str, version: str, settings: AppSettings, objects: Optional[tuple] = None):
+        self.fingerprint = fingerprint
+        self.version = version
+        self.settings = settings
+
+        # Validated objects may be provided by the snapshot store, otherwise they are loaded from the settings
+        if objects is None:
+            objects = settings.config, settings.notifications, settings.schedules
+
+        self.config, self.notifications, self.schedules = objects
+
+    @property
+    def objects(self) -> tuple:
+        """The validated configuration, notification and schedule objects of the snapshot."""
+        return self.config, self.notifications, self.schedules
+
+    @property
+    def paths(self) -> list[Path]:
+        """The file and directory paths that the snapshot was loaded from."""
+        return input_paths(self.settings)
+
+    def section(self, path: str) -> Any:
+        """Returns the plain value of the configuration section at the given dotted path."""
+        value = self.config
+
+        for key in path.split('.'):
+            value = getattr(value, key, None)
+
+        if isinstance(value, BaseModel):
+            return value.model_dump()
+
+        return value
+
+    def changed_sections(self, previous: Optional['ConfigSnapshot'],
+                         sections: tuple[str, ...] = SUBSYSTEM_SECTIONS) -> set[str]:
+        """Returns the given configuration sections whose values differ from those of the given snapshot."""
+
+        if previous is None:
+            return set(sections)
+
+        changed = {s for s in sections if self.section(s) != previous.section(s)}
+
+        # The debug setting influences the log level in addition to the logging configuration section
+        if 'logging' in sections and self.settings.debug != previous.settings.debug:
+            changed.add('logging')
+
+        return changed
+
+
+class ConfigSnapshotStore:
+    """
+    Stores validated configuration objects on disk so that other processes can load them without re-validating.
+    Entries are keyed by the content version of the configuration files, the environment, and the source of the
+    configuration models, so a changed model or input results in a new entry rather than a stale one.
+    """
+
+    FORMAT: int = 1
+    """ The version of the stored entry format. """
+
+    MODEL_SOURCES: tuple[str, ...] = ('lib/config', 'lib/notifications/config.py', 'lib/notifications/meta.py',
+                                     'lib/notifications/schedules.py', 'models/base.py')
+    """ The source paths, relative to the app source directory, of the models that stored entries contain. """
+
+    _fingerprint: ConfigFingerprint
+    """The fingerprint calculator used to compute entry keys."""
+
+    _models: Optional[str] = None
+    """The digest of the configuration model sources, computed once per process."""
+
+    def __init__(self, fingerprint: ConfigFingerprint):
+        self._fingerprint = fingerprint
+
+    @staticmethod
+    def directory(settings: AppSettings) -> Optional[Path]:
+        """Returns the cache directory for the given settings, or None if caching is disabled."""
+        if not settings.config_cache:
+            return None
+
+        if settings.config_cache_dir is not None:
+            return Path(settings.config_cache_dir)
+
+        uid = os.getuid() if hasattr(os, 'getuid') else 'user'
+
+        return Path(tempfile.gettempdir()) / f'pda-config-{uid}'
+
+    def key(self, version: str, env_prefixes: set[str]) -> str:
+        """Returns the entry key for the given configuration content version and environment prefixes."""
+        if self._models is None:
+            root = Path(__file__).resolve().parent.parent
+            sources = [root / p for p in self.MODEL_SOURCES]
+            files = sorted(f for p in sources for f in (p.glob('*.py') if p.is_dir() else [p]))
+            self._models = repr(tuple(self._fingerprint.file_identity(f)[-1] for f in files))
+
+        identity = (
+            self.FORMAT, sys.version_info[:2], version, self._models,
+            self._fingerprint.environment_identity(env_prefixes),
+        )
+
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    def load(self, settings: AppSettings, key: str) -> Optional[tuple]:
+        """Returns the stored configuration, notification and schedule objects for the given key (if any)."""
+        from loguru import logger
+
+        directory = self.directory(settings)
+
+        if directory is None or not self._trusted(directory):
+            return None
+
+        path = directory / f'{key}.pickle'
+
+        try:
+            with open(path, 'rb') as f:
+                objects = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Discarding unreadable configuration cache entry "{path}": {e}')
+            self._remove(path)
+            return None
+
+        if not isinstance(objects, tuple) or len(objects) != 3:
+            self._remove(path)
+            return None
+
+        logger.trace(f'Loaded validated configuration from cache: {path}')
+
+        return objects
+
+    def save(self, settings: AppSettings, key: str, objects: tuple):
+        """Stores the given configuration, notification and schedule objects under the given key."""
+        from loguru import logger
+
+        directory = self.directory(settings)
+
+        if directory is None:
+            return
+
+        try:
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+            if not self._trusted(directory):
+                return
+
+            # Write to a temporary file first so that concurrent readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(objects, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, directory / f'{key}.pickle')
+            except BaseException:
+                self._remove(Path(tmp_path))
+                raise
+
+        except Exception as e:
+            logger.warning(f'Failed to cache validated configuration in "{directory}": {e}')
+
+    @staticmethod
+    def _trusted(directory: Path) -> bool:
+        """Whether the given directory is owned by the current user and not writable by others."""
+        try:
+            stat = directory.stat()
+        except OSError:
+            return False
+
+        if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+            return False
+
+        return not stat.st_mode & 0o022
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class ConfigSnapshotCache:
+    """Provides access to the current configuration snapshot, rebuilding it only when its inputs have changed."""
+
+    _fingerprint: ConfigFingerprint
+    """The fingerprint calculator used to detect configuration input changes."""
+
+    _store: ConfigSnapshotStore
+    """The on-disk store of validated configuration objects."""
+
+    _lock: threading.RLock
+    """A lock guarding snapshot rebuilds."""
+
+    _snapshot: Optional[ConfigSnapshot] = None
+    """The most recently loaded configuration snapshot."""
+
+    @property
+    def snapshot(self) -> Optional[ConfigSnapshot]:
+        """The most recently loaded configuration snapshot."""
+        return self._snapshot
+
+    def __init__(self):
+        self._fingerprint = ConfigFingerprint()
+        self._store = ConfigSnapshotStore(self._fingerprint)
+        self._lock = threading.RLock()
+        self._snapshot = None
+
+    def refresh(self, force: bool = False) -> tuple[ConfigSnapshot, bool]:
+        """
+        Returns the current configuration snapshot along with whether it was rebuilt. The snapshot is rebuilt when
+        forced, when none has been loaded yet, or when any of the configuration inputs have changed.
+        """
+        from lib import load_environment, load_settings
+        from lib.profiling import profiler
+
+        env_prefix = AppConfig.EnvironmentConfig.model_fields['prefix'].default
+
+        with self._lock:
+            current = self._snapshot
+
+            # Fast path: re-fingerprint the inputs referenced by the current snapshot without loading anything
+            if not force and current is not None:
+                if self._fingerprint.compute(current.settings, env_prefix) == current.fingerprint:
+                    return current, False
+
+            # Load the environment settings from the file system
+            with profiler.phase('config.environment'):
+                load_environment(env_prefix)
+
+            with profiler.phase('config.settings'):
+                # Load the application settings model based on default environment settings
+                settings = load_settings(env_prefix=env_prefix)
+
+                # Reload the application settings model based on prefix loaded from the environment if different
+                if settings.env_prefix != env_prefix:
+                    settings = load_settings(env_prefix=settings.env_prefix)
+
+            # Fingerprint the inputs before reading them so that a concurrent edit results in another reload
+            fingerprint = self._fingerprint.compute(settings, env_prefix)
+
+            if not force and current is not None and fingerprint == current.fingerprint:
+                return current, False
+
+            version = self._fingerprint.version(settings)
+
+            # Load previously validated objects for identical inputs instead of validating them again
+            key = self._store.key(version, {env_prefix, settings.env_prefix})
+
+            with profiler.phase('config.validation'):
+                objects = self._store.load(settings, key)
+                self._snapshot = ConfigSnapshot(fingerprint, version, settings, objects)
+
+            if objects is None:
+                self._store.save(settings, key, self._snapshot.objects)
+
+            return self._snapshot, True
+
+
+snapshots = ConfigSnapshotCache()
+""" The process-wide configuration snapshot cache. """
@@ -2,7 +2,7 @@ import os
 import re
 import yaml
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 
 class ConfigBuilder:
@@ -118,6 +118,182 @@ class ConfigLoader:
         return data
 
 
+class ConfigReferenceException(ValueError):
+    """Raised when configuration references can't be resolved, such as when they form a cycle."""
+    pass
+
+
+class CompiledConfig:
+    """
+    Provides a configuration dictionary whose variable references are resolved on demand. Only the values that a
+    requested value depends on are resolved, in dependency order, and each is resolved at most once regardless of how
+    often it is referenced, so a lookup costs no more than the part of the configuration it references.
+    """
+
+    config: dict
+    """The source configuration dictionary."""
+
+    default: any
+    """The value used in place of references to missing configuration keys."""
+
+    _strings: dict[tuple, str]
+    """The resolved values of the strings containing references, keyed by path."""
+
+    _values: dict[tuple, any]
+    """The resolved copies of referenced values, keyed by path."""
+
+    _nodes: dict[tuple, list[tuple]]
+    """The paths of the strings containing references within each referenced value, keyed by path."""
+
+    @property
+    def resolved(self) -> Union[dict, list]:
+        """A copy of the source configuration with all variable references resolved."""
+        return self._value(())
+
+    def __init__(self, config: dict, default: any = None):
+        self.config = config
+        self.default = default
+        self._strings = {}
+        self._values = {}
+        self._nodes = {}
+
+    def reference(self, key: str, default: any = None) -> any:
+        """Returns the resolved configuration value for the given key, or the parsed default if not found."""
+        path = ConfigParser.path(self.config, key)
+
+        if path is None:
+            return self.parse(default)
+
+        return self._value(path)
+
+    def parse(self, value: any) -> any:
+        """Returns a copy of the given value with all variable references resolved."""
+        if isinstance(value, str):
+            return self.parse_string(value)
+
+        if isinstance(value, list):
+            return [self.parse(item) for item in value]
+
+        if isinstance(value, dict):
+            return {k: self.parse(v) for k, v in value.items()}
+
+        return value
+
+    def parse_string(self, value: str) -> str:
+        """Returns the given string with all variable references replaced by their resolved values."""
+        return ConfigParser.ref_pattern.sub(self._substitute, value)
+
+    def _substitute(self, match: re.Match) -> str:
+        if match.group(1).lower() == 'e':
+            return str(os.getenv(match.group(2)))
+
+        path = ConfigParser.path(self.config, match.group(2))
+
+        if path is None:
+            return str(self.parse(self.default))
+
+        return str(self._value(path))
+
+    def _value(self, path: tuple) -> any:
+        """Returns the resolved copy of the configuration value at the given path."""
+        if path not in self._values:
+            self._require(self._nodes_within(path))
+            self._values[path] = self._build(self._get(self.config, path), path)
+
+        return self._values[path]
+
+    def _build(self, value: any, path: tuple) -> any:
+        """Returns a copy of the given value with its reference strings replaced by their resolved values."""
+        if isinstance(value, dict):
+            return {k: self._build(v, path + (k,)) for k, v in value.items()}
+
+        if isinstance(value, list):
+            return [self._build(v, path + (i,)) for i, v in enumerate(value)]
+
+        return self._strings.get(path, value)
+
+    def _require(self, paths: list[tuple]):
+        """
+        Resolves the strings containing references at the given paths along with the strings they depend on, in
+        dependency order, raising if any of them depend on themselves.
+        """
+        for root in paths:
+            if root in self._strings:
+                continue
+
+            # Depth-first search without recursion, so that long chains of references can't exhaust the stack
+            stack = [(root, iter(self._dependencies(root)))]
+            active = {root: 0}
+
+            while stack:
+                path, dependencies = stack[-1]
+
+                for dependency in dependencies:
+                    if dependency in self._strings:
+                        continue
+
+                    if dependency in active:
+                        cycle = [p for p, _ in stack[active[dependency]:]] + [dependency]
+                        raise ConfigReferenceException(
+                            'Circular configuration reference: '
+                            + ' -> '.join('/'.join(str(k) for k in p) for p in cycle)
+                        )
+
+                    active[dependency] = len(stack)
+                    stack.append((dependency, iter(self._dependencies(dependency))))
+                    break
+                else:
+                    stack.pop()
+                    del active[path]
+                    self._strings[path] = self.parse_string(self._get(self.config, path))
+
+    def _dependencies(self, path: tuple) -> list[tuple]:
+        """Returns the paths of the strings containing references that the string at the given path depends on."""
+        dependencies = []
+
+        for ref, key in ConfigParser.ref_pattern.findall(self._get(self.config, path)):
+            if ref.lower() != 'c':
+                continue
+
+            target = ConfigParser.path(self.config, key)
+
+            if target is not None:
+                dependencies.extend(self._nodes_within(target))
+
+        return dependencies
+
+    def _nodes_within(self, path: tuple) -> list[tuple]:
+        """Returns the paths of the strings containing references within the configuration value at the given path."""
+        if path not in self._nodes:
+            nodes: dict[tuple, str] = {}
+            self._collect(self._get(self.config, path), path, nodes)
+            self._nodes[path] = list(nodes)
+
+        return self._nodes[path]
+
+    @classmethod
+    def _collect(cls, value: any, path: tuple, nodes: dict[tuple, str]):
+        """Collects the paths of all string values containing references within the given value."""
+        if isinstance(value, dict):
+            for k, v in value.items():
+                cls._collect(v, path + (k,), nodes)
+
+        elif isinstance(value, list):
+            for i, v in enumerate(value):
+                cls._collect(v, path + (i,), nodes)
+
+        elif isinstance(value, str) and ConfigParser.ref_pattern.search(value):
+            nodes[path] = value
+
+    @staticmethod
+    def _get(value: any, path: tuple) -> any:
+        """Returns the item at the given path of dictionary keys and list indexes within the given value."""
+        for k in path:
+            value = value[k]
+
+        return value
+
+
 class ConfigParser:
     """A class for parsing variable references from values."""
 
@@ -125,20 +301,38 @@ class ConfigParser:
     """ The regular expression pattern used to match variable references in values. """
 
     @staticmethod
-    def reference(config: dict, key: str, default: any = None, parse: bool = True) -> any:
-        """ Returns the configuration value for the given key, or the given default if not found. """
-        from functools import reduce
+    def compile(config: dict, default: any = None) -> CompiledConfig:
+        """ Compiles the given configuration so that its values are resolved on demand, each at most once. """
+        return CompiledConfig(config, default)
+
+    @staticmethod
+    def path(config: dict, key: str) -> Optional[tuple]:
+        """ Returns the path of the configuration value for the given key, or None if not found. """
 
         segment_boundary = '/' if '/' in key else '__'
-        segments = key.split(segment_boundary)
+        path = []
+        value = config
 
         try:
-            result = reduce(lambda c, k: c[k] if not k.isnumeric() else c[int(k)], segments, config)
-        except (KeyError, TypeError):
-            result = default
+            for k in key.split(segment_boundary):
+                k = k if not k.isnumeric() else int(k)
+                value = value[k]
+                path.append(k)
+        except (KeyError, TypeError, IndexError):
+            return None
+
+        return tuple(path)
+
+    @staticmethod
+    def reference(config: dict, key: str, default: any = None, parse: bool = True) -> any:
+        """ Returns the configuration value for the given key, or the given default if not found. """
+
         if parse:
-            result = ConfigParser.parse(config, result)
-        return result
+            return ConfigParser.compile(config, default).reference(key, default)
+
+        path = ConfigParser.path(config, key)
+
+        return CompiledConfig._get(config, path) if path is not None else default
 
     @staticmethod
     def update(config: dict, key: str, value: any) -> dict:
@@ -160,61 +354,32 @@ class ConfigParser:
         """ Parses the given value for configuration references, updating the values with current configuration
         values, and returning the updated copy. """
 
-        result = value.copy() if (isinstance(value, dict) or isinstance(value, list)) else value
+        # The configuration itself depends on every one of its values
+        if value is config:
+            return ConfigParser.compile(config, default).resolved
 
-        if isinstance(result, str):
-            result = ConfigParser.parse_string(config, result, default)
-
-        elif isinstance(result, list):
-            result = ConfigParser.parse_list(config, result, default)
-
-        elif isinstance(result, dict):
-            result = ConfigParser.parse_dict(config, result, default)
-
-        return result
+        return ConfigParser.compile(config, default).parse(value)
 
     @staticmethod
     def parse_string(config: dict, value: str, default: any = None) -> str:
         """ Parses the given string for configuration references, updating the values with current configuration
         values, and returning the updated copy. """
 
-        # Process $(c|e){...} references
-        matches = ConfigParser.ref_pattern.findall(value)
-
-        for match in matches:
-            ref = str(match[0]).lower()
-            if ref == 'c':
-                config_value = ConfigParser.reference(config, match[1], default, True)
-                value = value.replace(f'${match[0]}{{{match[1]}}}', str(config_value))
-            elif ref == 'e':
-                env_value = os.getenv(match[1])
-                value = value.replace(f'${match[0]}{{{match[1]}}}', str(env_value))
-
-        return value
+        return ConfigParser.compile(config, default).parse_string(value)
 
     @staticmethod
     def parse_list(config: dict, value: list, default: any = None) -> list:
         """ Parses the given list for configuration references, updating the values with current configuration
         values, and returning the updated copy. """
 
-        result = []
-
-        for item in value:
-            result.append(ConfigParser.parse(config, item, default))
-
-        return result
+        return ConfigParser.compile(config, default).parse(value)
 
     @staticmethod
     def parse_dict(config: dict, value: dict, default: any = None) -> dict:
         """ Parses the given dictionary for configuration references, updating the values with current configuration
         values, and returning the updated copy. """
 
-        result = {}
-
-        for k, v in value.items():
-            result[k] = ConfigParser.parse(config, v, default)
-
-        return result
+        return ConfigParser.compile(config, default).parse(value)
 
 
 class ConfigUtil:
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LazyProxy(Generic[T]):
+    """
+    A proxy that constructs its target on first use and forwards attribute access and calls to it. The proxy is
+    fork-aware: a target constructed in a parent process is discarded and rebuilt on first use within a child.
+    """
+
+    _name: str
+    """The name of the proxied object used in logging and reporting."""
+
+    _factory: Callable[[], T]
+    """The callable used to construct the target."""
+
+    _teardown: Optional[Callable[[T], None]]
+    """The callable used to release the target when the proxy is reset (if any)."""
+
+    _on_fork: Optional[Callable[[T], None]]
+    """The callable used to detach a target inherited from a parent process without closing its resources."""
+
+    _target: Optional[T]
+    """The constructed target, if any."""
+
+    _pid: Optional[int]
+    """The id of the process that constructed the target."""
+
+    _build_time: Optional[float]
+    """The number of seconds it took to construct the target."""
+
+    _lock: threading.RLock
+    """A lock guarding target construction."""
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the target has been constructed within the current process."""
+        return self._target is not None and self._pid == os.getpid()
+
+    @property
+    def build_time(self) -> Optional[float]:
+        """The number of seconds it took to construct the target within the current process (if constructed)."""
+        return self._build_time if self.initialized else None
+
+    def __init__(self, name: str, factory: Callable[[], T], teardown: Optional[Callable[[T], None]] = None,
+                 on_fork: Optional[Callable[[T], None]] = None):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_teardown', teardown)
+        object.__setattr__(self, '_on_fork', on_fork)
+        object.__setattr__(self, '_target', None)
+        object.__setattr__(self, '_pid', None)
+        object.__setattr__(self, '_build_time', None)
+        object.__setattr__(self, '_lock', threading.RLock())
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.resolve(), item)
+
+    def __setattr__(self, key: str, value: Any):
+        setattr(self.resolve(), key, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = repr(self._target) if self.initialized else 'uninitialized'
+        return f'<LazyProxy {self._name}: {state}>'
+
+    def resolve(self) -> T:
+        """Returns the target, constructing it first if it hasn't been constructed within the current process."""
+        target, pid = self._target, self._pid
+
+        if target is not None and pid == os.getpid():
+            return target
+
+        from loguru import logger
+
+        with self._lock:
+            if self._target is not None and self._pid != os.getpid():
+                self._detach()
+
+            if self._target is None:
+                start = time.perf_counter()
+                object.__setattr__(self, '_target', self._factory())
+                object.__setattr__(self, '_pid', os.getpid())
+                object.__setattr__(self, '_build_time', time.perf_counter() - start)
+                logger.trace(f'Initialized {self._name} in {self._build_time * 1000:.2f}ms.')
+
+            return self._target
+
+    def reset(self):
+        """Releases the target so that it is reconstructed from the factory on next use."""
+        with self._lock:
+            target = self._target
+
+            if target is not None and self._pid != os.getpid():
+                self._detach()
+                return
+
+            object.__setattr__(self, '_target', None)
+            object.__setattr__(self, '_pid', None)
+            object.__setattr__(self, '_build_time', None)
+
+            if target is not None and self._teardown is not None:
+                try:
+                    self._teardown(target)
+                except Exception:
+                    pass
+
+    def _detach(self):
+        """Drops a target inherited from a parent process without tearing down the resources it shares."""
+        target = self._target
+
+        object.__setattr__(self, '_target', None)
+        object.__setattr__(self, '_pid', None)
+        object.__setattr__(self, '_build_time', None)
+
+        if self._on_fork is not None:
+            try:
+                self._on_fork(target)
+            except Exception:
+                pass
@@ -0,0 +1,321 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from loguru import logger
+from pathlib import Path
+from typing import Optional, Union
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o00004000
+IN_CLOEXEC = 0o02000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+""" The inotify event mask used for watched directories. """
+
+EVENT_HEADER = struct.Struct('iIII')
+""" The binary layout of an inotify event header: watch descriptor, mask, cookie and name length. """
+
+
+class Inotify:
+    """Provides a minimal ctypes binding to the Linux inotify API."""
+
+    _libc = None
+
+    fd: int
+    """The inotify instance file descriptor."""
+
+    def __init__(self):
+        import ctypes, ctypes.util
+
+        if Inotify._libc is None:
+            Inotify._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: Union[str, Path], mask: int = WATCH_MASK) -> int:
+        """Adds a watch for the given path and returns its watch descriptor."""
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+
+        return wd
+
+    def read(self) -> list[tuple[int, int, str]]:
+        """Reads all pending events as a list of watch descriptor, mask and name tuples."""
+        events = []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+
+        offset = 0
+
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+
+        return events
+
+    def close(self):
+        """Closes the inotify instance."""
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class ConfigWatcher:
+    """
+    Watches a set of configuration files and directories for changes. Linux inotify is used when available, and
+    the watcher falls back to polling file identities otherwise. Bursts of events are debounced so that a single
+    change is reported once the paths have been quiet for the debounce window.
+    """
+
+    _paths: list[Path]
+    """The watched file and directory paths."""
+
+    _debounce: float
+    """The number of seconds without further events required before a change is reported."""
+
+    _poll_interval: float
+    """The number of seconds between file identity checks when polling."""
+
+    _inotify: Optional[Inotify] = None
+    """The inotify instance if inotify is available."""
+
+    _watches: dict[int, Optional[set[str]]]
+    """The relevant entry names for each inotify watch descriptor, or None when any entry is relevant."""
+
+    _identities: dict[Path, tuple]
+    """The last seen identity of each watched path."""
+
+    _wake_r: int
+    """The read end of the pipe used to wake blocked waiters."""
+
+    _wake_w: int
+    """The write end of the pipe used to wake blocked waiters."""
+
+    _closed: threading.Event
+    """Set once the watcher has been closed."""
+
+    @property
+    def backend(self) -> str:
+        """The name of the change detection backend in use."""
+        return 'inotify' if self._inotify is not None else 'poll'
+
+    @property
+    def paths(self) -> list[Path]:
+        """The watched file and directory paths."""
+        return list(self._paths)
+
+    def __init__(self, paths: list[Union[str, Path]], debounce: float = 0.25, poll_interval: float = 5.0):
+        from lib.snapshot import ConfigFingerprint
+
+        self._paths = []
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._fingerprint = ConfigFingerprint()
+        self._watches = {}
+        self._identities = {}
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = threading.Event()
+
+        if sys.platform.startswith('linux'):
+            try:
+                self._inotify = Inotify()
+            except (OSError, AttributeError) as e:
+                logger.warning(f'ConfigWatcher: inotify is unavailable, falling back to polling: {e}')
+                self._inotify = None
+
+        self.update(paths)
+
+    def update(self, paths: list[Union[str, Path]]):
+        """Replaces the watched paths with the given paths."""
+        paths = [Path(p) for p in paths if p is not None]
+
+        if paths == self._paths:
+            return
+
+        self._paths = paths
+        self._refresh_identities()
+
+        if self._inotify is not None:
+            self._setup_watches()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a change to the watched paths is detected and no further events have arrived within the
+        debounce window. Returns False if the timeout elapsed or the watcher was closed before a change was seen.
+        """
+        if not self._wait_for_event(timeout):
+            return False
+
+        # Debounce bursts of edits (e.g. editors writing temporary files and renaming them into place)
+        while not self._closed.is_set() and self._wait_for_event(self._debounce):
+            pass
+
+        if self._inotify is not None:
+            # Keep the identities current so that later rewatches only report changes made after this one
+            self._refresh_identities()
+
+        return not self._closed.is_set()
+
+    def close(self):
+        """Closes the watcher and wakes any blocked waiters."""
+        if self._closed.is_set():
+            return
+
+        self._closed.set()
+
+        try:
+            os.write(self._wake_w, b'\0')
+        except OSError:
+            pass
+
+        # Waiters blocked in select have already been woken by the write above
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def _setup_watches(self) -> bool:
+        """
+        (Re)creates the inotify watches for the parent directories of the watched paths. Returns whether any of the
+        watched paths changed since their identities were last seen, as changes made between closing the old watches
+        and adding the new ones raise no events.
+        """
+        old = self._inotify
+        self._inotify = Inotify()
+        old.close()
+        self._watches = {}
+
+        for path in self._paths:
+            if path.is_dir():
+                # Any entry within a watched directory (e.g. a secrets directory) is relevant
+                target, names = path, None
+            else:
+                # Watch the parent directory so that files replaced by rename are still tracked
+                target, names = path.parent, {path.name}
+
+            # Watch the nearest existing ancestor so that the creation of missing directories is noticed
+            while not target.exists() and target != target.parent:
+                target, names = target.parent, None
+
+            try:
+                wd = self._inotify.add_watch(target)
+            except OSError as e:
+                logger.warning(f'ConfigWatcher: Failed to watch "{target}": {e}')
+                continue
+
+            if wd in self._watches and (self._watches[wd] is None or names is None):
+                self._watches[wd] = None
+            elif wd in self._watches:
+                self._watches[wd] |= names
+            else:
+                self._watches[wd] = names
+
+        return self._refresh_identities()
+
+    def _refresh_identities(self) -> bool:
+        """Records the current identity of each watched path and returns whether any of them changed."""
+        identities = {p: self._fingerprint.file_identity(p) for p in self._paths}
+        changed = identities != self._identities
+        self._identities = identities
+
+        return changed
+
+    def _wait_for_event(self, timeout: Optional[float]) -> bool:
+        """Blocks until a relevant event occurs and returns True, or returns False on timeout or close."""
+        if self._inotify is not None:
+            return self._wait_for_inotify(timeout)
+
+        return self._wait_for_poll(timeout)
+
+    def _wait_for_inotify(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._closed.is_set():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            try:
+                ready, _, _ = select.select([self._inotify.fd, self._wake_r], [], [], remaining)
+            except (OSError, ValueError):
+                return False
+
+            if not ready:
+                return False
+
+            if self._wake_r in ready:
+                return False
+
+            relevant = False
+            rewatch = False
+
+            for wd, mask, name in self._inotify.read():
+                names = self._watches.get(wd, ())
+
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    rewatch = relevant = True
+                elif names is None or name in names or name.startswith('..'):
+                    # Names starting with ".." cover atomically swapped Kubernetes ConfigMap and Secret mounts
+                    relevant = True
+
+                if mask & IN_CREATE and names is None:
+                    rewatch = True
+
+            if rewatch and self._setup_watches():
+                relevant = True
+
+            if relevant:
+                return True
+
+        return False
+
+    def _wait_for_poll(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._closed.is_set():
+            interval = self._poll_interval
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                interval = min(interval, remaining)
+
+            if self._closed.wait(interval):
+                return False
+
+            if self._refresh_identities():
+                return True
+
+        return False
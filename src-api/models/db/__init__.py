@@ -2,6 +2,7 @@ import models.db.acl
 import models.db.audits
 import models.db.auth
 import models.db.crypto
+import models.db.notifications
 import models.db.servers
 import models.db.system
 import models.db.tasks
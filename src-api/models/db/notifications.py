@@ -0,0 +1,101 @@
+"""
+PDA Notification Database Models
+
+This file defines the database models associated with notification functionality.
+"""
+import uuid
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import DateTime, Index, Integer, String, TEXT, Uuid, text
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+from models.base import BaseSqlModel
+
+
+class NotificationOutboxStatusEnum(str, Enum):
+    """Defines the different notification outbox entry statuses."""
+    pending = "pending"
+    """When a notification is waiting to be delivered, or to be retried after a failed delivery attempt."""
+
+    sending = "sending"
+    """When a notification has been claimed by a delivery worker and is being delivered."""
+
+    sent = "sent"
+    """When a notification has been delivered successfully."""
+
+    failed = "failed"
+    """When a notification has failed permanently having exhausted its delivery attempts."""
+
+
+class NotificationOutboxEntry(BaseSqlModel):
+    """Represents a notification queued for delivery to a single recipient in the notification outbox."""
+
+    __tablename__ = 'pda_notification_outbox'
+    """Defines the database table name."""
+
+    __table_args__ = (
+        Index('ix_pda_notification_outbox_status_available_at', 'status', 'available_at'),
+    )
+    """Defines the index that delivery workers claim entries with."""
+
+    id: Mapped[str] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    """The unique identifier of the record."""
+
+    service: Mapped[str] = mapped_column(String(20), nullable=False)
+    """The notification service that the notification is delivered through."""
+
+    endpoint: Mapped[str] = mapped_column(String(1024), nullable=False)
+    """The address the notification is delivered to, such as an email address, webhook URL, or phone number."""
+
+    config: Mapped[str] = mapped_column(String(255), nullable=False)
+    """The label of the notification configuration that the notification was created for."""
+
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    """The label of the service recipient that the notification is delivered to."""
+
+    category: Mapped[Optional[str]] = mapped_column(String(50))
+    """The notification category of the event that the notification was created for."""
+
+    task_name: Mapped[Optional[str]] = mapped_column(String(255))
+    """The name of the task associated with the event that the notification was created for (if any)."""
+
+    subject: Mapped[Optional[str]] = mapped_column(TEXT)
+    """The rendered message subject of the notification."""
+
+    title: Mapped[Optional[str]] = mapped_column(TEXT)
+    """The rendered message title of the notification."""
+
+    body_plain: Mapped[Optional[str]] = mapped_column(TEXT)
+    """The rendered message body in plain format of the notification."""
+
+    body_html: Mapped[Optional[str]] = mapped_column(TEXT)
+    """The rendered message body in HTML format of the notification."""
+
+    status: Mapped[NotificationOutboxStatusEnum] = mapped_column(String(20), nullable=False)
+    """The current delivery status of the notification."""
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    """The number of delivery attempts made."""
+
+    error: Mapped[Optional[str]] = mapped_column(TEXT)
+    """The error of the last failed delivery attempt (if any)."""
+
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+    """The timestamp representing when the notification may next be claimed for delivery."""
+
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(255))
+    """The identifier of the delivery worker that last claimed the notification."""
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.now, server_default=text('CURRENT_TIMESTAMP')
+    )
+    """The timestamp representing when the record was created."""
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.now, onupdate=datetime.now,
+        server_default=text('CURRENT_TIMESTAMP'), server_onupdate=text('CURRENT_TIMESTAMP')
+    )
+    """The timestamp representing when the record was last updated."""
+
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    """The timestamp representing when the notification was delivered."""
@@ -73,7 +73,7 @@ class TaskJob(BaseSqlModel):
     """The total runtime of the task job in seconds."""
 
     output: Mapped[Optional[str]] = mapped_column(TEXT)
-    """The captured STDOUT and STDERR of the task job."""
+    """The captured STDERR of the task job as recorded before output was recorded in chunks as `outputs`."""
 
     errors: Mapped[Optional[str]] = mapped_column(TEXT)
     """The captured exception stacktraces of the task job."""
@@ -101,6 +101,11 @@ class TaskJob(BaseSqlModel):
     activities = relationship('TaskJobActivity', back_populates='task_job')
     """A list of activities associated with the task job."""
 
+    outputs = relationship(
+        'TaskJobOutput', back_populates='task_job', order_by='[TaskJobOutput.created_at, TaskJobOutput.sequence]'
+    )
+    """A list of the captured output chunks of the task job."""
+
 
 class TaskJobActivity(BaseSqlModel):
     """Represents a PDA task job activity update."""
@@ -127,3 +132,30 @@ class TaskJobActivity(BaseSqlModel):
 
     task_job = relationship('TaskJob', back_populates='activities')
     """The task job associated with the activity update."""
+
+
+class TaskJobOutput(BaseSqlModel):
+    """Represents a chunk of the captured output of a PDA task job."""
+
+    __tablename__ = 'pda_task_job_outputs'
+    """Defines the database table name."""
+
+    id: Mapped[str] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    """The unique identifier of the record."""
+
+    task_job_id: Mapped[str] = mapped_column(Uuid, ForeignKey('pda_task_jobs.id'), nullable=False, index=True)
+    """The unique identifier of the task job associated with this output chunk."""
+
+    sequence: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    """The position of the chunk within the output captured from the task job run."""
+
+    content: Mapped[str] = mapped_column(TEXT, nullable=False)
+    """The captured output of the chunk."""
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.now, server_default=text('CURRENT_TIMESTAMP')
+    )
+    """The timestamp representing when the record was created."""
+
+    task_job = relationship('TaskJob', back_populates='outputs')
+    """The task job associated with the output chunk."""
@@ -0,0 +1,42 @@
+"""
+Records task job state transitions from the Celery task event stream, separately from the workers. Enable it with
+the `tasks.jobs.recorder` setting so that workers publish task events instead of writing task job statuses.
+
+    python3 recorder.py
+"""
+import signal
+import sys
+from celery import Celery
+from app import initialize, log_startup_report, task_jobs
+from lib.celery import TaskEventRecorder
+
+# Initialize the app with logging, environment settings, and file-based configuration
+config = initialize()
+
+# Instantiate a Celery application that only consumes task events from the broker
+app = Celery(config.app.name, broker=config.celery.broker.url)
+
+app.conf.timezone = 'UTC'
+app.conf.event_serializer = 'pickle'
+app.conf.accept_content = ['json', 'application/json', 'application/x-python-serialize']
+
+recorder = TaskEventRecorder(app, node_id=config.tasks.jobs.recorder_queue)
+
+
+def main() -> int:
+    signal.signal(signal.SIGTERM, lambda *_: recorder.stop())
+    signal.signal(signal.SIGINT, lambda *_: recorder.stop())
+
+    log_startup_report('recorder')
+
+    try:
+        recorder.run()
+    finally:
+        # Write any buffered task job transitions before exiting
+        task_jobs.reset()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,8 @@
 import uuid
 from celery.result import AsyncResult
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
+from lib.api.dependencies import RateLimiter
 from lib.pda.api.services.mail import MailServiceSendRequest, MailServiceSendResponse
 from routers.root import router_responses
 
@@ -42,6 +43,16 @@ responses = {
             },
         },
     },
+    429: {
+        'description': 'Mail request rate limit exceeded.',
+        'content': {
+            'application/json': {
+                'example': {
+                    'detail': 'Rate limit of 60 requests in 60s exceeded.',
+                },
+            },
+        },
+    },
     500: {
         'description': 'Mail request failed.',
         'content': {
@@ -88,8 +99,10 @@ def update_response_from_task(response: MailServiceSendResponse, task: AsyncResu
     return response, status_code
 
 
-@router.post('/send', response_model=MailServiceSendResponse, responses=responses)
+@router.post('/send', response_model=MailServiceSendResponse, responses=responses,
+             dependencies=[Depends(RateLimiter('mail.send', calls=60, period=60))])
 async def send(request: MailServiceSendRequest, wait_for_finish: bool = False, timeout: float = 60) -> JSONResponse:
+    import asyncio
     import time
     from loguru import logger
     from lib.enums import TaskEnum
@@ -114,7 +127,7 @@ async def send(request: MailServiceSendRequest, wait_for_finish: bool = False, t
         if wait_for_finish:
             start = time.time()
             while time.time() - start < timeout:
-                time.sleep(1)
+                await asyncio.sleep(1)
                 if task.ready():
                     break
 
@@ -1,5 +1,5 @@
 from celery import current_app
-from typing import Any
+from typing import Any, Optional
 from lib.enums import TaskEnum
 from lib.mail import EmailSendResult
 
@@ -95,6 +95,54 @@ def mail_send(**kwargs) -> EmailSendResult:
     return send_result
 
 
+@current_app.task(name=TaskEnum.PDA_NOTIFICATION_DIGEST.value, label='PDA Notification Digest')
+def notification_digest(key: str, config: str, service: str, recipient: str, category: Optional[str] = None,
+                        task_name: Optional[str] = None):
+    """This task sends the digest of the duplicate notifications suppressed within a closed suppression window."""
+    from app import notifications
+    from lib.notifications import NotificationManager
+
+    NotificationManager(configs=notifications).send_digest(
+        key=key, config=config, service=service, recipient=recipient, category=category, task_name=task_name,
+    )
+
+
+@current_app.task(name=TaskEnum.PDA_TWILIO_STATUS.value, label='PDA Twilio Status', bind=True)
+def twilio_status(self, messages: dict[str, str], attempt: int = 1):
+    """
+    This task looks up and logs the delivery status of the given sent Twilio messages, which are keyed by message SID
+    with the label of their recipient. Messages that are still pending delivery are looked up again later by a new
+    task rather than a retry, so that polling doesn't record task retries or raise retry notifications.
+    """
+    from loguru import logger
+    from app import config, twilio
+
+    pending = {}
+
+    for sid, label in messages.items():
+        try:
+            msg = twilio.messages(sid).fetch()
+        except Exception as e:
+            logger.warning(f'Failed to look up Twilio message {sid} sent to {label}: {e}')
+            continue
+
+        log_msg = f'Sent Twilio message: From: {msg.from_}, To: {msg.to} ({label}), Status: {msg.status}'
+
+        if msg.price is not None:
+            log_msg += f', Price: {msg.price} {msg.price_unit}'
+
+        log_msg += f'\nMessage:\n{msg.body}'
+
+        logger.debug(log_msg)
+
+        if msg.status in ('accepted', 'scheduled', 'queued', 'sending'):
+            pending[sid] = label
+
+    if pending and attempt < config.services.twilio.status_attempts:
+        self.apply_async(kwargs={'messages': pending, 'attempt': attempt + 1},
+                         countdown=config.services.twilio.status_delay)
+
+
 @current_app.task(name=TaskEnum.PDA_ALERT.value, label='PDA Alert')
 def alert(msg: str, info: Any = None, title: str = None):
     """Sends an alert to the configured administrators about runtime issues."""
@@ -3,6 +3,7 @@ from loguru import logger
 from celery import Celery
 from app import initialize
 from lib.celery import SignalHandler
+from lib.profiling import profiler
 
 # Initialize the app with logging, environment settings, and file-based configuration
 config = initialize()
@@ -27,19 +28,29 @@ app.conf.task_serializer = 'pickle'
 app.conf.result_serializer = 'pickle'
 app.conf.result_extended = True
 app.conf.accept_content = ['json', 'application/json', 'application/x-python-serialize']
+app.conf.worker_pool = config.celery.worker.pool.value
+
+if config.celery.worker.concurrency:
+    app.conf.worker_concurrency = config.celery.worker.concurrency
+
+# Publish task events for the recorder process when it records task job statuses in place of the workers
+if config.tasks.jobs.recorder:
+    app.conf.worker_send_task_events = True
+    app.conf.task_send_sent_event = True
 
 # Set up task auto-discovery
-root_task_path = f'src/tasks'
-task_packages = []
+with profiler.phase('worker.tasks'):
+    root_task_path = f'src/tasks'
+    task_packages = []
 
-for dirpath, _, filenames in os.walk(root_task_path):
-    for filename in filenames:
-        if filename.endswith('.py') and filename != '__init__.py':
-            full_path = os.path.join(dirpath, filename)
-            rel_path = os.path.relpath(full_path, root_task_path)
-            module = rel_path.replace(os.path.sep, '.').rsplit('.py', 1)[0]
-            task_packages.append(f'tasks.{module}')
+    for dirpath, _, filenames in os.walk(root_task_path):
+        for filename in filenames:
+            if filename.endswith('.py') and filename != '__init__.py':
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, root_task_path)
+                module = rel_path.replace(os.path.sep, '.').rsplit('.py', 1)[0]
+                task_packages.append(f'tasks.{module}')
 
-logger.debug(f'Registering task packages for auto-discovery: {task_packages}')
+    logger.debug(f'Registering task packages for auto-discovery: {task_packages}')
 
-app.autodiscover_tasks(task_packages)
+    app.autodiscover_tasks(task_packages)